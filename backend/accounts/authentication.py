@@ -0,0 +1,91 @@
+"""
+Autenticación JWT con el usuario cacheado.
+
+``JWTAuthentication`` busca al usuario por pk en cada request autenticada.
+``CachedJWTAuthentication`` guarda ``AUTH_USER_CACHE_SECONDS`` en el caché de
+Django los campos que se usan en cada request (``CACHED_FIELDS``), no el
+usuario entero con el hash de su contraseña, así que la mayoría de las
+requests no hacen esa consulta. El usuario se rearma con esos campos y el resto
+queda diferido.
+
+El usuario cacheado se borra al guardar o eliminar el usuario (desactivación,
+cambio de contraseña, cambio de rol; ver accounts/signals.py) y al cambiar esos
+campos con ``update()`` (ver ``UserQuerySet`` en accounts/models.py). El borrado
+solo alcanza a todos los procesos con un caché compartido: por eso
+``AUTH_USER_CACHE_SECONDS`` vale 0 por defecto si no hay ``CACHE_URL``. Con
+locmem y el caché activado a mano, en los demás procesos el usuario viejo dura
+como mucho ``AUTH_USER_CACHE_SECONDS``.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+KEY_PREFIX = 'auth-user:'
+
+# Campos del usuario cacheado: los que leen los permisos y las vistas en
+# request.user. Leer otro campo cuesta una consulta; si se vuelve habitual, va acá.
+CACHED_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'is_active', 'is_staff', 'is_superuser',
+    'is_creator', 'updated_at',
+)
+
+
+def user_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def forget_user(user_id):
+    """Borra al usuario del caché al confirmarse la transacción en curso"""
+    transaction.on_commit(lambda: user_cache().delete(f'{KEY_PREFIX}{user_id}'))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        timeout = getattr(settings, 'AUTH_USER_CACHE_SECONDS', 0)
+        if timeout <= 0:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = f'{KEY_PREFIX}{user_id}'
+        entry = user_cache().get(key)
+        if entry is None:
+            # Busca al usuario y valida que esté activo (y la contraseña, con CHECK_REVOKE_TOKEN)
+            user = super().get_user(validated_token)
+            user_cache().set(key, cache_entry(user), timeout)
+            return user
+        # El caché solo guarda usuarios activos; la contraseña sí puede no
+        # coincidir con la de un token emitido antes de cambiarla
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != entry['password']:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user_from_entry(self.user_model, entry)
+
+
+def cache_entry(user):
+    """
+    Lo que se guarda del usuario: los campos de ``CACHED_FIELDS`` y, con
+    CHECK_REVOKE_TOKEN, el mismo hash de la contraseña que lleva el token. Nunca
+    el hash de la contraseña en sí.
+    """
+    return {
+        'fields': {name: getattr(user, name) for name in CACHED_FIELDS},
+        'password': get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None,
+    }
+
+
+def user_from_entry(user_model, entry):
+    """Usuario con los campos cacheados; los demás quedan diferidos y se cargan si se leen"""
+    fields = entry['fields']
+    names = [field.attname for field in user_model._meta.concrete_fields if field.attname in fields]
+    return user_model.from_db(DEFAULT_DB_ALIAS, names, [fields[name] for name in names])
@@ -0,0 +1,365 @@
+"""
+Índice TF-IDF de creadores para recomendarlos en proyectos y convocatorias.
+
+Cada creador activo es un documento con sus ``specialties`` (que pesan
+``SPECIALTY_BOOST`` veces), su ``bio`` y el título y la descripción de sus
+ítems de portafolio. Los pesos son ``(1 + log tf) * idf`` normalizados, así que
+el puntaje de una consulta es la similitud coseno con el texto del proyecto.
+
+El índice es invertido (término -> creadores con su peso) y vive en el archivo
+``CREATOR_INDEX_PATH``, que cada worker abre con ``mmap``: los postings no se
+copian a la memoria de cada proceso sino que comparten el page cache. Formato
+(las secciones en el orden de bytes de la máquina que lo escribe y lo lee):
+
+- Cabecera ``HEADER``: versión del formato, generación, cantidad de
+  documentos, de términos y de postings, y largo del vocabulario.
+- Vocabulario: lista JSON de términos (lo único que cada worker parsea).
+- ``idf`` (float32 por término), ``offsets`` (uint32, términos + 1) y los
+  postings: ids de creador (uint32) y pesos (float32), agrupados por término.
+
+Los cambios de perfil, bio o portafolio se encolan en ``CreatorIndexChange``
+dentro de la transacción que los hace, sin tocar el archivo en el request. El
+worker ``update_creator_index`` los agrega en lotes como líneas JSON en
+``<ruta>.<generación>.delta`` con los términos del creador. Cada worker web lee
+las líneas nuevas y esos creadores se puntúan con su versión del delta en lugar
+de la del archivo. Solo ``build_creator_index`` crea el archivo desde la base:
+sin él las búsquedas lanzan ``IndexNotBuilt``. Conviene correrlo en cada deploy
+y periódicamente para compactar el delta y recalcular el idf. El archivo se
+comparte entre los procesos de una misma máquina.
+"""
+
+import fcntl
+import heapq
+import json
+import math
+import os
+import re
+import struct
+import threading
+import time
+import unicodedata
+import uuid
+from array import array
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from mmap import ACCESS_READ, mmap
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from .models import CreatorIndexChange, CreatorPortfolioItem
+
+MAGIC = b'CRIDX001'
+# magic, generación, documentos, términos, postings, bytes del vocabulario
+HEADER = struct.Struct('<8s16sIIII')
+SPECIALTY_BOOST = 3
+TOKEN_RE = re.compile(r'\w+')
+STOPWORDS = frozenset(
+    'al ante con como contra de del desde donde durante el ella ellos en entre es esa ese eso esta este '
+    'esto hasta hay la las le les lo los mas me mi muy nos o para pero por que se si sin sobre su sus '
+    'tambien te tu un una uno unos y ya yo a e and the of for to in with'.split()
+)
+
+
+class IndexNotBuilt(Exception):
+    """El archivo del índice no existe: hay que correr ``build_creator_index``"""
+
+
+def tokenize(text):
+    """Términos normalizados (minúsculas, sin tildes ni stopwords) de ``text``"""
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [token for token in TOKEN_RE.findall(text) if len(token) > 1 and token not in STOPWORDS]
+
+
+def document_terms(specialties, bio, portfolio_texts):
+    """Frecuencia de cada término en el documento de un creador"""
+    terms = Counter()
+    for token in tokenize(specialties.replace(',', ' ')):
+        terms[token] += SPECIALTY_BOOST
+    terms.update(tokenize(bio))
+    for text in portfolio_texts:
+        terms.update(tokenize(text))
+    return terms
+
+
+def creator_documents(user_ids=None):
+    """``{creator_id: términos}`` de los creadores activos (de ``user_ids``, si se indica)"""
+    User = get_user_model()
+    creators = User.objects.filter(is_creator=True, is_active=True)
+    portfolio = CreatorPortfolioItem.objects.filter(
+        creator_profile__user__is_creator=True, creator_profile__user__is_active=True
+    )
+    if user_ids is not None:
+        creators = creators.filter(pk__in=user_ids)
+        portfolio = portfolio.filter(creator_profile__user_id__in=user_ids)
+
+    texts = defaultdict(list)
+    for user_id, title, description in portfolio.values_list(
+        'creator_profile__user_id', 'title', 'description'
+    ).iterator(chunk_size=5000):
+        texts[user_id].extend((title, description))
+    return {
+        user_id: document_terms(specialties or '', bio, texts.get(user_id, ()))
+        for user_id, bio, specialties in creators.values_list(
+            'id', 'bio', 'creator_profile__specialties'
+        ).iterator(chunk_size=5000)
+    }
+
+
+def weigh(terms, idf):
+    """Pesos ``(1 + log tf) * idf`` normalizados; ``idf`` da el de cada término"""
+    weights = {term: (1 + math.log(count)) * idf(term) for term, count in terms.items() if count > 0}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+
+@contextmanager
+def locked(path):
+    """Bloqueo entre procesos para escribir el delta o reemplazar el archivo"""
+    with open(f'{path}.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_generation(path):
+    try:
+        with open(path, 'rb') as index_file:
+            magic, generation, *_ = HEADER.unpack(index_file.read(HEADER.size))
+    except (FileNotFoundError, struct.error):
+        return None
+    return generation.hex() if magic == MAGIC else None
+
+
+def delta_path(path, generation):
+    return f'{path}.{generation}.delta'
+
+
+def build(path):
+    """Reconstruye el archivo desde la base; devuelve la cantidad de creadores"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # Lo que se agregue al delta desde acá puede no estar en la lectura: se conserva
+    with locked(path):
+        old_generation = read_generation(path)
+        old_delta = delta_path(path, old_generation) if old_generation else None
+        replay_from = os.path.getsize(old_delta) if old_delta and os.path.exists(old_delta) else 0
+
+    documents = creator_documents()
+    frequencies = Counter(term for terms in documents.values() for term in terms)
+    vocabulary = sorted(frequencies)
+    positions = {term: position for position, term in enumerate(vocabulary)}
+    total = len(documents)
+    idf = [math.log((1 + total) / (1 + frequencies[term])) + 1 for term in vocabulary]
+
+    postings = [[] for _ in vocabulary]
+    for user_id in sorted(documents):
+        for term, weight in weigh(documents[user_id], lambda term: idf[positions[term]]).items():
+            postings[positions[term]].append((user_id, weight))
+    offsets = array('I', [0])
+    doc_ids, weights = array('I'), array('f')
+    for entries in postings:
+        for user_id, weight in entries:
+            doc_ids.append(user_id)
+            weights.append(weight)
+        offsets.append(len(doc_ids))
+
+    generation = uuid.uuid4()
+    encoded = json.dumps(vocabulary, ensure_ascii=False).encode()
+    encoded += b' ' * (-len(encoded) % 4)
+    temporary = f'{path}.{generation.hex}.tmp'
+    with open(temporary, 'wb') as index_file:
+        index_file.write(HEADER.pack(MAGIC, generation.bytes, total, len(vocabulary), len(doc_ids), len(encoded)))
+        index_file.write(encoded)
+        for section in (array('f', idf), offsets, doc_ids, weights):
+            index_file.write(section.tobytes())
+
+    with locked(path):
+        if old_delta and os.path.exists(old_delta):
+            with open(old_delta, 'rb') as source:
+                source.seek(replay_from)
+                pending = source.read()
+            if pending:
+                with open(delta_path(path, generation.hex), 'ab') as target:
+                    target.write(pending)
+        os.replace(temporary, path)
+        if old_delta and os.path.exists(old_delta):
+            os.remove(old_delta)
+    return total
+
+
+def apply_changes(path, batch_size=None):
+    """
+    Agrega al delta los términos actuales de un lote de creadores encolados y
+    borra sus cambios de la cola. Devuelve cuántos cambios procesó; sin archivo
+    no procesa ninguno y la cola espera a ``build_creator_index``.
+    """
+    batch_size = batch_size or settings.CREATOR_INDEX_BATCH_SIZE
+    if not os.path.exists(path):
+        return 0
+    with transaction.atomic():
+        changes = list(
+            CreatorIndexChange.objects.select_for_update(skip_locked=True)
+            .order_by('id').values_list('id', 'user_id')[:batch_size]
+        )
+        if not changes:
+            return 0
+        user_ids = {user_id for _, user_id in changes}
+        documents = creator_documents(user_ids)
+        lines = ''.join(
+            json.dumps({'id': user_id, 'terms': documents.get(user_id, {})}, ensure_ascii=False) + '\n'
+            for user_id in sorted(user_ids)
+        )
+        with locked(path):
+            generation = read_generation(path)
+            if generation is None:
+                return 0
+            with open(delta_path(path, generation), 'a', encoding='utf-8') as delta:
+                delta.write(lines)
+        # Si el borrado no llega a confirmarse, el lote se vuelve a agregar: las
+        # líneas repetidas solo reemplazan los mismos términos
+        CreatorIndexChange.objects.filter(id__in=[change_id for change_id, _ in changes]).delete()
+    return len(changes)
+
+
+def reindex_creator(*user_ids):
+    """Encola los creadores ``user_ids`` para el índice; se descarta si la transacción se revierte"""
+    CreatorIndexChange.objects.bulk_create([CreatorIndexChange(user_id=user_id) for user_id in set(user_ids)])
+
+
+class Recommendations:
+    """
+    Creadores ordenados por puntaje (y por id a igual puntaje). Se indexa con
+    slices: ``recommendations[0:10]`` devuelve ``(creator_id, puntaje)``.
+    """
+
+    def __init__(self, scores):
+        self.scores = scores
+        self._top = []
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __getitem__(self, window):
+        if not isinstance(window, slice) or window.step not in (None, 1):
+            raise TypeError("Recommendations solo admite slices")
+        start, stop, _ = window.indices(len(self))
+        if len(self._top) < stop:
+            self._top = heapq.nlargest(stop, self.scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(user_id, round(score, 4)) for user_id, score in self._top[start:stop]]
+
+
+class CreatorIndex:
+    """El archivo mapeado de un proceso, más los cambios leídos del delta"""
+
+    def __init__(self, path, check_interval):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._stat = None
+        self._next_check = 0.0
+        self._file = None
+        self._map = None
+        # creador -> pesos del delta (vacío si dejó de estar en el índice)
+        self._changed = {}
+        self._delta_offset = 0
+
+    def search(self, text, exclude=()):
+        """``Recommendations`` de los creadores para ``text``, sin los de ``exclude``"""
+        with self._lock:
+            self.refresh()
+            query = weigh(Counter(tokenize(text)), self.idf)
+            scores = defaultdict(float)
+            for term, query_weight in query.items():
+                position = self.vocabulary.get(term)
+                if position is None:
+                    continue
+                start, end = self.offsets[position], self.offsets[position + 1]
+                for user_id, weight in zip(self.doc_ids[start:end], self.weights[start:end]):
+                    scores[user_id] += query_weight * weight
+            for user_id, weights in self._changed.items():
+                score = sum(query_weight * weights.get(term, 0.0) for term, query_weight in query.items())
+                if score > 0:
+                    scores[user_id] = score
+                else:
+                    scores.pop(user_id, None)
+        for user_id in exclude:
+            scores.pop(user_id, None)
+        return Recommendations(scores)
+
+    def idf(self, term):
+        position = self.vocabulary.get(term)
+        if position is None:
+            # Término que ningún creador del archivo usa
+            return math.log(1 + self.total) + 1
+        return self.idf_values[position]
+
+    def refresh(self):
+        now = time.monotonic()
+        if self._map is not None and now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._map is None:
+                raise IndexNotBuilt(self.path) from None
+            # Borrado mientras se usaba: se sigue con el mapeado hasta que vuelva
+            stat = None
+        if stat and (self._map is None or (stat.st_ino, stat.st_mtime_ns) != self._stat):
+            self.open(stat)
+        self.read_delta()
+
+    def open(self, stat):
+        with open(self.path, 'rb') as index_file:
+            mapped = mmap(index_file.fileno(), 0, access=ACCESS_READ)
+        magic, generation, total, terms, postings, vocabulary_size = HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} no es un índice de creadores")
+        view = memoryview(mapped)
+        start = HEADER.size
+        self.vocabulary = {
+            term: position for position, term in enumerate(json.loads(bytes(view[start:start + vocabulary_size])))
+        }
+        start += vocabulary_size
+        sections = []
+        for code, length in (('f', terms), ('I', terms + 1), ('I', postings), ('f', postings)):
+            sections.append(view[start:start + 4 * length].cast(code))
+            start += 4 * length
+        self.idf_values, self.offsets, self.doc_ids, self.weights = sections
+
+        # El mmap anterior no se cierra: lo cierra el recolector cuando nadie
+        # usa sus vistas
+        self._map = mapped
+        self._stat = (stat.st_ino, stat.st_mtime_ns)
+        self.total = total
+        self.generation = generation.hex()
+        self._changed = {}
+        self._delta_offset = 0
+
+    def read_delta(self):
+        try:
+            with open(delta_path(self.path, self.generation), 'rb') as delta:
+                delta.seek(self._delta_offset)
+                data = delta.read()
+        except FileNotFoundError:
+            return
+        # Solo líneas completas: una escritura en curso se lee la próxima vez
+        complete = data.rfind(b'\n') + 1
+        self._delta_offset += complete
+        for line in data[:complete].splitlines():
+            change = json.loads(line)
+            self._changed[change['id']] = weigh(change['terms'], self.idf)
+
+
+@lru_cache(maxsize=None)
+def index_at(path):
+    return CreatorIndex(path, getattr(settings, 'CREATOR_INDEX_CHECK_SECONDS', 2))
+
+
+def get_creator_index():
+    return index_at(settings.CREATOR_INDEX_PATH)
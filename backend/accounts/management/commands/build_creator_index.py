@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.creator_index import build
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye desde la base el índice TF-IDF de creadores que usan las "
+        "recomendaciones: compacta el delta de cambios y recalcula el idf. Pensado "
+        "para el deploy y un cron periódico."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=None,
+                            help="Archivo del índice (por defecto CREATOR_INDEX_PATH)")
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.CREATOR_INDEX_PATH
+        started = time.perf_counter()
+        total = build(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} creadores indexados en {path} ({time.perf_counter() - started:.1f} s)"
+        ))
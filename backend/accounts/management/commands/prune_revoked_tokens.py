@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra los refresh tokens revocados que ya vencieron: un token vencido se "
+        "rechaza igual, así que no hace falta recordarlo. Pensado para un cron diario."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        total = 0
+        while True:
+            # En lotes, para no tomar locks largos sobre la tabla
+            ids = list(
+                RevokedToken.objects.filter(expires_at__lte=now)
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            total += RevokedToken.objects.filter(pk__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"{total} tokens revocados vencidos borrados"))
@@ -0,0 +1,45 @@
+import logging
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.creator_index import apply_changes
+
+logger = logging.getLogger('accounts.creator_index')
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker que agrega al delta del índice de creadores los cambios encolados "
+        "de perfil, bio y portafolio, en lotes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=None,
+                            help="Archivo del índice (por defecto CREATOR_INDEX_PATH)")
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help="Segundos de espera cuando la cola está vacía")
+        parser.add_argument('--once', action='store_true',
+                            help="Procesa lo pendiente y termina")
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.CREATOR_INDEX_PATH
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while not self.stopping:
+            applied = apply_changes(path, batch_size=options['batch_size'])
+            if applied:
+                logger.info("Índice de creadores: %d cambios agregados al delta", applied)
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+    def stop(self, signum, frame):
+        # Termina el lote en curso antes de salir
+        self.stopping = True
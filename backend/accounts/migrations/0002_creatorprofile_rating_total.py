@@ -0,0 +1,18 @@
+# Generated by Django 5.0.5 on 2026-10-18 16:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creatorprofile',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0, help_text='Suma de las calificaciones recibidas'),
+        ),
+    ]
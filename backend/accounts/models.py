@@ -1,17 +1,50 @@
 
+from decimal import Decimal
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.db.models.functions import Cast, Round
+from django.db.models.lookups import GreaterThan
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+class UserQuerySet(models.QuerySet):
+    # Campos que cambian lo que vale el usuario cacheado por CachedJWTAuthentication
+    AUTH_FIELDS = {'is_active', 'is_staff', 'is_superuser', 'is_creator', 'password'}
+
+    def update(self, **kwargs):
+        """``update()`` no dispara señales: borra del caché a los usuarios afectados"""
+        if not self.AUTH_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+        from .authentication import forget_user
+
+        user_ids = list(self.values_list('pk', flat=True))
+        updated = super().update(**kwargs)
+        for user_id in user_ids:
+            forget_user(user_id)
+        return updated
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
+
 class User(AbstractUser):
     """Modelo personalizado para usuarios que extiende el modelo base de Django"""
     
     is_creator = models.BooleanField(default=False, help_text=_("Indica si el usuario es un creador"))
     bio = models.TextField(blank=True, help_text=_("Biografía del usuario"))
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    # También cambia con el perfil, el portafolio y las redes sociales (ver
+    # accounts/signals.py), que se muestran anidados con el usuario
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = UserManager()
     
     def __str__(self):
         return self.username
+    
+    @classmethod
+    def touch(cls, **filters):
+        """Marca como modificados a los usuarios que cumplen ``filters``"""
+        cls.objects.filter(**filters).update(updated_at=timezone.now())
 
 class CreatorProfile(models.Model):
     """Perfil extendido para creadores con información específica"""
@@ -22,9 +55,35 @@ class CreatorProfile(models.Model):
     location = models.CharField(max_length=100, blank=True)
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
     review_count = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0, help_text=_("Suma de las calificaciones recibidas"))
     
     def __str__(self):
         return f"Perfil de {self.user.username}"
+    
+    @staticmethod
+    def average_of(total, count):
+        """Expresión SQL del promedio redondeado a dos decimales (0 si no hay reseñas)"""
+        return models.Case(
+            models.When(GreaterThan(count, 0), then=Round(Cast(total, models.FloatField()) / count, 2)),
+            default=models.Value(Decimal('0')),
+            output_field=models.DecimalField(max_digits=3, decimal_places=2),
+        )
+    
+    @classmethod
+    def apply_review(cls, creator_id, rating_delta, count_delta):
+        """
+        Aplica el alta, baja o cambio de una reseña a los agregados del creador con un
+        único UPDATE. Todas las columnas se calculan a partir de los valores de la
+        fila bloqueada, así que reseñas concurrentes no se pisan entre sí.
+        """
+        total = models.F('rating_total') + rating_delta
+        count = models.F('review_count') + count_delta
+        cls.objects.filter(user_id=creator_id).update(
+            rating_total=total,
+            review_count=count,
+            average_rating=cls.average_of(total, count),
+        )
+        User.touch(pk=creator_id)
 
 class CreatorPortfolioItem(models.Model):
     """Elementos del portafolio de un creador (imágenes o videos)"""
@@ -67,3 +126,39 @@ class SocialNetworkLink(models.Model):
     
     def __str__(self):
         return f"{self.get_network_display()} de {self.user.username}"
+
+class RevokedToken(models.Model):
+    """
+    Refresh token revocado (por rotación). Solo se agregan filas; las vencidas se
+    borran con ``prune_revoked_tokens``. Ver accounts/revocation.py.
+    """
+    
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(help_text=_("Vencimiento del token revocado"))
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='revoked_token_created_idx'),
+            models.Index(fields=['expires_at'], name='revoked_token_expires_idx'),
+        ]
+    
+    def __str__(self):
+        return self.jti
+
+class CreatorIndexChange(models.Model):
+    """
+    Creador cuyo documento cambió y falta agregar al delta del índice de
+    recomendaciones. Se escribe en la misma transacción que el cambio y lo
+    procesa ``update_creator_index``. Ver accounts/creator_index.py.
+    """
+    
+    # Sin clave foránea: la baja de un usuario también tiene que llegar al índice
+    user_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"Creador {self.user_id}"
@@ -0,0 +1,157 @@
+"""
+Revocación de refresh tokens sin consultar la base en cada refresh.
+
+Con ``BLACKLIST_AFTER_ROTATION`` cada ``/api/token/refresh/`` revoca el refresh
+token usado: su ``jti`` se agrega a ``RevokedToken`` (tabla de solo altas, con
+``jti`` único) y a ``RevocationStore``, que cada proceso tiene en memoria.
+
+- ``RevocationStore`` guarda los jti revocados en Bloom filters agrupados por
+  día de vencimiento del token. Un refresh consulta solo el grupo del
+  vencimiento de su propio token: unos pocos bits, en microsegundos. Si el
+  filtro dice que no, el token no está revocado (con el store al día). Si dice
+  que sí, se confirma en la base, porque un Bloom filter puede dar falsos
+  positivos (``TOKEN_REVOCATION_ERROR_RATE``).
+- Los grupos cuyos tokens ya vencieron se descartan enteros, así que la memoria
+  solo crece con los tokens revocados que todavía no vencieron.
+- Al arrancar se reconstruye desde la tabla, y cada
+  ``TOKEN_REVOCATION_SYNC_SECONDS`` se leen las filas nuevas que agregaron los
+  otros procesos.
+- Aunque el store de un proceso esté atrasado, un refresh token no se puede
+  rotar dos veces: el alta en ``RevokedToken`` falla por el ``jti`` único.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+# Los grupos se arman por día de vencimiento
+BUCKET_SECONDS = 86400
+# Filas releídas en cada sincronización: cubre transacciones que confirman
+# después de otras más nuevas
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+    """Bloom filter de ``capacity`` elementos con tasa de falsos positivos ``error_rate``"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, digest):
+        # Doble hashing (Kirsch-Mitzenmacher) a partir de un único digest
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, digest):
+        for position in self.positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(digest))
+
+
+class RevocationStore:
+    """jti revocados en memoria (ver el docstring del módulo)"""
+
+    def __init__(self, capacity, error_rate, sync_interval):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        # día de vencimiento -> Bloom filters (se agrega uno cuando el último se llena)
+        self._buckets = {}
+        # ids leídos dentro de la ventana de SYNC_OVERLAP, para no sumarlos dos veces
+        self._recent = {}
+        # created_at más nuevo leído de la tabla
+        self._watermark = None
+        self._next_sync = 0.0
+
+    def is_revoked(self, jti, exp):
+        """Si el refresh token ``jti`` (que vence en el timestamp ``exp``) fue revocado"""
+        self.sync()
+        digest = jti_digest(jti)
+        with self._lock:
+            filters = self._buckets.get(exp // BUCKET_SECONDS, ())
+            candidate = any(digest in bloom for bloom in filters)
+        return candidate and RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, jti, exp):
+        """Revoca el token; ``False`` si ya estaba revocado"""
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(
+                    jti=jti, expires_at=datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+                )
+        except IntegrityError:
+            return False
+        self.add(jti, exp)
+        return True
+
+    def add(self, jti, exp):
+        digest = jti_digest(jti)
+        with self._lock:
+            filters = self._buckets.setdefault(exp // BUCKET_SECONDS, [])
+            if not filters or filters[-1].count >= self.capacity:
+                filters.append(BloomFilter(self.capacity, self.error_rate))
+            filters[-1].add(digest)
+
+    def sync(self, force=False):
+        """Suma las revocaciones de los otros procesos y descarta los grupos vencidos"""
+        if not force and time.monotonic() < self._next_sync:
+            return
+        # Si otro hilo ya está sincronizando, se usa el estado actual
+        if not self._sync_lock.acquire(blocking=force):
+            return
+        try:
+            self._next_sync = time.monotonic() + self.sync_interval
+            self._load(timezone.now())
+        finally:
+            self._sync_lock.release()
+
+    def _load(self, now):
+        rows = RevokedToken.objects.filter(expires_at__gt=now)
+        if self._watermark is not None:
+            rows = rows.filter(created_at__gte=self._watermark - SYNC_OVERLAP)
+        for pk, jti, expires_at, created_at in rows.values_list('pk', 'jti', 'expires_at', 'created_at').iterator():
+            if pk in self._recent:
+                continue
+            self._recent[pk] = created_at
+            self._watermark = max(self._watermark or created_at, created_at)
+            self.add(jti, int(expires_at.timestamp()))
+
+        if self._watermark is not None:
+            horizon = self._watermark - SYNC_OVERLAP
+            self._recent = {pk: created_at for pk, created_at in self._recent.items() if created_at >= horizon}
+        expired = int(now.timestamp()) // BUCKET_SECONDS
+        with self._lock:
+            for day in [day for day in self._buckets if day < expired]:
+                del self._buckets[day]
+
+
+def jti_digest(jti):
+    return hashlib.blake2b(jti.encode(), digest_size=16).digest()
+
+
+@lru_cache(maxsize=None)
+def get_revocation_store():
+    return RevocationStore(
+        getattr(settings, 'TOKEN_REVOCATION_BLOOM_CAPACITY', 100_000),
+        getattr(settings, 'TOKEN_REVOCATION_ERROR_RATE', 0.001),
+        getattr(settings, 'TOKEN_REVOCATION_SYNC_SECONDS', 5),
+    )
@@ -1,21 +1,37 @@
 
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from core.sparse import SparseFieldsMixin
 from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
 from .models import CreatorProfile, CreatorPortfolioItem, SocialNetworkLink
+from .revocation import get_revocation_store
 
 User = get_user_model()
 
-class SocialNetworkSerializer(serializers.ModelSerializer):
+def prefetch_users(queryset, *fields):
+    """
+    Carga en bloque los usuarios que se serializan anidados con UserSerializer
+    (select_related del usuario y prefetch de sus redes sociales), para que una
+    página cueste la misma cantidad de consultas sin importar su tamaño.
+    """
+    return queryset.select_related(*fields).prefetch_related(
+        *(f'{field}__social_networks' for field in fields)
+    )
+
+class SocialNetworkSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = SocialNetworkLink
         fields = ['id', 'network', 'url', 'username']
 
-class PortfolioItemSerializer(serializers.ModelSerializer):
+class PortfolioItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = CreatorPortfolioItem
         fields = ['id', 'type', 'url', 'title', 'description', 'created_at']
 
-class CreatorProfileSerializer(serializers.ModelSerializer):
+class CreatorProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     portfolio_items = PortfolioItemSerializer(many=True, read_only=True)
     
     class Meta:
@@ -23,7 +39,7 @@ class CreatorProfileSerializer(serializers.ModelSerializer):
         fields = ['id', 'specialties', 'experience_years', 'location', 'average_rating', 'review_count', 'portfolio_items']
         read_only_fields = ['average_rating', 'review_count']
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     social_networks = SocialNetworkSerializer(many=True, read_only=True)
     
     class Meta:
@@ -38,7 +54,7 @@ class CreatorUserSerializer(UserSerializer):
     class Meta(UserSerializer.Meta):
         fields = UserSerializer.Meta.fields + ['creator_profile']
 
-class UserCreateSerializer(serializers.ModelSerializer):
+class UserCreateSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     
     class Meta:
@@ -64,3 +80,27 @@ class UserCreateSerializer(serializers.ModelSerializer):
 class PasswordChangeSerializer(serializers.Serializer):
     old_password = serializers.CharField(required=True)
     new_password = serializers.CharField(required=True)
+
+class RevokingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh con rotación que revoca el token usado (ver accounts/revocation.py).
+    Reemplaza al blacklist de simplejwt, que no está instalado.
+    """
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        jti, exp = refresh[api_settings.JTI_CLAIM], refresh['exp']
+        store = get_revocation_store()
+        if store.is_revoked(jti, exp):
+            raise InvalidToken(_('Token is blacklisted'))
+        
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # Dos refresh concurrentes con el mismo token: solo uno logra revocarlo
+            if api_settings.BLACKLIST_AFTER_ROTATION and not store.revoke(jti, exp):
+                raise InvalidToken(_('Token is blacklisted'))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
@@ -1,8 +1,11 @@
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import CreatorProfile
+from core.response_cache import invalidate
+from .authentication import forget_user
+from .creator_index import reindex_creator
+from .models import CreatorProfile, CreatorPortfolioItem, SocialNetworkLink
 
 User = get_user_model()
 
@@ -13,3 +16,63 @@ def create_creator_profile(sender, instance, created, **kwargs):
     """
     if created and instance.is_creator:
         CreatorProfile.objects.create(user=instance)
+
+@receiver([post_save, post_delete], sender=CreatorProfile)
+@receiver([post_save, post_delete], sender=SocialNetworkLink)
+def touch_user(sender, instance, **kwargs):
+    """
+    El perfil y las redes sociales se muestran anidados con el usuario: cambiarlos
+    cambia su updated_at (ver core/conditional.py)
+    """
+    User.touch(pk=instance.user_id)
+    # Los listados con el usuario embebido como cliente dependen de user:<id>
+    invalidate(f'user:{instance.user_id}', 'creators')
+
+@receiver([post_save, post_delete], sender=CreatorPortfolioItem)
+def touch_portfolio_owner(sender, instance, **kwargs):
+    User.touch(creator_profile__id=instance.creator_profile_id)
+    invalidate(f'user:{instance.creator_profile.user_id}', 'creators')
+
+@receiver(pre_save, sender=User)
+def remember_previous_role(sender, instance, **kwargs):
+    """
+    Guardar si era creador, para invalidar el listado de creadores y sacarlo del
+    índice de recomendaciones también cuando deja de serlo
+    """
+    instance._was_creator = False
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'is_creator' not in update_fields:
+        return
+    if instance.pk and not instance.is_creator:
+        instance._was_creator = User.objects.filter(pk=instance.pk, is_creator=True).exists()
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_responses(sender, instance, **kwargs):
+    """Respuestas cacheadas que muestran al usuario (ver core/response_cache.py)"""
+    is_creator = instance.is_creator or getattr(instance, '_was_creator', False)
+    invalidate(f'user:{instance.pk}', 'creators' if is_creator else None)
+
+@receiver([post_save, post_delete], sender=User)
+def forget_authenticated_user(sender, instance, **kwargs):
+    """
+    Desactivación, cambio de contraseña o de rol: el próximo request autentica
+    con el usuario actual (ver accounts/authentication.py)
+    """
+    forget_user(instance.pk)
+
+@receiver([post_save, post_delete], sender=CreatorProfile)
+def reindex_profile(sender, instance, **kwargs):
+    """Especialidades del creador en el índice de recomendaciones (ver accounts/creator_index.py)"""
+    reindex_creator(instance.user_id)
+
+@receiver([post_save, post_delete], sender=CreatorPortfolioItem)
+def reindex_portfolio(sender, instance, **kwargs):
+    reindex_creator(instance.creator_profile.user_id)
+
+@receiver([post_save, post_delete], sender=User)
+def reindex_user(sender, instance, update_fields=None, **kwargs):
+    """Bio, alta o baja del rol de creador y activación"""
+    if update_fields is not None and not {'bio', 'is_creator', 'is_active'} & set(update_fields):
+        return
+    if instance.is_creator or getattr(instance, '_was_creator', False):
+        reindex_creator(instance.pk)
@@ -0,0 +1,170 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings as jwt_api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .authentication import CACHED_FIELDS, KEY_PREFIX, CachedJWTAuthentication, user_cache
+from .creator_index import IndexNotBuilt, apply_changes, build, index_at
+from .models import CreatorIndexChange, CreatorProfile, RevokedToken, User
+
+
+class RefreshTokenRevocationTests(TestCase):
+    def setUp(self):
+        User.objects.create_user('cliente', 'cliente@example.com', 'clave-segura-1')
+        self.client = APIClient()
+
+    def obtain(self):
+        response = self.client.post(
+            reverse('token_obtain_pair'), {'username': 'cliente', 'password': 'clave-segura-1'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data['refresh']
+
+    def refresh(self, token):
+        return self.client.post(reverse('token_refresh'), {'refresh': token}, format='json')
+
+    def test_rotation_revokes_used_token(self):
+        refresh = self.obtain()
+        first = self.refresh(refresh)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotEqual(first.data['refresh'], refresh)
+        self.assertEqual(RevokedToken.objects.count(), 1)
+
+        reused = self.refresh(refresh)
+        self.assertEqual(reused.status_code, 401)
+        # El token nuevo sigue sirviendo
+        self.assertEqual(self.refresh(first.data['refresh']).status_code, 200)
+
+
+@override_settings(AUTH_USER_CACHE_SECONDS=60)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('creador', 'creador@example.com', 'clave-segura-1', is_creator=True)
+        self.key = f'{KEY_PREFIX}{self.user.pk}'
+
+    def access_token(self):
+        response = APIClient().post(
+            reverse('token_obtain_pair'), {'username': 'creador', 'password': 'clave-segura-1'}, format='json'
+        )
+        return response.data['access']
+
+    def get_me(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client.get(reverse('user-detail', args=[self.user.pk]))
+
+    def test_deactivation_with_update_evicts_cached_user(self):
+        token = self.access_token()
+        self.assertEqual(self.get_me(token).status_code, 200)
+        self.assertIsNotNone(user_cache().get(self.key))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(user_cache().get(self.key))
+        self.assertEqual(self.get_me(token).status_code, 401)
+
+    def test_cache_holds_only_listed_fields(self):
+        self.get_me(self.access_token())
+        entry = user_cache().get(self.key)
+        self.assertEqual(set(entry['fields']), set(CACHED_FIELDS))
+        self.assertIsNone(entry['password'])
+        self.assertNotIn(self.user.password, repr(entry))
+
+    def test_rebuilt_user_defers_other_fields(self):
+        token = AccessToken(self.access_token())
+        CachedJWTAuthentication().get_user(token)
+        with self.assertNumQueries(0):
+            user = CachedJWTAuthentication().get_user(token)
+            self.assertEqual((user.pk, user.username, user.is_creator, user.is_staff, user.is_active),
+                             (self.user.pk, 'creador', True, False, True))
+        self.assertIn('password', user.get_deferred_fields())
+        # Un campo diferido se carga al leerlo
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'creador@example.com')
+
+    def test_revoke_check_uses_password_digest(self):
+        # override_settings reemplazaría el objeto que ya importaron simplejwt y authentication.py
+        with mock.patch.object(jwt_api_settings, 'CHECK_REVOKE_TOKEN', True):
+            token = self.access_token()
+            self.assertEqual(self.get_me(token).status_code, 200)
+            entry = user_cache().get(self.key)
+            self.assertEqual(entry['password'], get_md5_hash_password(self.user.password))
+            # Contraseña cambiada sin pasar por las señales: el token viejo no sirve
+            user_cache().set(self.key, {**entry, 'password': 'otro'})
+            self.assertEqual(self.get_me(token).status_code, 401)
+
+    def test_unrelated_update_keeps_cached_user(self):
+        self.get_me(self.access_token())
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            User.touch(pk=self.user.pk)
+        self.assertEqual(callbacks, [])
+        self.assertIsNotNone(user_cache().get(self.key))
+
+
+@override_settings(CREATOR_INDEX_CHECK_SECONDS=0)
+class CreatorIndexTests(TestCase):
+    def setUp(self):
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        # Cada test con su archivo: index_at guarda un índice por ruta
+        self.path = os.path.join(index_dir.name, 'creator_index.bin')
+        self.video = self.creator('video', 'video, edición')
+        self.photo = self.creator('foto', 'fotografía')
+        self.casual = self.creator('casual', '', bio='A veces grabo video')
+
+    def creator(self, username, specialties, bio=''):
+        user = User.objects.create_user(username, f'{username}@example.com', 'clave-segura-1',
+                                        is_creator=True, bio=bio)
+        CreatorProfile.objects.filter(user=user).update(specialties=specialties)
+        return user
+
+    def search(self, text, exclude=()):
+        recommendations = index_at(self.path).search(text, exclude)
+        return [user_id for user_id, _ in recommendations[0:len(recommendations)]]
+
+    def test_search_ranks_by_similarity(self):
+        build(self.path)
+        self.assertEqual(self.search('Video institucional'), [self.video.pk, self.casual.pk])
+        self.assertEqual(self.search('fotografía de producto'), [self.photo.pk])
+        self.assertEqual(self.search('Video institucional', exclude={self.video.pk}), [self.casual.pk])
+
+    def test_search_does_not_build_missing_index(self):
+        with self.assertRaises(IndexNotBuilt):
+            index_at(self.path).search('video')
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_changes_are_queued_until_worker_runs(self):
+        build(self.path)
+        # Las altas de setUp ya están en el archivo
+        CreatorIndexChange.objects.all().delete()
+        self.search('video')
+        profile = self.photo.creator_profile
+        profile.specialties = 'video, fotografía'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+            self.casual.is_active = False
+            self.casual.save()
+        self.assertEqual(set(CreatorIndexChange.objects.values_list('user_id', flat=True)),
+                         {self.photo.pk, self.casual.pk})
+        # El request no escribe el delta
+        self.assertEqual(self.search('video'), [self.video.pk, self.casual.pk])
+
+        call_command('update_creator_index', path=self.path, once=True)
+        self.assertFalse(CreatorIndexChange.objects.exists())
+        self.assertEqual(self.search('video'), [self.video.pk, self.photo.pk])
+
+    def test_worker_waits_for_index(self):
+        profile = self.photo.creator_profile
+        profile.specialties = 'video'
+        profile.save()
+        self.assertEqual(apply_changes(self.path), 0)
+        self.assertTrue(CreatorIndexChange.objects.filter(user_id=self.photo.pk).exists())
@@ -8,7 +8,7 @@ from .views import (
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
-router.register(r'creators', CreatorViewSet)
+router.register(r'creators', CreatorViewSet, basename='creator')
 router.register(r'creator-profiles', CreatorProfileViewSet)
 router.register(r'portfolio', PortfolioItemViewSet)
 router.register(r'social-networks', SocialNetworkViewSet)
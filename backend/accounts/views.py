@@ -11,20 +11,43 @@ from .serializers import (
     SocialNetworkSerializer, PasswordChangeSerializer
 )
 from .permissions import IsOwnerOrReadOnly
+from core.conditional import ConditionalGetMixin
+from core.db_router import ReplicaReadMixin
+from core.response_cache import ResponseCacheMixin
+from core.rows import RowListMixin
+from core.sparse import SparseFieldsViewMixin
+from core.timing import PhaseTimingMixin
 
 User = get_user_model()
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ReplicaReadMixin, SparseFieldsViewMixin, ResponseCacheMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para usuarios
     """
     queryset = User.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
     
+    def get_queryset(self):
+        queryset = User.objects.prefetch_related('social_networks').order_by('id')
+        if self.action == 'retrieve':
+            # El detalle de un creador usa CreatorUserSerializer
+            queryset = queryset.select_related('creator_profile').prefetch_related(
+                'creator_profile__portfolio_items'
+            )
+        return queryset
+    
+    def get_object(self):
+        # get_serializer_class ya busca el objeto; se reutiliza en la misma request
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return UserCreateSerializer
-        elif self.request and self.get_object().is_creator:
+        elif self.action == 'change_password':
+            return PasswordChangeSerializer
+        elif self.request and self.lookup_field in self.kwargs and self.get_object().is_creator:
             return CreatorUserSerializer
         return UserSerializer
     
@@ -49,8 +72,16 @@ class UserViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    def response_cache_tags(self):
+        if self.action == 'me':
+            return [f'user:{self.request.user.pk}']
+        return None
+    
     @action(detail=False, methods=['get'])
     def me(self, request):
+        return self.cached_response(self.me_response, request)
+    
+    def me_response(self, request):
         user = request.user
         if user.is_creator:
             serializer = CreatorUserSerializer(user)
@@ -58,34 +89,48 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer = UserSerializer(user)
         return Response(serializer.data)
 
-class CreatorViewSet(viewsets.ReadOnlyModelViewSet):
+class CreatorViewSet(ReplicaReadMixin, SparseFieldsViewMixin, ResponseCacheMixin, ConditionalGetMixin, RowListMixin, PhaseTimingMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint para listar y ver creadores
     """
-    queryset = User.objects.filter(is_creator=True)
+    queryset = User.objects.filter(is_creator=True).select_related('creator_profile').prefetch_related(
+        'social_networks', 'creator_profile__portfolio_items'
+    ).order_by('id')
     serializer_class = CreatorUserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    
+    def visibility_scope(self):
+        # El listado de creadores es el mismo para todos los usuarios
+        return 'all'
+    
+    def response_cache_tags(self):
+        if self.action == 'retrieve':
+            return [f'user:{self.kwargs[self.lookup_field]}']
+        return ['creators']
 
-class CreatorProfileViewSet(viewsets.ModelViewSet):
+class CreatorProfileViewSet(ReplicaReadMixin, SparseFieldsViewMixin, ConditionalGetMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para perfiles de creadores
     """
     queryset = CreatorProfile.objects.all()
     serializer_class = CreatorProfileSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    # El portafolio y los cambios del perfil actualizan al usuario
+    conditional_timestamps = ('user__updated_at',)
     
     def get_queryset(self):
         """
         Si no es staff, solo puede ver el propio perfil si es creador
         """
         user = self.request.user
+        queryset = CreatorProfile.objects.select_related('user').prefetch_related('portfolio_items').order_by('id')
         if user.is_staff:
-            return CreatorProfile.objects.all()
+            return queryset
         if user.is_creator:
-            return CreatorProfile.objects.filter(user=user)
+            return queryset.filter(user=user)
         return CreatorProfile.objects.none()
 
-class PortfolioItemViewSet(viewsets.ModelViewSet):
+class PortfolioItemViewSet(ReplicaReadMixin, SparseFieldsViewMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para items del portafolio de un creador
     """
@@ -123,7 +168,7 @@ class PortfolioItemViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class SocialNetworkViewSet(viewsets.ModelViewSet):
+class SocialNetworkViewSet(ReplicaReadMixin, SparseFieldsViewMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para redes sociales de un usuario
     """
@@ -13,5 +13,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Las settings eligen el manejo de conexiones según la interfaz (ver DB_CONNECTION_MODE)
+os.environ['SERVER_INTERFACE'] = 'asgi'
 
 application = get_asgi_application()
+
+# El chat en tiempo real (projects/realtime.py) no funciona con InProcessPubSub y
+# varios workers: mejor no arrancar
+from core.pubsub import check_workers  # noqa: E402
+
+check_workers()
@@ -0,0 +1,160 @@
+"""
+Backend de PostgreSQL con un pool de conexiones en el proceso.
+
+Se activa con ``DB_CONNECTION_MODE=pool``. Django sigue "abriendo" y "cerrando"
+una conexión por request (``CONN_MAX_AGE=0``), pero abrir toma una conexión
+libre del pool y cerrar la devuelve. Sirve cuando cada worker atiende varias
+requests a la vez (gunicorn con ``--threads`` o ASGI): los hilos comparten
+``POOL['SIZE']`` conexiones en vez de tener una cada uno.
+
+Opciones en ``DATABASES[alias]['POOL']``:
+
+- ``SIZE``: conexiones máximas por proceso.
+- ``TIMEOUT``: segundos que se espera una conexión libre antes de fallar.
+- ``MAX_LIFETIME``: segundos tras los cuales una conexión se cierra en vez de
+  volver al pool (p. ej. para repartir carga después de un failover).
+"""
+
+import os
+import threading
+import time
+
+from django.db import OperationalError
+from django.db.backends.postgresql import base
+
+from core import dbmetrics
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, alias, size, timeout, max_lifetime, health_checks):
+        self.alias = alias
+        self.size = size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_checks = health_checks
+        self.pid = os.getpid()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        # Pila de (conexión, momento en que se abrió): se reutiliza la más reciente
+        self._idle = []
+        self._opened_at = {}
+        self._in_use = 0
+        dbmetrics.register_pool(alias, self.gauges)
+
+    def gauges(self):
+        with self._lock:
+            return {'size': self.size, 'in_use': self._in_use, 'idle': len(self._idle)}
+
+    def getconn(self, connect):
+        """Devuelve (conexión, True si se acaba de abrir)"""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            dbmetrics.record_pool_timeout(self.alias)
+            raise OperationalError(
+                f"No hay conexiones libres en el pool de '{self.alias}' "
+                f"después de {self.timeout} s (DB_POOL_SIZE={self.size})"
+            )
+        dbmetrics.record_pool_wait(self.alias, time.perf_counter() - start)
+
+        try:
+            while True:
+                with self._lock:
+                    connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    connection = connect()
+                    dbmetrics.record_pool_open(self.alias)
+                    created = True
+                    with self._lock:
+                        self._opened_at[id(connection)] = time.monotonic()
+                    break
+                if self.is_usable(connection):
+                    created = False
+                    break
+                self.discard(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+        return connection, created
+
+    def putconn(self, connection):
+        with self._lock:
+            self._in_use -= 1
+        try:
+            opened_at = self._opened_at.get(id(connection), 0)
+            if connection.closed or time.monotonic() - opened_at > self.max_lifetime:
+                self.discard(connection)
+                return
+            try:
+                # Una conexión devuelta a mitad de una transacción no puede quedar así
+                connection.rollback()
+            except base.Database.Error:
+                self.discard(connection)
+                return
+            with self._lock:
+                self._idle.append(connection)
+        finally:
+            self._slots.release()
+
+    def is_usable(self, connection):
+        if connection.closed:
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except base.Database.Error:
+            return False
+        return True
+
+    def discard(self, connection):
+        with self._lock:
+            self._opened_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except base.Database.Error:
+            pass
+        dbmetrics.record_pool_close(self.alias)
+
+
+def get_pool(alias, settings_dict):
+    """Pool del alias para este proceso; uno nuevo si el proceso se bifurcó"""
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            options = settings_dict.get('POOL', {})
+            pool = _pools[alias] = ConnectionPool(
+                alias,
+                size=options.get('SIZE', 10),
+                timeout=options.get('TIMEOUT', 5),
+                max_lifetime=options.get('MAX_LIFETIME', 1800),
+                health_checks=settings_dict.get('CONN_HEALTH_CHECKS', True),
+            )
+        return pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        connection, created = self.pool.getconn(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+        )
+        if not created:
+            # super() lo asigna al conectar; hay que reponerlo al reutilizar
+            self.isolation_level = base.IsolationLevel(
+                self.settings_dict['OPTIONS'].get('isolation_level', base.IsolationLevel.READ_COMMITTED)
+            )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            self.pool.putconn(self.connection)
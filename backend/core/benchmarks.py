@@ -0,0 +1,116 @@
+"""
+Utilidades compartidas por los comandos de benchmark y de presupuesto de consultas.
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+from .querycount import QueryRecorder
+
+
+def make_view(view_class, user, action='list', query_params=None):
+    """
+    Instancia un viewset como lo haría el router, sin pasar por HTTP, para poder
+    evaluar su ``get_queryset`` para un usuario concreto.
+    """
+    view = view_class()
+    view.request = SimpleNamespace(user=user, query_params=query_params or {})
+    view.action = action
+    view.kwargs = {}
+    view.format_kwarg = None
+    return view
+
+
+def measure(fn, repeat=5):
+    """
+    Ejecuta ``fn`` ``repeat`` veces y devuelve (mediana en ms, consultas por ejecución).
+    """
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with QueryRecorder() as recorder:
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = recorder.count
+    return statistics.median(timings), queries
+
+
+def percentiles(timings, *points):
+    """Percentiles (p. ej. 50, 99) de una lista de tiempos"""
+    if len(timings) < 2:
+        return [timings[0] if timings else 0.0 for _ in points]
+    cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return [cuts[point - 1] for point in points]
+
+
+def pick_users(staff=None, client=None, creator=None):
+    """
+    Usuarios representativos de cada rol en la base actual: los indicados por
+    username o, si no, el primer staff, el cliente con más proyectos y el creador
+    con más invitaciones.
+    """
+    User = get_user_model()
+
+    def by_username(username):
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario {username}")
+
+    users = {
+        'staff': (by_username(staff) if staff
+                  else User.objects.filter(is_staff=True).order_by('id').first()),
+        'client': (by_username(client) if client
+                   else User.objects.filter(is_creator=False, is_staff=False)
+                   .annotate(n=Count('client_projects')).order_by('-n').first()),
+        'creator': (by_username(creator) if creator
+                    else User.objects.filter(is_creator=True)
+                    .annotate(n=Count('invitations')).order_by('-n').first()),
+    }
+    missing = [role for role, user in users.items() if user is None]
+    if missing:
+        raise CommandError(f"La base no tiene usuarios para: {', '.join(missing)}")
+    return users
+
+
+@contextmanager
+def gunicorn_server(port, workers=2, threads=8, env=None):
+    """Levanta gunicorn con la configuración actual (más ``env``) mientras dure el bloque"""
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn', 'core.wsgi:application',
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(workers),
+            '--threads', str(threads),
+            '--log-level', 'warning',
+        ],
+        cwd=settings.BASE_DIR, env=dict(os.environ, **(env or {})),
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if server.poll() is not None:
+                    raise CommandError("gunicorn terminó al arrancar")
+                if time.monotonic() > deadline:
+                    raise CommandError("gunicorn no respondió a tiempo")
+                time.sleep(0.2)
+        yield server
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
@@ -0,0 +1,133 @@
+"""
+GET condicional (``ETag`` / ``Last-Modified``) para listados y detalles.
+
+- Listados: el ETag es el hash del cuerpo de la página. Se arma la respuesta
+  igual que sin validadores (el costo está acotado por el tamaño de página) y
+  lo que se ahorra con un 304 es el envío; con el caché de respuestas
+  (core/response_cache.py) el 304 sale de la entrada cacheada. No llevan
+  ``Last-Modified``: un borrado o un cambio de visibilidad no mueve el máximo
+  de ``updated_at``.
+- Detalles: las columnas de ``conditional_timestamps`` de la fila (la del
+  modelo y las de los objetos anidados, p. ej. ``client__updated_at``). Llevan
+  ``ETag`` y ``Last-Modified``. La consulta previa (solo esas columnas) se hace
+  únicamente si el cliente manda validadores; si no, se toman del objeto ya
+  cargado. El ETag incluye además la URL completa (``?fields=``, ...), el
+  formato de la respuesta y el alcance de visibilidad del usuario
+  (``visibility_scope``).
+
+Si el cliente manda ``If-None-Match`` (o, en detalles, ``If-Modified-Since``)
+y coincide, se responde 304 sin cuerpo.
+"""
+
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework.response import Response
+
+from .timing import phase
+
+
+class ConditionalGetMixin:
+    """Para viewsets: ETag en ``list`` y ETag + Last-Modified en ``retrieve``"""
+
+    # Columnas cuyo cambio cambia el detalle, incluidas las de objetos anidados
+    conditional_timestamps = ('updated_at',)
+
+    def visibility_scope(self):
+        """
+        Identifica el conjunto de filas que ve el usuario: dos usuarios con el mismo
+        alcance reciben la misma respuesta
+        """
+        user = self.request.user
+        return 'staff' if user.is_staff else f'user:{user.pk}'
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        # El ETag sale de la página ya armada: cuesta lo mismo que la respuesta y
+        # no una agregación sobre todo lo que ve el usuario
+        response = self.finalize_response(request, response, *args, **kwargs)
+        response.render()
+        etag = quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest())
+        if not_modified(request, etag, None):
+            response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return revalidate(response)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not has_validators(request):
+            # Sin validadores del cliente no hace falta la consulta previa: se
+            # calculan con el objeto ya cargado
+            instance = self.get_object()
+            state = {column: resolve(instance, column) for column in self.conditional_timestamps}
+            serializer = self.get_serializer(instance)
+            with phase('serialize'):
+                data = serializer.data
+            return self.with_validators(Response(data), state)
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            state = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values(*self.conditional_timestamps).first()
+        except (TypeError, ValueError, ValidationError):
+            state = None
+        if state is None:
+            # Que get_object responda el 404 como siempre
+            return super().retrieve(request, *args, **kwargs)
+        if not_modified(request, self.make_etag('detail', state), last_modified_of(state)):
+            return self.with_validators(HttpResponseNotModified(), state)
+        return self.with_validators(super().retrieve(request, *args, **kwargs), state)
+
+    def with_validators(self, response, state):
+        response['ETag'] = self.make_etag('detail', state)
+        last_modified = last_modified_of(state)
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return revalidate(response)
+
+    def make_etag(self, kind, state):
+        key = repr((
+            kind, self.visibility_scope(), self.request.get_full_path(),
+            self.request.accepted_renderer.format, sorted(state.items()),
+        ))
+        return quote_etag(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest())
+
+
+def revalidate(response):
+    """El navegador puede guardar la respuesta pero tiene que revalidarla siempre"""
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+def has_validators(request):
+    return 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
+
+
+def resolve(instance, column):
+    """Valor de ``client__updated_at`` en una instancia (con su select_related)"""
+    for attr in column.split('__'):
+        instance = getattr(instance, attr, None)
+    return instance
+
+
+def last_modified_of(state):
+    timestamps = [value for value in state.values() if value is not None]
+    return max(timestamps) if timestamps else None
+
+
+def not_modified(request, etag, last_modified):
+    """Si los validadores del cliente coinciden (If-None-Match tiene prioridad)"""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in (candidate.removeprefix('W/') for candidate in etags)
+    if last_modified is not None:
+        if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since'))
+        return if_modified_since is not None and int(last_modified.timestamp()) <= if_modified_since
+    return False
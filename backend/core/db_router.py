@@ -0,0 +1,145 @@
+"""
+Lecturas desde réplicas con read-your-writes.
+
+Con ``DATABASE_REPLICA_URLS`` configurado, los viewsets que usan
+``ReplicaReadMixin`` leen de una réplica en los métodos seguros (GET, HEAD,
+OPTIONS). Todo lo demás va al primario:
+
+- escrituras y lecturas dentro de requests que escriben;
+- lecturas dentro de una transacción abierta en el primario;
+- lecturas de un usuario que escribió hace menos de ``READ_YOUR_WRITES_SECONDS``
+  (así quien acaba de enviar una propuesta la ve en el listado);
+- lecturas cuando ninguna réplica está dentro de ``REPLICA_MAX_LAG_SECONDS``
+  de atraso o no responde.
+
+La marca de "escribió hace poco" se guarda en el cache por defecto, que tiene
+que ser compartido para que la marca se vea en todos los procesos: los settings
+no aceptan réplicas con un cache local.
+"""
+
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework import permissions
+
+logger = logging.getLogger('core.db_router')
+
+# Alias desde donde leer en la request actual; None significa el primario
+_read_alias = ContextVar('read_alias', default=None)
+
+# Atraso medido por réplica: alias -> (momento de la medición, segundos de atraso)
+_lag_cache = {}
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def pin_key(user_id):
+    return f'db:primary-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """Hace que las lecturas de ``user`` vayan al primario durante la ventana configurada"""
+    if user is not None and user.is_authenticated:
+        cache.set(pin_key(user.pk), True, settings.READ_YOUR_WRITES_SECONDS)
+
+
+def is_pinned(user):
+    return user is not None and user.is_authenticated and cache.get(pin_key(user.pk), False)
+
+
+def replica_lag(alias):
+    """
+    Segundos de atraso de la réplica, medidos como mucho cada
+    ``REPLICA_LAG_CHECK_SECONDS``. ``None`` si la réplica no responde.
+    """
+    now = time.monotonic()
+    checked_at, lag = _lag_cache.get(alias, (None, None))
+    if checked_at is not None and now - checked_at < settings.REPLICA_LAG_CHECK_SECONDS:
+        return lag
+
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Si la réplica ya aplicó todo lo recibido está al día aunque
+                # la última transacción sea vieja (primario sin escrituras).
+                # Las funciones dan NULL cuando el servidor no es un standby.
+                cursor.execute(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+                    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                )
+                lag = float(cursor.fetchone()[0])
+            else:
+                # Sin forma de medir el atraso: alcanza con que responda
+                cursor.execute("SELECT 1")
+                lag = 0.0
+    except DatabaseError:
+        logger.warning("La réplica %s no responde; se lee del primario", alias, exc_info=True)
+        lag = None
+    _lag_cache[alias] = (now, lag)
+    return lag
+
+
+def choose_replica():
+    """Una réplica al azar entre las que están al día, o None para usar el primario"""
+    healthy = []
+    for alias in replica_aliases():
+        lag = replica_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS:
+            healthy.append(alias)
+        elif lag is not None:
+            logger.info("La réplica %s tiene %.1f s de atraso; se lee del primario", alias, lag)
+    return random.choice(healthy) if healthy else None
+
+
+class ReplicaRouter:
+    """Escrituras al primario; lecturas a la réplica elegida para la request, si hay"""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplicas tienen los mismos datos
+        return True
+
+
+class ReplicaReadMixin:
+    """
+    Para viewsets: lee de una réplica en los métodos seguros y, después de una
+    escritura exitosa, fija las lecturas del usuario al primario.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        # super().initial autentica: recién ahí se conoce al usuario
+        super().initial(request, *args, **kwargs)
+        if not replica_aliases():
+            return
+        if request.method in permissions.SAFE_METHODS and not is_pinned(request.user):
+            alias = choose_replica()
+            if alias is not None:
+                self._read_alias_token = _read_alias.set(alias)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+        finally:
+            token = getattr(self, '_read_alias_token', None)
+            if token is not None:
+                _read_alias.reset(token)
+                del self._read_alias_token
+        if replica_aliases() and request.method not in permissions.SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(getattr(self.request, 'user', None))
+        return response
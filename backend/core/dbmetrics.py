@@ -0,0 +1,109 @@
+"""
+Métricas de conexiones a la base de datos, por proceso.
+
+- ``connects``: conexiones que Django abrió (o tomó del pool). Con
+  ``DB_CONNECTION_MODE=per-request`` crece una vez por request; con conexiones
+  persistentes o pool debería quedarse casi quieto.
+- ``pool``: solo con el backend ``core.backends.postgresql_pool``. Conexiones
+  físicas abiertas y cerradas, préstamos, esperas por una conexión libre
+  (p50/p99/máximo) y préstamos que agotaron ``DB_POOL_TIMEOUT``.
+
+Se consultan en ``/api/metrics/db/`` (solo staff). Cada worker tiene sus
+propios contadores: la respuesta corresponde al proceso que atendió la request.
+"""
+
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.db.backends.signals import connection_created
+
+# Cantidad de esperas recientes usadas para los percentiles
+WAIT_SAMPLES = 1000
+
+_lock = threading.Lock()
+_started = time.monotonic()
+_connects = defaultdict(int)
+_pools = defaultdict(lambda: {
+    'opened': 0,
+    'closed': 0,
+    'checkouts': 0,
+    'timeouts': 0,
+    'wait_ms_total': 0.0,
+    'wait_ms_max': 0.0,
+    'waits': deque(maxlen=WAIT_SAMPLES),
+})
+# alias -> función que devuelve el estado actual del pool (en uso, libres)
+_gauges = {}
+
+
+def record_connect(sender, connection, **kwargs):
+    with _lock:
+        _connects[connection.alias] += 1
+
+
+connection_created.connect(record_connect, dispatch_uid='core.dbmetrics.record_connect')
+
+
+def register_pool(alias, gauges):
+    with _lock:
+        _gauges[alias] = gauges
+
+
+def record_pool_open(alias):
+    with _lock:
+        _pools[alias]['opened'] += 1
+
+
+def record_pool_close(alias):
+    with _lock:
+        _pools[alias]['closed'] += 1
+
+
+def record_pool_wait(alias, seconds):
+    wait_ms = seconds * 1000
+    with _lock:
+        pool = _pools[alias]
+        pool['checkouts'] += 1
+        pool['wait_ms_total'] += wait_ms
+        pool['wait_ms_max'] = max(pool['wait_ms_max'], wait_ms)
+        pool['waits'].append(wait_ms)
+
+
+def record_pool_timeout(alias):
+    with _lock:
+        _pools[alias]['timeouts'] += 1
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[round(fraction * 100) - 1]
+
+
+def snapshot():
+    """Estado actual de los contadores de este proceso"""
+    with _lock:
+        connects = dict(_connects)
+        pools = {alias: dict(pool, waits=list(pool['waits'])) for alias, pool in _pools.items()}
+        gauges = dict(_gauges)
+
+    for alias, pool in pools.items():
+        if alias in gauges:
+            pool.update(gauges[alias]())
+        waits = pool.pop('waits')
+        pool['wait_ms_p50'] = round(percentile(waits, 0.50), 3)
+        pool['wait_ms_p99'] = round(percentile(waits, 0.99), 3)
+        pool['wait_ms_total'] = round(pool['wait_ms_total'], 3)
+        pool['wait_ms_max'] = round(pool['wait_ms_max'], 3)
+
+    return {
+        'pid': os.getpid(),
+        'uptime_seconds': round(time.monotonic() - _started, 1),
+        'connects': connects,
+        'pool': pools,
+    }
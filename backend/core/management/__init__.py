@@ -0,0 +1 @@
+# El archivo __init__.py indica a Python que este directorio debe tratarse como un paquete
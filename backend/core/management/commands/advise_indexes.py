@@ -0,0 +1,65 @@
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import make_view, pick_users
+from .check_query_budgets import ROLES, iter_get_routes
+
+# Recorridos completos de tabla según el motor: PostgreSQL y SQLite
+SEQ_SCAN_PATTERNS = (
+    re.compile(r'Seq Scan on (\w+)'),
+    re.compile(r'\bSCAN (\w+)\b(?! USING)'),
+)
+SORT_PATTERNS = (
+    re.compile(r'\bSort\b'),
+    re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN sobre el get_queryset de cada listado de la API, para cada rol, "
+        "y señala recorridos secuenciales y ordenamientos sin índice. Usar contra una "
+        "base con volumen real (ver seed_marketplace): con pocas filas el planificador "
+        "prefiere recorrer la tabla aunque exista el índice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--staff', help="Usuario staff a usar (por defecto el primero)")
+        parser.add_argument('--client', help="Cliente a usar (por defecto el que tiene más proyectos)")
+        parser.add_argument('--creator', help="Creador a usar (por defecto el que tiene más invitaciones)")
+        parser.add_argument('--fail-on-seq-scan', action='store_true',
+                            help="Terminar con error si algún plan recorre una tabla completa")
+
+    def handle(self, *args, **options):
+        users = pick_users(options['staff'], options['client'], options['creator'])
+        page = slice(0, settings.REST_FRAMEWORK['PAGE_SIZE'])
+        flagged = 0
+
+        for route, view_class, lookup in iter_get_routes():
+            if lookup or not route.endswith('-list'):
+                continue
+            for role in ROLES:
+                queryset = make_view(view_class, users[role]).get_queryset()[page]
+                if queryset.query.is_empty():
+                    self.stdout.write(f"{route:<30} {role:<8} sin consulta")
+                    continue
+                plan = queryset.explain()
+                scans = sorted({match for pattern in SEQ_SCAN_PATTERNS for match in pattern.findall(plan)})
+                sorts = any(pattern.search(plan) for pattern in SORT_PATTERNS)
+
+                if scans:
+                    flagged += 1
+                    self.stdout.write(self.style.WARNING(
+                        f"{route:<30} {role:<8} recorrido secuencial: {', '.join(scans)}"
+                    ))
+                    if options['verbosity'] > 1:
+                        self.stdout.write(plan)
+                else:
+                    self.stdout.write(f"{route:<30} {role:<8} ok")
+                if sorts:
+                    self.stdout.write(f"{'':<30} {'':<8} ordena sin índice")
+
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(f"{flagged} consultas con recorrido secuencial")
@@ -0,0 +1,114 @@
+import http.client
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.benchmarks import gunicorn_server, percentiles
+
+User = get_user_model()
+
+BENCH_USERNAME = 'bench-connections'
+BENCH_PASSWORD = 'bench-connections-password'
+
+
+class Command(BaseCommand):
+    help = (
+        "Levanta gunicorn con cada DB_CONNECTION_MODE y mide la latencia (p50/p99) "
+        "y el throughput de un endpoint autenticado bajo carga concurrente. Usa la "
+        "base configurada en DATABASE_URL, que tiene que estar migrada."
+    )
+
+    def add_arguments(self, parser):
+        modes = ['per-request', 'persistent']
+        if connection.vendor == 'postgresql':
+            modes.append('pool')
+        parser.add_argument('--modes', nargs='+', default=modes)
+        parser.add_argument('--path', default='/api/accounts/users/me/')
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        self.ensure_user()
+        self.stdout.write(
+            f"{'modo':<12}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errores':>9}"
+        )
+        for mode in options['modes']:
+            env = {'DB_CONNECTION_MODE': mode, 'QUERY_INSTRUMENTATION': 'False'}
+            with gunicorn_server(options['port'], options['workers'], options['threads'], env):
+                result = self.run_load(options)
+            self.stdout.write(
+                f"{mode:<12}{result['throughput']:>10.0f}{result['p50']:>10.2f}"
+                f"{result['p99']:>10.2f}{result['errors']:>9}"
+            )
+
+    def ensure_user(self):
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME, defaults={'email': 'bench@example.com'})
+        user.set_password(BENCH_PASSWORD)
+        user.save()
+
+    def run_load(self, options):
+        port = options['port']
+        token = self.obtain_token(port)
+        headers = {'Authorization': f'Bearer {token}'}
+        concurrency = options['concurrency']
+        per_client = max(1, options['requests'] // concurrency)
+
+        def client(_):
+            # Una conexión keep-alive por cliente, como un balanceador delante
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            timings, errors = [], 0
+            for _ in range(per_client):
+                start = time.perf_counter()
+                try:
+                    conn.request('GET', options['path'], headers=headers)
+                    response = conn.getresponse()
+                    response.read()
+                    ok = response.status == 200
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                    ok = False
+                timings.append((time.perf_counter() - start) * 1000)
+                errors += not ok
+            conn.close()
+            return timings, errors
+
+        # Calentamiento: que cada worker importe todo y abra sus conexiones
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(lambda _: self.get(port, options['path'], headers), range(concurrency * 2)))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(client, range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        timings = sorted(t for result in results for t in result[0])
+        p50, p99 = percentiles(timings, 50, 99)
+        return {
+            'throughput': len(timings) / elapsed,
+            'p50': p50,
+            'p99': p99,
+            'errors': sum(result[1] for result in results),
+        }
+
+    def obtain_token(self, port):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        body = json.dumps({'username': BENCH_USERNAME, 'password': BENCH_PASSWORD})
+        conn.request('POST', '/api/token/', body=body, headers={'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        if response.status != 200:
+            raise CommandError(f"No se pudo obtener el token: {response.status} {response.read()[:200]}")
+        return json.loads(response.read())['access']
+
+    def get(self, port, path, headers):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        conn.request('GET', path, headers=headers)
+        conn.getresponse().read()
+        conn.close()
@@ -0,0 +1,319 @@
+import http.client
+import json
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.benchmarks import gunicorn_server, percentiles, pick_users
+from core.querycount import QueryRecorder
+from projects.models import Convocatoria, ConvocatoriaApplication
+from .check_query_budgets import ROLES, first_visible_object, iter_get_routes
+
+# Métricas que se muestran al comparar con --baseline
+COMPARED = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_per_request')
+# Rutas GET propias de core/urls.py y los roles que pueden verlas
+CORE_ROUTES = (
+    ('dashboard-summary', ROLES),
+    ('db-metrics', ('staff',)),
+    ('cache-metrics', ('staff',)),
+)
+
+
+class Scenario:
+    """Una ruta llamada como un rol. ``body`` y ``after`` reciben el estado del hilo."""
+
+    def __init__(self, name, method, path, user=None, body=None, after=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.user = user
+        self.body = body
+        self.after = after
+
+    def headers(self):
+        if self.user is None:
+            return {}
+        return {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+
+class TestClientTransport:
+    """Requests dentro del proceso con el test client; cuenta consultas con QueryRecorder"""
+
+    def session(self):
+        return Client()
+
+    def send(self, session, method, path, headers, body):
+        extra = {f"HTTP_{key.upper().replace('-', '_')}": value for key, value in headers.items()}
+        with QueryRecorder() as recorder:
+            response = session.generic(
+                method, path, data=json.dumps(body) if body is not None else '',
+                content_type='application/json', **extra
+            )
+        return response.status_code, recorder.count, response.content
+
+    def close(self, session):
+        connections.close_all()
+
+
+class HttpTransport:
+    """
+    Requests HTTP a un gunicorn local; las consultas salen de ``X-DB-Query-Count``
+    (None si el servidor no lo manda)
+    """
+
+    def __init__(self, port):
+        self.port = port
+
+    def session(self):
+        return http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+
+    def send(self, session, method, path, headers, body):
+        headers = dict(headers, **{'Content-Type': 'application/json'})
+        session.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        response = session.getresponse()
+        content = response.read()
+        query_count = response.getheader('X-DB-Query-Count')
+        return response.status, int(query_count) if query_count is not None else None, content
+
+    def close(self, session):
+        session.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide latencia (p50/p95/p99), throughput y consultas por request de cada ruta "
+        "de la API (token, dashboard, métricas, accounts y projects) para cada rol, sobre la base actual "
+        "(ver seed_marketplace). Escribe un JSON y, con --baseline, lo compara con una "
+        "corrida anterior."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transport', choices=['client', 'gunicorn'], default='client',
+                            help="Test client en el proceso o un gunicorn local")
+        parser.add_argument('--requests', type=int, default=100, help="Requests por ruta y rol")
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--warmup', type=int, default=3, help="Requests descartadas por ruta")
+        parser.add_argument('--routes', nargs='+', help="Solo estas rutas (por nombre, p. ej. project-list)")
+        parser.add_argument('--roles', nargs='+', choices=ROLES, default=list(ROLES))
+        parser.add_argument('--staff')
+        parser.add_argument('--client')
+        parser.add_argument('--creator')
+        parser.add_argument('--password', default='seed-password',
+                            help="Contraseña de los usuarios, para /api/token/")
+        parser.add_argument('--output', help="Archivo donde guardar el JSON (por defecto, stdout)")
+        parser.add_argument('--baseline', help="JSON de una corrida anterior con el que comparar")
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help="Con --baseline, %% de empeoramiento de p95 que hace fallar el comando")
+        parser.add_argument('--port', type=int, default=8766)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=4)
+
+    def handle(self, *args, **options):
+        users = pick_users(options['staff'], options['client'], options['creator'])
+        scenarios = [
+            scenario for scenario in self.scenarios(users, options)
+            if not options['routes'] or scenario.name.split(' ')[0] in options['routes']
+        ]
+        if not scenarios:
+            raise CommandError("Ninguna ruta coincide con --routes")
+
+        if options['transport'] == 'gunicorn':
+            env = {'QUERY_INSTRUMENTATION': 'True', 'CORE_LOG_LEVEL': 'WARNING'}
+            with gunicorn_server(options['port'], options['workers'], options['threads'], env):
+                results = self.run(HttpTransport(options['port']), scenarios, options)
+        else:
+            setup_test_environment()
+            try:
+                results = self.run(TestClientTransport(), scenarios, options)
+            finally:
+                teardown_test_environment()
+
+        report = {
+            'meta': {
+                'transport': options['transport'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'routes': results,
+        }
+        serialized = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(serialized + '\n')
+        elif not options['baseline']:
+            self.stdout.write(serialized)
+
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['threshold'], partial=bool(options['routes']))
+
+    def scenarios(self, users, options):
+        client = users['client']
+        yield Scenario(
+            'token_obtain_pair', 'POST', reverse('token_obtain_pair'),
+            body=lambda state: {'username': client.username, 'password': options['password']},
+        )
+
+        def refresh_body(state):
+            if 'refresh' not in state:
+                state['refresh'] = str(RefreshToken.for_user(client))
+            return {'refresh': state['refresh']}
+
+        def keep_rotated(state, content):
+            # Con ROTATE_REFRESH_TOKENS cada respuesta trae el refresh a usar después
+            refresh = json.loads(content).get('refresh')
+            if refresh:
+                state['refresh'] = refresh
+
+        yield Scenario('token_refresh', 'POST', reverse('token_refresh'), body=refresh_body, after=keep_rotated)
+
+        for route, roles in CORE_ROUTES:
+            for role in options['roles']:
+                if role in roles:
+                    yield Scenario(f'{route} [{role}]', 'GET', reverse(route), user=users[role])
+
+        for route, view_class, lookup in iter_get_routes():
+            for role in options['roles']:
+                user = users[role]
+                kwargs = {}
+                if lookup:
+                    obj = first_visible_object(view_class, user)
+                    if obj is None:
+                        continue
+                    kwargs[lookup] = obj.pk
+                yield Scenario(f'{route} [{role}]', 'GET', reverse(route, kwargs=kwargs), user=user)
+
+        # El ranking de la convocatoria con más aplicaciones, como su cliente: la
+        # ruta de arriba usa la primera convocatoria visible, que puede tener pocas
+        largest = (
+            ConvocatoriaApplication.objects.values('convocatoria').annotate(applications=Count('pk'))
+            .order_by('-applications').values_list('convocatoria', flat=True).first()
+        )
+        if largest is not None:
+            convocatoria = Convocatoria.objects.select_related('client').get(pk=largest)
+            yield Scenario('convocatoria-ranked [mayor]', 'GET', reverse('convocatoria-ranked', args=[largest]),
+                           user=convocatoria.client)
+
+    def run(self, transport, scenarios, options):
+        results = {}
+        for scenario in scenarios:
+            results[scenario.name] = self.run_scenario(transport, scenario, options)
+            result = results[scenario.name]
+            queries = result['queries_per_request']
+            self.stderr.write(
+                f"{scenario.name:<44} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                f"{result['p99_ms']:>8.2f} ms {result['throughput_rps']:>8.1f} req/s "
+                + (f"{queries:>6.1f} consultas" if queries is not None else f"{'-':>6} consultas")
+                + (f" {result['errors']} errores" if result['errors'] else '')
+            )
+        return results
+
+    def run_scenario(self, transport, scenario, options):
+        headers = scenario.headers()
+        concurrency = max(1, options['concurrency'])
+        remaining = [options['requests']]
+        lock = threading.Lock()
+
+        def take():
+            with lock:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+                return True
+
+        def worker(index):
+            session = transport.session()
+            state = {}
+            timings, queries, errors = [], [], 0
+            try:
+                for _ in range(options['warmup'] if index == 0 else 0):
+                    self.call(transport, session, scenario, headers, state)
+                while take():
+                    start = time.perf_counter()
+                    status, query_count = self.call(transport, session, scenario, headers, state)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    queries.append(query_count)
+                    errors += status >= 400
+            finally:
+                transport.close(session)
+            return timings, queries, errors
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            outcomes = list(pool.map(worker, range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        timings = sorted(t for outcome in outcomes for t in outcome[0])
+        # Sin X-DB-Query-Count no se sabe cuántas consultas hubo: no entran al promedio
+        queries = [q for outcome in outcomes for q in outcome[1] if q is not None]
+        p50, p95, p99 = percentiles(timings, 50, 95, 99)
+        return {
+            'requests': len(timings),
+            'errors': sum(outcome[2] for outcome in outcomes),
+            'p50_ms': round(p50, 3),
+            'p95_ms': round(p95, 3),
+            'p99_ms': round(p99, 3),
+            'throughput_rps': round(len(timings) / elapsed, 2) if elapsed else 0.0,
+            'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        }
+
+    def call(self, transport, session, scenario, headers, state):
+        body = scenario.body(state) if scenario.body else None
+        status, queries, content = transport.send(session, scenario.method, scenario.path, headers, body)
+        if scenario.after and status < 400:
+            scenario.after(state, content)
+        return status, queries
+
+    def compare(self, results, baseline_path, threshold, partial=False):
+        try:
+            with open(baseline_path, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)['routes']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"No se pudo leer la línea base {baseline_path}: {exc}")
+
+        regressions = []
+        self.stdout.write(f"{'ruta':<44}" + ''.join(f"{key:>22}" for key in COMPARED))
+        for name, current in results.items():
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f"{name:<44} (nueva)")
+                continue
+            cells = []
+            for key in COMPARED:
+                old, new = before.get(key), current[key]
+                if old is None or new is None:
+                    cells.append(f"{format_metric(old, 8)} → {format_metric(new, 7)}      ")
+                    continue
+                change = (new - old) / old * 100 if old else 0.0
+                cells.append(f"{old:>8.1f} → {new:>7.1f} {change:>+4.0f}%")
+            self.stdout.write(f"{name:<44}" + ''.join(f"{cell:>22}" for cell in cells))
+
+            if before.get('p95_ms') and (current['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 > threshold:
+                regressions.append(f"{name}: p95 {before['p95_ms']:.1f} → {current['p95_ms']:.1f} ms")
+            old_queries, new_queries = before.get('queries_per_request'), current['queries_per_request']
+            if old_queries is not None and new_queries is not None and new_queries > old_queries:
+                regressions.append(
+                    f"{name}: consultas {old_queries} → {new_queries}"
+                )
+
+        missing = [] if partial else sorted(set(baseline) - set(results))
+        for name in missing:
+            self.stdout.write(f"{name:<44} (ya no se mide)")
+        if regressions:
+            raise CommandError(f"{len(regressions)} empeoramientos:\n" + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS("Sin empeoramientos respecto de la línea base"))
+
+
+def format_metric(value, width):
+    return f"{value:>{width}.1f}" if value is not None else f"{'-':>{width}}"
@@ -0,0 +1,186 @@
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.creator_index import build as build_creator_index
+from core.benchmarks import make_view
+from core.querycount import QueryRecorder, load_budgets
+
+User = get_user_model()
+
+ROUTE_MODULES = ('accounts.urls', 'projects.urls')
+ROLES = ('staff', 'client', 'creator')
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta cada ruta GET de accounts.urls y projects.urls contra una base de "
+        "prueba y falla si alguna supera su presupuesto de consultas"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budgets', default=None,
+                            help="Archivo de presupuestos (por defecto QUERY_BUDGETS_FILE)")
+        parser.add_argument('--rows', type=int, default=6,
+                            help="Filas por relación en los datos de prueba")
+        parser.add_argument('--update', action='store_true',
+                            help="Reescribe el archivo con los valores medidos")
+
+    def handle(self, *args, **options):
+        budgets_path = options['budgets'] or settings.QUERY_BUDGETS_FILE
+        budgets = load_budgets(budgets_path)
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        # El índice de creadores de la base de prueba no pisa el de la real
+        index_dir = tempfile.TemporaryDirectory()
+        try:
+            with override_settings(CREATOR_INDEX_PATH=os.path.join(index_dir.name, 'creator_index.bin')):
+                users = build_fixture(options['rows'])
+                # Como en un deploy: la primera request no construye el índice
+                build_creator_index(settings.CREATOR_INDEX_PATH)
+                # Se mide el trabajo de cada ruta, no los aciertos del caché de respuestas
+                with override_settings(RESPONSE_CACHE=False):
+                    measured, failures = self.measure(users, budgets)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            index_dir.cleanup()
+
+        if options['update']:
+            with open(budgets_path, 'w', encoding='utf-8') as budgets_file:
+                json.dump(measured, budgets_file, indent=2, sort_keys=True)
+                budgets_file.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Presupuestos actualizados en {budgets_path}"))
+            return
+
+        if failures:
+            raise CommandError(f"{len(failures)} rutas fuera de presupuesto:\n" + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS("Todas las rutas dentro del presupuesto"))
+
+    def measure(self, users, budgets):
+        measured = {}
+        failures = []
+        client = APIClient()
+
+        for route, view_class, lookup in iter_get_routes():
+            for role in ROLES:
+                user = users[role]
+                kwargs = {}
+                if lookup:
+                    obj = first_visible_object(view_class, user)
+                    if obj is None:
+                        continue
+                    kwargs[lookup] = obj.pk
+
+                client.force_authenticate(user)
+                with QueryRecorder() as recorder:
+                    response = client.get(reverse(route, kwargs=kwargs))
+                measured.setdefault(route, {})[role] = recorder.count
+
+                limit = budgets.get(route, {}).get(role)
+                line = f"{route:<32} {role:<8} {response.status_code} {recorder.count:>4} consultas {recorder.total_time * 1000:8.2f} ms"
+                if response.status_code >= 500:
+                    failures.append(f"{route} ({role}): respuesta {response.status_code}")
+                elif limit is None:
+                    failures.append(f"{route} ({role}): sin presupuesto, medido {recorder.count}")
+                elif recorder.count > limit:
+                    failures.append(f"{route} ({role}): {recorder.count} consultas, presupuesto {limit}")
+                    for sql, times in recorder.duplicates():
+                        failures.append(f"    {times}x {sql}")
+                self.stdout.write(line)
+
+        client.force_authenticate(None)
+        return measured, failures
+
+
+def iter_get_routes():
+    """Rutas con método GET de los routers de la API: (nombre, viewset, kwarg de lookup)"""
+    seen = set()
+    for module in ROUTE_MODULES:
+        for pattern in import_module(module).router.urls:
+            actions = getattr(pattern.callback, 'actions', None)
+            if not actions or 'get' not in actions or pattern.name in seen:
+                continue
+            seen.add(pattern.name)
+            view_class = pattern.callback.cls
+            lookup = view_class.lookup_url_kwarg or view_class.lookup_field
+            if lookup not in pattern.pattern.regex.groupindex:
+                lookup = None
+            yield pattern.name, view_class, lookup
+
+
+def first_visible_object(view_class, user):
+    """Primer objeto que el usuario puede ver a través del queryset del viewset"""
+    return make_view(view_class, user, 'retrieve').get_queryset().order_by('pk').first()
+
+
+def build_fixture(rows):
+    """
+    Crea un marketplace pequeño pero con varias filas en cada relación, para que
+    un N+1 se note como consultas de más frente al presupuesto.
+    """
+    from accounts.models import CreatorPortfolioItem, SocialNetworkLink
+    from projects.models import (
+        Convocatoria, ConvocatoriaApplication, Project, ProjectInvitation,
+        ProjectMessage, ProjectProposal, ProjectReview
+    )
+
+    staff = User.objects.create_user('budget-staff', 'staff@example.com', 'x', is_staff=True)
+    client = User.objects.create_user('budget-client', 'client@example.com', 'x')
+    creators = [
+        User.objects.create_user(f'budget-creator-{i}', f'creator{i}@example.com', 'x', is_creator=True)
+        for i in range(rows)
+    ]
+
+    for user in [staff, client] + creators:
+        for network in ('instagram', 'tiktok'):
+            SocialNetworkLink.objects.create(user=user, network=network, url=f'https://{network}.com/{user.username}')
+    for creator in creators:
+        for i in range(2):
+            CreatorPortfolioItem.objects.create(
+                creator_profile=creator.creator_profile, type='image',
+                url=f'https://example.com/{creator.username}/{i}.jpg', title=f'Trabajo {i}'
+            )
+    # Creadores sin propuestas, invitaciones ni aplicaciones: los que se recomiendan
+    for i in range(rows):
+        free = User.objects.create_user(f'budget-free-{i}', f'free{i}@example.com', 'x', is_creator=True)
+        SocialNetworkLink.objects.create(user=free, network='instagram', url=f'https://instagram.com/{free.username}')
+        free.creator_profile.specialties = 'fotografía, video'
+        free.creator_profile.save()
+        CreatorPortfolioItem.objects.create(
+            creator_profile=free.creator_profile, type='image',
+            url=f'https://example.com/{free.username}.jpg', title='Fotografía de producto'
+        )
+
+    today = date.today()
+    for i in range(rows):
+        project = Project.objects.create(
+            title=f'Proyecto {i}', description='Descripción con fotografía', client=client,
+            status='completed' if i % 2 else 'open', is_public=i % 3 != 0, budget=1000
+        )
+        convocatoria = Convocatoria.objects.create(
+            title=f'Convocatoria {i}', description='Descripción con video', client=client,
+            deadline=today + timedelta(days=30), status='open', budget_min=100, budget_max=2000
+        )
+        for creator in creators:
+            ProjectProposal.objects.create(project=project, creator=creator, message='Hola',
+                                           price=500, estimated_days=10)
+            ProjectInvitation.objects.create(project=project, creator=creator, message='Te invito')
+            ConvocatoriaApplication.objects.create(convocatoria=convocatoria, creator=creator,
+                                                   cover_letter='Carta', price=700, estimated_days=12)
+            ProjectMessage.objects.create(project=project, sender=client, receiver=creator, content='Hola')
+            ProjectMessage.objects.create(project=project, sender=creator, receiver=client, content='Hola')
+            if project.status == 'completed' and i % 4 == 1:
+                ProjectReview.objects.create(project=project, client=client, creator=creator, rating=5)
+
+    return {'staff': staff, 'client': client, 'creator': creators[0]}
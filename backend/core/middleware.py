@@ -0,0 +1,54 @@
+import logging
+
+from django.conf import settings
+
+from .querycount import QueryRecorder
+
+logger = logging.getLogger('core.querycount')
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Registra cantidad de consultas, tiempo en base de datos y consultas repetidas
+    de cada request. Se activa con ``QUERY_INSTRUMENTATION`` y agrega los headers
+    ``X-DB-Query-Count`` y ``X-DB-Time-Ms`` a la respuesta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'QUERY_INSTRUMENTATION', False)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+
+        route = route_name(request)
+        db_time_ms = recorder.total_time * 1000
+        response['X-DB-Query-Count'] = str(recorder.count)
+        response['X-DB-Time-Ms'] = f"{db_time_ms:.2f}"
+
+        duplicates = recorder.duplicates()
+        logger.info(
+            "%s %s queries=%d db_ms=%.2f duplicates=%d",
+            request.method, route, recorder.count, db_time_ms, len(duplicates),
+            extra={
+                'route': route,
+                'query_count': recorder.count,
+                'db_time_ms': db_time_ms,
+            },
+        )
+        for sql, times in duplicates:
+            logger.warning("%s %s repite %d veces: %s", request.method, route, times, sql)
+
+        return response
+
+
+def route_name(request):
+    """Nombre de la ruta resuelta (p. ej. ``project-list``) o el path si no tiene"""
+    match = getattr(request, 'resolver_match', None)
+    if match and match.url_name:
+        return match.url_name
+    return request.path
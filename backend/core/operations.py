@@ -0,0 +1,40 @@
+"""
+Operaciones de migración para tablas grandes.
+
+``AddIndexConcurrently`` y ``RemoveIndexConcurrently`` de ``django.contrib.postgres``
+crean y borran índices sin bloquear las escrituras (``CREATE INDEX CONCURRENTLY``),
+pero solo funcionan en PostgreSQL. Estas variantes hacen lo mismo en PostgreSQL y
+caen en ``AddIndex``/``RemoveIndex`` en otros motores (SQLite en desarrollo). La
+migración que las usa tiene que declarar ``atomic = False``.
+"""
+
+from django.contrib.postgres import operations as postgres_operations
+from django.db import migrations
+
+
+def is_postgres(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+class AddIndexConcurrently(postgres_operations.AddIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not is_postgres(schema_editor):
+            return migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+        return super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not is_postgres(schema_editor):
+            return migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+        return super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class RemoveIndexConcurrently(postgres_operations.RemoveIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not is_postgres(schema_editor):
+            return migrations.RemoveIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+        return super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not is_postgres(schema_editor):
+            return migrations.RemoveIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+        return super().database_backwards(app_label, schema_editor, from_state, to_state)
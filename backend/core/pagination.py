@@ -0,0 +1,168 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor sobre (created_at, id), sin COUNT(*) ni OFFSET.
+
+    - ``?before=<cursor>`` devuelve la página de filas más antiguas que el cursor.
+    - ``?after=<cursor>`` devuelve la página de filas más nuevas que el cursor,
+      empezando por las más cercanas; sirve para hacer polling de novedades.
+    - Sin cursor devuelve la página más reciente.
+
+    La respuesta incluye los links ``older`` y ``newer``. ``newer`` está siempre
+    presente cuando hay un cursor desde donde seguir, aunque por ahora no haya
+    filas nuevas.
+    """
+    field = 'created_at'
+    tiebreaker = 'id'
+    # Orden en que se presentan las filas de cada página
+    descending = True
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    before_query_param = 'before'
+    after_query_param = 'after'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        before = self.decode_cursor(request.query_params.get(self.before_query_param))
+        after = self.decode_cursor(request.query_params.get(self.after_query_param))
+
+        if after:
+            queryset = queryset.filter(self.newer_than(after))
+        if before:
+            queryset = queryset.filter(self.older_than(before))
+
+        # Con ``after`` se leen las filas más cercanas al cursor hacia adelante;
+        # en otro caso, las más cercanas hacia atrás
+        forward = after is not None and before is None
+        if forward:
+            queryset = queryset.order_by(self.field, self.tiebreaker)
+        else:
+            queryset = queryset.order_by(f'-{self.field}', f'-{self.tiebreaker}')
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not forward:
+            rows.reverse()
+
+        # ``rows`` queda en orden cronológico
+        self.forward = forward
+        self.oldest = self.cursor_for(rows[0]) if rows else None
+        self.newest = self.cursor_for(rows[-1]) if rows else None
+        self.after = after
+
+        if self.descending:
+            rows.reverse()
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'older': self.get_older_link(),
+            'newer': self.get_newer_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'older': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'newer': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_older_link(self):
+        if self.oldest is None:
+            return None
+        # Yendo hacia adelante siempre quedan filas anteriores (al menos el cursor)
+        if not self.forward and not self.has_more:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.after_query_param)
+        return replace_query_param(url, self.before_query_param, self.encode_cursor(self.oldest))
+
+    def get_newer_link(self):
+        cursor = self.newest or self.after
+        if cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.before_query_param)
+        return replace_query_param(url, self.after_query_param, self.encode_cursor(cursor))
+
+    def newer_than(self, cursor):
+        position, pk = cursor
+        return Q(**{f'{self.field}__gt': position}) | Q(**{self.field: position, f'{self.tiebreaker}__gt': pk})
+
+    def older_than(self, cursor):
+        position, pk = cursor
+        return Q(**{f'{self.field}__lt': position}) | Q(**{self.field: position, f'{self.tiebreaker}__lt': pk})
+
+    @property
+    def cursor_fields(self):
+        """Columnas que tienen que venir en cada fila para armar el cursor"""
+        return self.field, self.tiebreaker
+
+    def cursor_for(self, obj):
+        # Filas de values() (ver core/rows.py) o instancias
+        if isinstance(obj, dict):
+            return obj[self.field], obj[self.tiebreaker]
+        return getattr(obj, self.field), getattr(obj, self.tiebreaker)
+
+    def encode_cursor(self, cursor):
+        position, pk = cursor
+        raw = f'{position.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            position, pk = raw.rsplit('|', 1)
+            return datetime.fromisoformat(position), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class ChatKeysetPagination(KeysetPagination):
+    """Igual que KeysetPagination pero presenta cada página en orden cronológico"""
+    descending = False
+
+
+class InboxKeysetPagination(KeysetPagination):
+    """Bandeja de conversaciones, de la actividad más reciente a la más antigua"""
+    field = 'last_message_at'
+
+
+class ReviewDueKeysetPagination(KeysetPagination):
+    """Reseñas pendientes, del proyecto completado más recientemente al más antiguo"""
+    field = 'due_at'
+    tiebreaker = 'project_id'
+
+
+class RankingPagination(LimitOffsetPagination):
+    """
+    ``?limit=``/``?offset=`` sobre un ranking calculado en memoria (ver
+    projects/ranking.py): el ranking solo ordena hasta ``offset + limit``
+    """
+    default_limit = api_settings.PAGE_SIZE
+    max_limit = 100
@@ -0,0 +1,96 @@
+"""
+Pub/sub para eventos en tiempo real.
+
+El backend se elige con ``REALTIME_PUBSUB_BACKEND``. Cualquier implementación
+debe ofrecer:
+
+- ``publish(channel, message)``: síncrono y seguro desde cualquier hilo.
+- ``subscribe(channel)``: context manager asíncrono que devuelve un objeto con
+  ``await get()`` para leer los mensajes en orden.
+
+``InProcessPubSub`` solo entrega dentro del mismo proceso; con varios workers
+hace falta un backend compartido (Redis, Postgres LISTEN/NOTIFY, etc.). El
+entrypoint ASGI no arranca con esa combinación (ver ``check_workers``).
+"""
+
+import asyncio
+import os
+import shlex
+import sys
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+class InProcessPubSub:
+    """Pub/sub en memoria: una cola asyncio por suscriptor"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                # Las vistas síncronas publican desde otro hilo que el del event loop
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                # El loop del suscriptor ya se cerró
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+@lru_cache(maxsize=None)
+def get_pubsub():
+    """Instancia única del backend configurado en ``REALTIME_PUBSUB_BACKEND``"""
+    return import_string(settings.REALTIME_PUBSUB_BACKEND)()
+
+
+def server_workers():
+    """
+    Workers pedidos al servidor (gunicorn o uvicorn): ``--workers``/``-w`` de la
+    línea de comandos o de ``GUNICORN_CMD_ARGS``, o ``WEB_CONCURRENCY``.
+    """
+    workers = os.environ.get('WEB_CONCURRENCY', '1')
+    args = shlex.split(os.environ.get('GUNICORN_CMD_ARGS', '')) + sys.argv[1:]
+    for position, arg in enumerate(args):
+        if arg in ('-w', '--workers') and position + 1 < len(args):
+            workers = args[position + 1]
+        elif arg.startswith('--workers='):
+            workers = arg.partition('=')[2]
+        elif arg.startswith('-w') and arg[2:].isdigit():
+            workers = arg[2:]
+    try:
+        return int(workers)
+    except ValueError:
+        return 1
+
+
+def check_workers():
+    """Con ``InProcessPubSub`` y más de un worker los mensajes no llegarían a todos"""
+    backend = import_string(settings.REALTIME_PUBSUB_BACKEND)
+    workers = server_workers()
+    if issubclass(backend, InProcessPubSub) and workers > 1:
+        raise ImproperlyConfigured(
+            f"InProcessPubSub solo entrega dentro de un proceso y el servidor pide {workers} workers. "
+            "Usar un solo worker o configurar REALTIME_PUBSUB_BACKEND con un backend compartido."
+        )
@@ -0,0 +1,111 @@
+"""
+Instrumentación de consultas SQL por request.
+
+``QueryRecorder`` registra cantidad de consultas, tiempo total en base de datos
+y patrones repetidos (la misma sentencia con distintos parámetros, síntoma
+típico de un N+1). Lo usan ``QueryInstrumentationMiddleware``, el comando
+``check_query_budgets`` y ``query_budget`` como ayuda para tests.
+"""
+
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+# Veces que una misma sentencia puede repetirse antes de considerarse sospechosa
+DUPLICATE_THRESHOLD = 3
+
+
+class QueryRecorder:
+    """
+    Context manager que registra las consultas ejecutadas en todas las conexiones.
+
+    Uso:
+        with QueryRecorder() as recorder:
+            ...
+        recorder.count, recorder.total_time, recorder.duplicates()
+    """
+
+    def __init__(self, using=None):
+        self.aliases = [using] if using else list(connections)
+        self.queries = []
+        self._stack = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'time': time.perf_counter() - start,
+                'alias': context['connection'].alias,
+            })
+
+    def __enter__(self):
+        for alias in self.aliases:
+            wrapper = connections[alias].execute_wrapper(self)
+            wrapper.__enter__()
+            self._stack.append(wrapper)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        while self._stack:
+            self._stack.pop().__exit__(exc_type, exc_value, traceback)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        """Tiempo total en base de datos, en segundos"""
+        return sum(query['time'] for query in self.queries)
+
+    def duplicates(self, threshold=DUPLICATE_THRESHOLD):
+        """
+        Devuelve las sentencias que se repiten al menos ``threshold`` veces.
+
+        Se agrupa por el SQL sin parámetros, así que ``WHERE user_id = %s``
+        ejecutado una vez por fila cuenta como el mismo patrón.
+        """
+        counter = Counter(query['sql'] for query in self.queries)
+        return [(sql, times) for sql, times in counter.most_common() if times >= threshold]
+
+
+def load_budgets(path=None):
+    """Lee el archivo de presupuestos de consultas versionado en el repositorio"""
+    path = Path(path or settings.QUERY_BUDGETS_FILE)
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as budgets_file:
+        return json.load(budgets_file)
+
+
+@contextmanager
+def query_budget(route, role, budgets=None):
+    """
+    Ayuda para tests: falla si el bloque supera el presupuesto de ``route``/``role``.
+
+    Uso:
+        with query_budget('project-list', 'client'):
+            client.get('/api/projects/projects/')
+    """
+    budgets = load_budgets() if budgets is None else budgets
+    limit = budgets.get(route, {}).get(role)
+    if limit is None:
+        raise AssertionError(f"No hay presupuesto de consultas para {route} ({role})")
+
+    with QueryRecorder() as recorder:
+        yield recorder
+
+    if recorder.count > limit:
+        patterns = '\n'.join(f"  {times}x {sql}" for sql, times in recorder.duplicates())
+        raise AssertionError(
+            f"{route} ({role}) ejecutó {recorder.count} consultas, presupuesto {limit}"
+            + (f"\nConsultas repetidas:\n{patterns}" if patterns else '')
+        )
@@ -0,0 +1,276 @@
+"""
+Caché de respuestas de endpoints de lectura muy consultados, invalidado por tags.
+
+Dos niveles:
+
+- Un LRU por proceso (``RESPONSE_CACHE_LOCAL_SIZE`` entradas) con las
+  respuestas ya renderizadas, que evita ir al caché compartido a buscar (y
+  deserializar) el cuerpo.
+- El caché de Django ``RESPONSE_CACHE_ALIAS`` (``CACHE_URL``; locmem por
+  defecto, Redis o Memcached con varios workers).
+
+Cada entrada guarda la versión de sus tags (``user:3``, ``creators``,
+``convocatorias``, ...) leída *antes* de armar la respuesta. Los tags que
+dependen de las filas (los usuarios embebidos en una página) se calculan con
+una consulta de ids de la página, solo cuando hay que armarla. Las versiones
+viven en el caché compartido y las señales de los modelos las reemplazan
+(``invalidate``) al confirmarse la transacción. Una entrada se sirve solo si
+todas sus versiones siguen vigentes, así que una invalidación hecha en un
+proceso vale también para el LRU de los demás: cada acierto cuesta un
+``get_many`` de las versiones y ninguna consulta SQL. Las versiones son
+aleatorias, no contadores: si el caché compartido descarta una, la nueva nunca
+coincide con la de una entrada vieja.
+
+La clave incluye la URL absoluta (página, ``?fields=``, host de las URLs de
+archivos), el alcance de visibilidad del usuario y el formato. Solo se cachean
+respuestas 200 en JSON. Las métricas se consultan en ``/api/metrics/cache/``.
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, namedtuple
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_http_date_safe
+
+from .conditional import not_modified
+
+KEY_PREFIX = 'response-cache:'
+TAG_PREFIX = 'response-cache:tag:'
+
+# Headers de la respuesta que se guardan con el cuerpo
+STORED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control', 'Vary')
+
+CachedResponse = namedtuple('CachedResponse', 'content content_type headers versions')
+
+
+class LocalLRU:
+    """LRU en memoria con vencimiento; cuenta las entradas desalojadas"""
+
+    def __init__(self, size, on_evict):
+        self.size = size
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        # clave -> (vence, entrada)
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key, entry, timeout):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, entry)
+            self._entries.move_to_end(key)
+            evicted = max(len(self._entries) - self.size, 0)
+            for _ in range(evicted):
+                self._entries.popitem(last=False)
+        if evicted:
+            self.on_evict(evicted)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ResponseCache:
+    def __init__(self, alias, timeout, local_size):
+        self.alias = alias
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self.local = LocalLRU(local_size, lambda count: self.record('evictions', count))
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        """La entrada vigente de ``key`` o ``None``"""
+        entry = self.local.get(key)
+        level = 'local_hits'
+        if entry is None:
+            entry = self.shared.get(KEY_PREFIX + key)
+            level = 'shared_hits'
+        if entry is None:
+            self.record('misses')
+            return None
+        if self.current_versions(entry.versions) != entry.versions:
+            self.local.discard(key)
+            self.record('stale')
+            return None
+        if level == 'shared_hits':
+            self.local.set(key, entry, self.timeout)
+        self.record(level)
+        return entry
+
+    def current_versions(self, versions):
+        found = self.shared.get_many([TAG_PREFIX + tag for tag in versions])
+        return {tag: found.get(TAG_PREFIX + tag) for tag in versions}
+
+    def versions(self, tags):
+        """Versión actual de cada tag; crea las que no existen"""
+        versions = {tag: None for tag in tags}
+        versions.update(self.current_versions(versions))
+        for tag, version in versions.items():
+            if version is None:
+                version = new_version()
+                # add: si otro proceso la creó recién, vale la suya
+                if not self.shared.add(TAG_PREFIX + tag, version, None):
+                    version = self.shared.get(TAG_PREFIX + tag, version)
+                versions[tag] = version
+        return versions
+
+    def set(self, key, entry):
+        self.shared.set(KEY_PREFIX + key, entry, self.timeout)
+        self.local.set(key, entry, self.timeout)
+        self.record('stores')
+
+    def invalidate(self, tags):
+        self.shared.set_many({TAG_PREFIX + tag: new_version() for tag in tags}, None)
+        self.record('invalidations', len(tags))
+
+    def record(self, name, count=1):
+        with self._lock:
+            self._stats[name] += count
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats.get('local_hits', 0) + stats.get('shared_hits', 0)
+        lookups = hits + stats.get('misses', 0) + stats.get('stale', 0)
+        for name in ('local_hits', 'shared_hits', 'misses', 'stale', 'evictions', 'stores', 'invalidations'):
+            stats.setdefault(name, 0)
+        stats['hit_ratio'] = round(hits / lookups, 3) if lookups else None
+        stats['local_entries'] = len(self.local)
+        stats['local_size'] = self.local.size
+        return stats
+
+
+def new_version():
+    return uuid.uuid4().hex[:16]
+
+
+@lru_cache(maxsize=None)
+def get_response_cache():
+    return ResponseCache(
+        getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default'),
+        getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300),
+        getattr(settings, 'RESPONSE_CACHE_LOCAL_SIZE', 512),
+    )
+
+
+def enabled():
+    return getattr(settings, 'RESPONSE_CACHE', False)
+
+
+def invalidate(*tags, using=None):
+    """Invalida las respuestas con alguno de ``tags`` al confirmarse la transacción en curso"""
+    tags = {tag for tag in tags if tag}
+    if tags and enabled():
+        transaction.on_commit(lambda: get_response_cache().invalidate(tags), using=using)
+
+
+def snapshot():
+    return get_response_cache().snapshot()
+
+
+class ResponseCacheMixin:
+    """
+    Para viewsets: cachea ``list`` y ``retrieve`` (y las acciones que llamen a
+    ``cached_response``) cuando ``response_cache_tags`` devuelve tags para la
+    acción actual. Debe ir antes de ``ConditionalGetMixin``, para que un acierto
+    no arme la respuesta ni calcule el ETag.
+    """
+
+    def response_cache_tags(self):
+        """Tags de los que depende la respuesta de la acción actual; ``None`` no cachea"""
+        return None
+
+    def response_cache_page_tags(self):
+        """
+        Tags que dependen de las filas de la respuesta (p. ej. ``user:<id>`` de los
+        usuarios embebidos). Solo se piden cuando hay que armar la respuesta.
+        """
+        return ()
+
+    def response_cache_scope(self):
+        if hasattr(self, 'visibility_scope'):
+            return self.visibility_scope()
+        return f'user:{self.request.user.pk}'
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        tags = self.response_cache_tags() if enabled() and request.method == 'GET' else None
+        if not tags or request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        cache = get_response_cache()
+        key = self.response_cache_key()
+        entry = cache.get(key)
+        if entry is not None:
+            return cached_to_response(request, entry)
+
+        # Las versiones se leen antes de armar la respuesta: si algo cambia
+        # mientras tanto, la entrada nace vencida
+        versions = cache.versions(tags)
+        # Después de las de arriba: si cambian las filas de la página vence un tag
+        # ya leído, y si cambia algo de lo embebido, uno de estos
+        versions.update(cache.versions(self.response_cache_page_tags()))
+        response = handler(request, *args, **kwargs)
+        if response.status_code != 200 or getattr(response, 'exception', False):
+            return response
+        response = self.finalize_response(request, response, *args, **kwargs)
+        response.render()
+        cache.set(key, CachedResponse(
+            response.content, response['Content-Type'],
+            {name: response[name] for name in STORED_HEADERS if response.has_header(name)},
+            versions,
+        ))
+        return response
+
+    def response_cache_key(self):
+        request = self.request
+        key = repr((
+            type(self).__name__, self.action, self.response_cache_scope(),
+            request.build_absolute_uri(), request.accepted_renderer.format,
+        ))
+        return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def cached_to_response(request, entry):
+    last_modified = parse_http_date_safe(entry.headers.get('Last-Modified'))
+    if last_modified is not None:
+        last_modified = datetime.fromtimestamp(last_modified, tz=timezone.utc)
+    etag = entry.headers.get('ETag')
+    if (etag or last_modified) and not_modified(request, etag, last_modified):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry.content, content_type=entry.content_type)
+    for name, value in entry.headers.items():
+        response[name] = value
+    return response
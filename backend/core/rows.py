@@ -0,0 +1,264 @@
+"""
+Serialización de solo lectura a partir de filas ``values()``.
+
+Para listados grandes, el costo de DRF está en instanciar modelos y recorrer
+cada campo con ``get_attribute`` y ``to_representation``. ``compile_serializer``
+traduce un ``ModelSerializer`` a un plan: las columnas que pide a
+``values()`` (con JOIN para los serializers anidados simples) y, por cada
+campo, cómo convertir el valor de la fila. Las relaciones ``many=True`` se
+cargan en una consulta por relación, como el ``prefetch_related`` del viewset.
+
+La salida es la misma que la del serializer (mismas claves, en el mismo orden
+y con los mismos valores), así que el JSON resultante es idéntico byte a byte.
+Los serializers con campos que no se pueden resolver desde una fila
+(``SerializerMethodField``, ``source`` con puntos, propiedades del modelo, ...)
+no se compilan y ``RowListMixin`` usa el camino normal de DRF.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .timing import phase
+
+# Campos de DRF cuyo to_representation devuelve el mismo valor que trae la
+# fila cuando la columna es del tipo indicado
+IDENTITY_FIELDS = {
+    serializers.CharField: (models.CharField, models.TextField),
+    serializers.EmailField: (models.CharField, models.TextField),
+    serializers.URLField: (models.CharField, models.TextField),
+    serializers.SlugField: (models.CharField, models.TextField),
+    serializers.IntegerField: (models.IntegerField,),
+    serializers.BooleanField: (models.BooleanField,),
+    serializers.FloatField: (models.FloatField,),
+}
+
+VALUE, DATETIME, FILE, NESTED, MANY = range(5)
+
+
+class UnsupportedSerializer(Exception):
+    """El serializer tiene campos que no se pueden armar desde una fila"""
+
+
+class RowContext:
+    """Lo que comparten las conversiones de una misma serialización"""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+        # nombre de archivo -> URL absoluta
+        self.urls = {}
+
+
+class ManyRelation:
+    """Relación ``many=True``: se carga en bloque para todas las filas"""
+
+    def __init__(self, model, fk_name, parent_path, plan):
+        self.model = model
+        self.fk_name = fk_name
+        self.parent_path = parent_path
+        self.plan = plan
+
+    def fetch(self, rows, ctx):
+        """Devuelve {pk del padre: [hijos serializados]}"""
+        ids = {row[self.parent_path] for row in rows}
+        ids.discard(None)
+        groups = defaultdict(list)
+        if not ids:
+            return groups
+        children = list(
+            self.model._default_manager.filter(**{f'{self.fk_name}__in': ids})
+            .values(*dict.fromkeys(self.plan.paths + [self.fk_name]))
+        )
+        for child, data in zip(children, self.plan.build_all(children, ctx)):
+            groups[child[self.fk_name]].append(data)
+        return groups
+
+
+class RowPlan:
+    """Plan compilado de un serializer para un modelo, con sus columnas bajo ``prefix``"""
+
+    def __init__(self, model, prefix=''):
+        self.model = model
+        self.prefix = prefix
+        # (tipo, clave de salida, columna, dato extra según el tipo)
+        self.entries = []
+        # Columnas de values(), incluidas las de los anidados simples
+        self.paths = []
+        # Relaciones many=True de este plan y de sus anidados simples
+        self.relations = []
+
+    def rows(self, queryset, extra=()):
+        """El queryset como filas ``values()`` con las columnas del plan (y ``extra``)"""
+        return queryset.prefetch_related(None).values(*dict.fromkeys(self.paths + list(extra)))
+
+    def build_all(self, rows, ctx):
+        groups = {relation: relation.fetch(rows, ctx) for relation in self.relations}
+        return [self.build(row, groups, ctx) for row in rows]
+
+    def serialize(self, rows, context=None):
+        """Equivale a ``serializer_class(instances, many=True, context=context).data``"""
+        return self.build_all(rows, RowContext((context or {}).get('request')))
+
+    def build(self, row, groups, ctx):
+        data = {}
+        for kind, key, path, extra in self.entries:
+            value = row[path]
+            if kind == VALUE:
+                data[key] = value if value is None or extra is None else extra(value)
+            elif kind == DATETIME:
+                data[key] = None if value is None else iso_datetime(value, extra, ctx)
+            elif kind == FILE:
+                data[key] = None if value is None else file_url(value, extra, ctx)
+            elif kind == NESTED:
+                data[key] = None if value is None else extra.build(row, groups, ctx)
+            else:
+                data[key] = groups[extra].get(value) or []
+        return data
+
+
+def iso_datetime(value, field, ctx):
+    """``DateTimeField.to_representation`` en ISO 8601 con la zona horaria actual"""
+    if ctx.timezone is None or value.tzinfo is None:
+        return field.to_representation(value)
+    value = value.astimezone(ctx.timezone).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def file_url(name, spec, ctx):
+    """``FileField.to_representation`` a partir del nombre guardado en la columna"""
+    use_url, storage = spec
+    if not name:
+        return None
+    if not use_url:
+        return name
+    url = ctx.urls.get(name)
+    if url is None:
+        url = storage.url(name)
+        if ctx.request is not None:
+            url = ctx.request.build_absolute_uri(url)
+        ctx.urls[name] = url
+    return url
+
+
+@lru_cache(maxsize=256)
+def compile_serializer(serializer_class, sparse=None):
+    """
+    Plan de ``serializer_class`` (con los campos pedidos en ``sparse``, ver
+    core/sparse.py), o ``None`` si no se puede compilar
+    """
+    context = {'sparse': sparse} if sparse is not None else {}
+    try:
+        return compile_plan(serializer_class(context=context), serializer_class.Meta.model, '')
+    except (UnsupportedSerializer, AttributeError):
+        return None
+
+
+def compile_plan(serializer, model, prefix):
+    plan = RowPlan(model, prefix)
+    for field in serializer._readable_fields:
+        source = field.source
+        if source == '*' or '.' in source:
+            raise UnsupportedSerializer(field.field_name)
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise UnsupportedSerializer(field.field_name)
+        path = prefix + source
+
+        if isinstance(field, serializers.ListSerializer):
+            if not (model_field.one_to_many and isinstance(field.child, serializers.ModelSerializer)):
+                raise UnsupportedSerializer(field.field_name)
+            child_plan = compile_plan(field.child, model_field.related_model, '')
+            parent_path = prefix + model._meta.pk.name
+            relation = ManyRelation(model_field.related_model, model_field.field.name, parent_path, child_plan)
+            plan.entries.append((MANY, field.field_name, parent_path, relation))
+            plan.paths.append(parent_path)
+            plan.relations.append(relation)
+        elif isinstance(field, serializers.ModelSerializer):
+            if not (model_field.many_to_one or model_field.one_to_one):
+                raise UnsupportedSerializer(field.field_name)
+            related = model_field.related_model
+            nested = compile_plan(field, related, f'{path}__')
+            # Sin fila relacionada (FK nula o, p. ej., un usuario sin perfil) DRF
+            # devuelve None, igual que con el LEFT JOIN de values()
+            pk_path = f'{path}__{related._meta.pk.name}'
+            plan.entries.append((NESTED, field.field_name, pk_path, nested))
+            plan.paths.append(pk_path)
+            plan.paths.extend(nested.paths)
+            plan.relations.extend(nested.relations)
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            if not model_field.concrete or not model_field.is_relation or field.pk_field is not None:
+                raise UnsupportedSerializer(field.field_name)
+            plan.entries.append((VALUE, field.field_name, path, None))
+            plan.paths.append(path)
+        elif isinstance(field, serializers.FileField):
+            use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+            plan.entries.append((FILE, field.field_name, path, (use_url, model_field.storage)))
+            plan.paths.append(path)
+        elif isinstance(field, (serializers.BaseSerializer, serializers.RelatedField,
+                                serializers.ManyRelatedField, serializers.SerializerMethodField)):
+            raise UnsupportedSerializer(field.field_name)
+        elif model_field.is_relation or not model_field.concrete:
+            raise UnsupportedSerializer(field.field_name)
+        elif is_iso_datetime(field, model_field):
+            plan.entries.append((DATETIME, field.field_name, path, field))
+            plan.paths.append(path)
+        else:
+            plan.entries.append((VALUE, field.field_name, path, converter(field, model_field)))
+            plan.paths.append(path)
+    return plan
+
+
+def is_iso_datetime(field, model_field):
+    """DateTimeField con el formato y la zona horaria por defecto"""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    return (
+        type(field) is serializers.DateTimeField
+        and isinstance(model_field, models.DateTimeField)
+        and isinstance(output_format, str) and output_format.lower() == ISO_8601
+        and not hasattr(field, 'timezone')
+    )
+
+
+def converter(field, model_field):
+    """Conversión de la columna; ``None`` si el valor de la fila ya es la salida"""
+    column_types = IDENTITY_FIELDS.get(type(field))
+    if column_types and isinstance(model_field, column_types):
+        return None
+    if type(field) is serializers.ChoiceField and all(isinstance(key, str) for key in field.choices):
+        return None
+    return field.to_representation
+
+
+class RowListMixin:
+    """
+    Para viewsets: ``list`` arma la respuesta desde filas ``values()`` si el
+    serializer se puede compilar (ver ``compile_serializer``). Se desactiva con
+    ``FAST_LIST_SERIALIZATION=False``.
+    """
+
+    def list(self, request, *args, **kwargs):
+        plan = None
+        context = self.get_serializer_context()
+        if getattr(settings, 'FAST_LIST_SERIALIZATION', True):
+            plan = compile_serializer(self.get_serializer_class(), context.get('sparse'))
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        # La paginación por cursor necesita sus columnas aunque no se pidan en ?fields=
+        cursor_fields = getattr(self.paginator, 'cursor_fields', ())
+        rows = plan.rows(self.filter_queryset(self.get_queryset()), cursor_fields)
+        page = self.paginate_queryset(rows)
+        with phase('serialize'):
+            data = plan.serialize(page if page is not None else list(rows), context)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 from datetime import timedelta
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 # Inicializar environ
 env = environ.Env()
@@ -37,12 +38,16 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     
     # Apps propias
+    'core',
     'accounts',
     'projects',
+    'notifications',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.timing.RequestTimingMiddleware',
+    'core.middleware.QueryInstrumentationMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -80,6 +85,52 @@ DATABASES = {
     'default': env.db_url('DATABASE_URL', default='sqlite:///db.sqlite3')
 }
 
+# Réplicas de solo lectura (opcional), separadas por coma. Ver core/db_router.py
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[])):
+    DATABASES[f'replica_{index}'] = env.db_url_config(url)
+    # En los tests las réplicas apuntan a la base de test del primario
+    DATABASES[f'replica_{index}']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# Manejo de conexiones (métricas en /api/metrics/db/, ver core/dbmetrics.py):
+#   per-request: una conexión nueva por request
+#   persistent: cada hilo reutiliza su conexión hasta DB_CONN_MAX_AGE segundos y
+#               la verifica antes de usarla en una request nueva
+#   pool: pool compartido por los hilos de cada proceso (solo PostgreSQL, ver
+#         core/backends/postgresql_pool)
+# Bajo ASGI (core/asgi.py define SERVER_INTERFACE) cada request sincrónica corre
+# en un hilo distinto y las conexiones persistentes quedan abiertas sin dueño:
+# ahí el modo por defecto es per-request y persistent no se admite.
+SERVER_INTERFACE = env('SERVER_INTERFACE', default='wsgi')
+DB_CONNECTION_MODE = env('DB_CONNECTION_MODE', default='per-request' if SERVER_INTERFACE == 'asgi' else 'persistent')
+if SERVER_INTERFACE == 'asgi' and DB_CONNECTION_MODE == 'persistent':
+    raise ImproperlyConfigured("DB_CONNECTION_MODE=persistent no funciona bajo ASGI: usar per-request o pool")
+for database in DATABASES.values():
+    if DB_CONNECTION_MODE == 'persistent':
+        database['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+        database['CONN_HEALTH_CHECKS'] = True
+    elif DB_CONNECTION_MODE == 'pool':
+        if database['ENGINE'] != 'django.db.backends.postgresql':
+            raise ImproperlyConfigured("DB_CONNECTION_MODE=pool solo funciona con PostgreSQL")
+        database['ENGINE'] = 'core.backends.postgresql_pool'
+        database['CONN_MAX_AGE'] = 0
+        database['CONN_HEALTH_CHECKS'] = True
+        database['POOL'] = {
+            'SIZE': env.int('DB_POOL_SIZE', default=10),
+            'TIMEOUT': env.float('DB_POOL_TIMEOUT', default=5),
+            'MAX_LIFETIME': env.int('DB_POOL_MAX_LIFETIME', default=1800),
+        }
+    elif DB_CONNECTION_MODE != 'per-request':
+        raise ImproperlyConfigured(f"DB_CONNECTION_MODE desconocido: {DB_CONNECTION_MODE}")
+
+# Segundos que las lecturas de un usuario van al primario después de escribir
+READ_YOUR_WRITES_SECONDS = env.int('READ_YOUR_WRITES_SECONDS', default=10)
+# Atraso máximo tolerado en una réplica antes de leer del primario
+REPLICA_MAX_LAG_SECONDS = env.float('REPLICA_MAX_LAG_SECONDS', default=5)
+# Cada cuánto se vuelve a medir el atraso de cada réplica (por proceso)
+REPLICA_LAG_CHECK_SECONDS = env.float('REPLICA_LAG_CHECK_SECONDS', default=5)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -125,13 +176,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Configuración de REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.timing.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # Configuración de CORS
@@ -146,7 +201,115 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=env.int('REFRESH_TOKEN_LIFETIME_DAYS', default=7)),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    # Revoca el refresh token usado sin la app de blacklist (ver accounts/revocation.py)
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.RevokingTokenRefreshSerializer',
 }
 
+# Tokens revocados en memoria: capacidad de cada Bloom filter, tasa de falsos
+# positivos (se confirman en la base) y cada cuánto se leen las revocaciones
+# de los otros procesos
+TOKEN_REVOCATION_BLOOM_CAPACITY = env.int('TOKEN_REVOCATION_BLOOM_CAPACITY', default=100_000)
+TOKEN_REVOCATION_ERROR_RATE = env.float('TOKEN_REVOCATION_ERROR_RATE', default=0.001)
+TOKEN_REVOCATION_SYNC_SECONDS = env.float('TOKEN_REVOCATION_SYNC_SECONDS', default=5)
+
+# Segundos que se cachea el usuario autenticado por JWT (0 lo desactiva; ver
+# accounts/authentication.py). Se borra al cambiar el usuario, pero el borrado
+# solo llega a todos los workers con un caché compartido: sin CACHE_URL está
+# desactivado por defecto.
+AUTH_USER_CACHE_SECONDS = env.int('AUTH_USER_CACHE_SECONDS', default=60 if env('CACHE_URL', default='') else 0)
+
+# Email
+# Para desarrollo local se puede usar un servidor SMTP de depuración:
+#   python -m smtpd -n -c DebuggingServer localhost:1025
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = env('EMAIL_HOST', default='localhost')
+EMAIL_PORT = env.int('EMAIL_PORT', default=25)
+EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = env.bool('EMAIL_USE_TLS', default=False)
+EMAIL_TIMEOUT = env.int('EMAIL_TIMEOUT', default=10)
+DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+
+# Outbox de emails (ver notifications/outbox.py)
+OUTBOX_BATCH_SIZE = env.int('OUTBOX_BATCH_SIZE', default=50)
+OUTBOX_MAX_ATTEMPTS = env.int('OUTBOX_MAX_ATTEMPTS', default=5)
+OUTBOX_LEASE_SECONDS = env.int('OUTBOX_LEASE_SECONDS', default=300)
+OUTBOX_RETRY_BACKOFF_SECONDS = env.int('OUTBOX_RETRY_BACKOFF_SECONDS', default=30)
+
+# Chat en tiempo real (ver projects/realtime.py). InProcessPubSub solo sirve con
+# un único proceso ASGI; con varios workers usar un backend compartido.
+REALTIME_PUBSUB_BACKEND = env('REALTIME_PUBSUB_BACKEND', default='core.pubsub.InProcessPubSub')
+REALTIME_KEEPALIVE_SECONDS = env.int('REALTIME_KEEPALIVE_SECONDS', default=15)
+
 # User model personalizado
 AUTH_USER_MODEL = 'accounts.User'
+
+# Instrumentación de consultas SQL por request (ver core/querycount.py)
+QUERY_INSTRUMENTATION = env.bool('QUERY_INSTRUMENTATION', default=DEBUG)
+QUERY_BUDGETS_FILE = os.path.join(BASE_DIR, 'query_budgets.json')
+
+# Listados de solo lectura armados desde filas values() (ver core/rows.py)
+FAST_LIST_SERIALIZATION = env.bool('FAST_LIST_SERIALIZATION', default=True)
+
+# Caché compartido: locmem por defecto (uno por proceso). Con varios workers
+# en la misma máquina alcanza con CACHE_URL=filecache:///var/tmp/contala-cache;
+# entre máquinas, Redis o Memcached
+CACHES = {'default': env.cache('CACHE_URL', default='locmemcache://')}
+
+# Con réplicas, la marca de read-your-writes (ver core/db_router.py) vive en este
+# cache: si no es compartido cada proceso tiene la suya y quien acaba de escribir
+# puede leer de una réplica atrasada desde otro worker
+if len(DATABASES) > 1 and CACHES['default']['BACKEND'] in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+):
+    raise ImproperlyConfigured("DATABASE_REPLICA_URLS necesita un CACHE_URL compartido (redis, memcached o base de datos)")
+
+# Caché de respuestas de lectura invalidado por tags (ver core/response_cache.py).
+# Las invalidaciones viajan por el caché compartido: con locmem solo son
+# correctas con un único proceso, por eso se activa solo si hay CACHE_URL
+RESPONSE_CACHE = env.bool('RESPONSE_CACHE', default=bool(env('CACHE_URL', default='')))
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = env.int('RESPONSE_CACHE_TIMEOUT', default=300)
+RESPONSE_CACHE_LOCAL_SIZE = env.int('RESPONSE_CACHE_LOCAL_SIZE', default=512)
+
+# Segundos que se cachea /api/dashboard/summary/ por usuario (ver projects/dashboard.py)
+DASHBOARD_SUMMARY_CACHE_SECONDS = env.int('DASHBOARD_SUMMARY_CACHE_SECONDS', default=15)
+
+# Convocatorias cuyas columnas de ranking guarda cada proceso (ver projects/ranking.py)
+APPLICATION_RANKING_CACHE_SIZE = env.int('APPLICATION_RANKING_CACHE_SIZE', default=32)
+
+# Índice TF-IDF de creadores, compartido con mmap por los procesos de la máquina,
+# cada cuántos segundos se buscan cambios y cuántos cambios encolados agrega por
+# lote update_creator_index (ver accounts/creator_index.py)
+CREATOR_INDEX_PATH = env('CREATOR_INDEX_PATH', default=os.path.join(BASE_DIR, 'var', 'creator_index.bin'))
+CREATOR_INDEX_CHECK_SECONDS = env.float('CREATOR_INDEX_CHECK_SECONDS', default=2)
+CREATOR_INDEX_BATCH_SIZE = env.int('CREATOR_INDEX_BATCH_SIZE', default=500)
+
+# Tiempos por fase (Server-Timing) y profiling de las requests más lentas
+# (ver core/timing.py)
+REQUEST_TIMING = env.bool('REQUEST_TIMING', default=DEBUG)
+REQUEST_PROFILING = env.bool('REQUEST_PROFILING', default=False)
+REQUEST_PROFILING_DIR = env('REQUEST_PROFILING_DIR', default=os.path.join(BASE_DIR, 'profiles'))
+REQUEST_PROFILING_INTERVAL_MS = env.float('REQUEST_PROFILING_INTERVAL_MS', default=5)
+REQUEST_PROFILING_KEEP = env.int('REQUEST_PROFILING_KEEP', default=5)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['console'],
+            'level': env('CORE_LOG_LEVEL', default='INFO'),
+        },
+        'notifications': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
@@ -0,0 +1,190 @@
+"""
+Campos a pedido: ``?fields=`` y ``?expand=``.
+
+- ``?fields=id,title,client.username`` devuelve solo esos campos. Un campo
+  anidado sin subcampos (``client``) se devuelve completo.
+- ``?expand=project,project.client`` embebe solo los objetos relacionados
+  indicados. Con ``expand`` presente, las relaciones no expandidas se reducen a
+  su id (``"client": 3``) y las inversas (redes sociales, portafolio, perfil)
+  se omiten. Un campo con subcampos en ``fields`` implica su expansión.
+
+Sin ninguno de los dos parámetros la respuesta es la de siempre. Solo se
+aplican en GET/HEAD; en los listados además se quitan los JOIN y prefetch de
+lo que no se pide (``SparseFieldsViewMixin``) y, con ``RowListMixin``, las
+columnas de ``values()``.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import permissions, serializers
+
+
+class SparseSpec:
+    """Campos (``fields``) y relaciones (``expand``) pedidos, como rutas de nombres"""
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields
+        self.expand = expand
+
+    @classmethod
+    def from_request(cls, request):
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+        fields = parse_paths(request.query_params.get('fields'))
+        expand = parse_paths(request.query_params.get('expand'))
+        if fields is None and expand is None:
+            return None
+        return cls(fields, expand)
+
+    def __eq__(self, other):
+        return isinstance(other, SparseSpec) and (self.fields, self.expand) == (other.fields, other.expand)
+
+    def __hash__(self):
+        return hash((self.fields, self.expand))
+
+    def wanted(self, path):
+        """Nombres a mantener en el serializer de ``path``, o ``None`` para todos"""
+        if self.fields is None:
+            return None
+        depth = len(path)
+        below = [requested[depth:] for requested in self.fields
+                 if requested[:depth] == path and len(requested) > depth]
+        if depth and not below:
+            # Se pidió el objeto completo (``fields=client``)
+            return None
+        return {requested[0] for requested in below}
+
+    def expands(self, path):
+        """Si se embebe el objeto relacionado de ``path``"""
+        if self.expand is None:
+            return True
+        depth = len(path)
+        requested = self.expand | {fields for fields in (self.fields or ()) if len(fields) > depth}
+        return any(expanded[:depth] == path for expanded in requested)
+
+    def prune(self, serializer, fields):
+        """Quita y reduce los campos de ``serializer`` según lo pedido"""
+        path = serializer_path(serializer)
+        wanted = self.wanted(path)
+        model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+        for name, field in list(fields.items()):
+            if field.write_only:
+                continue
+            if wanted is not None and name not in wanted:
+                del fields[name]
+            elif isinstance(field, serializers.BaseSerializer) and not self.expands(path + (name,)):
+                try:
+                    concrete = model._meta.get_field(field.source or name).concrete
+                except (AttributeError, FieldDoesNotExist):
+                    concrete = False
+                # Las FK quedan como id; las relaciones inversas se omiten
+                if isinstance(field, serializers.ListSerializer) or not concrete:
+                    del fields[name]
+                else:
+                    kwargs = {'source': field.source} if field.source and field.source != name else {}
+                    fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, **kwargs)
+        return fields
+
+
+def parse_paths(value):
+    if value is None:
+        return None
+    return frozenset(
+        tuple(part.strip() for part in item.split('.'))
+        for item in value.split(',') if item.strip()
+    )
+
+
+def serializer_path(serializer):
+    """Nombres de campo desde el serializer raíz hasta ``serializer``"""
+    names = []
+    node = serializer
+    while getattr(node, 'parent', None) is not None:
+        if node.field_name:
+            names.append(node.field_name)
+        node = node.parent
+    return tuple(reversed(names))
+
+
+class SparseFieldsMixin:
+    """Para serializers: aplica el ``SparseSpec`` del contexto (clave ``sparse``)"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        spec = self.context.get('sparse')
+        if spec is None:
+            return fields
+        return spec.prune(self, fields)
+
+
+def related_lookups(serializer, prefix='', prefetching=False):
+    """``select_related`` y ``prefetch_related`` que necesitan los campos de ``serializer``"""
+    select, prefetch = [], []
+    for field in serializer._readable_fields:
+        if not isinstance(field, serializers.BaseSerializer) or '.' in field.source or field.source == '*':
+            continue
+        path = prefix + field.source
+        if isinstance(field, serializers.ListSerializer):
+            prefetch.append(path)
+            nested_select, nested_prefetch = related_lookups(field.child, f'{path}__', True)
+            prefetch += nested_select + nested_prefetch
+        else:
+            (prefetch if prefetching else select).append(path)
+            nested_select, nested_prefetch = related_lookups(field, f'{path}__', prefetching)
+            select += nested_select
+            prefetch += nested_prefetch
+    return select, prefetch
+
+
+class SparseFieldsViewMixin:
+    """
+    Para viewsets: lee ``?fields=`` y ``?expand=`` y, en ``list``, deja de cargar
+    las relaciones de los campos que no se piden.
+    """
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        spec = SparseSpec.from_request(self.request)
+        if spec is not None:
+            context['sparse'] = spec
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action != 'list':
+            return queryset
+        context = self.get_serializer_context()
+        if 'sparse' not in context:
+            return queryset
+        serializer_class = self.get_serializer_class()
+        full = related_lookups(serializer_class(context=dict(context, sparse=None)))
+        sparse = related_lookups(serializer_class(context=context))
+        return without_lookups(queryset, set(full[0] + full[1]) - set(sparse[0] + sparse[1]))
+
+
+def without_lookups(queryset, dropped):
+    """Quita de ``queryset`` los select_related/prefetch_related de ``dropped`` (y lo que cuelga de ellos)"""
+    if not dropped:
+        return queryset
+
+    def kept(path):
+        return not any(path == drop or path.startswith(f'{drop}__') for drop in dropped)
+
+    prefetch = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if kept(getattr(lookup, 'prefetch_through', lookup))
+    ]
+    queryset = queryset.prefetch_related(None).prefetch_related(*prefetch)
+    if isinstance(queryset.query.select_related, dict):
+        select = [path for path in flatten_select(queryset.query.select_related) if kept(path)]
+        queryset = queryset.select_related(None)
+        if select:
+            queryset = queryset.select_related(*select)
+    return queryset
+
+
+def flatten_select(tree, prefix=''):
+    paths = []
+    for name, subtree in tree.items():
+        paths.append(prefix + name)
+        paths += flatten_select(subtree, f'{prefix}{name}__')
+    return paths
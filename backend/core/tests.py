@@ -0,0 +1,328 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.exceptions import NotFound
+from rest_framework.test import APIClient
+
+from accounts.creator_index import build as build_creator_index
+from accounts.models import User
+from accounts.serializers import CreatorUserSerializer
+from core.db_router import ReplicaRouter, _lag_cache, _read_alias, is_pinned, pin_to_primary
+from core.management.commands.advise_indexes import SEQ_SCAN_PATTERNS
+from core.management.commands.check_query_budgets import Command as CheckQueryBudgets, build_fixture
+from core.pagination import KeysetPagination, ReviewDueKeysetPagination
+from core.pubsub import check_workers, server_workers
+from core.rows import compile_serializer
+from core.querycount import QueryRecorder, load_budgets, query_budget
+from core.timing import PHASES
+from projects.models import Project
+from projects.serializers import ConvocatoriaApplicationSerializer, ProjectMessageSerializer, ProjectSerializer
+
+
+class QueryBudgetTests(TestCase):
+    def test_every_route_within_budget(self):
+        with tempfile.TemporaryDirectory() as index_dir, override_settings(
+            CREATOR_INDEX_PATH=os.path.join(index_dir, 'creator_index.bin'), RESPONSE_CACHE=False
+        ):
+            users = build_fixture(6)
+            build_creator_index(settings.CREATOR_INDEX_PATH)
+            command = CheckQueryBudgets(stdout=io.StringIO())
+            measured, failures = command.measure(users, load_budgets())
+        self.assertEqual(failures, [])
+        self.assertIn('project-list', measured)
+
+    def test_query_budget_helper(self):
+        with self.assertRaisesMessage(AssertionError, 'presupuesto 1'):
+            with query_budget('project-list', 'client', budgets={'project-list': {'client': 1}}):
+                User.objects.count()
+                User.objects.count()
+        with self.assertRaisesMessage(AssertionError, 'No hay presupuesto'):
+            with query_budget('no-existe', 'client', budgets={}):
+                pass
+
+    def test_recorder_groups_repeated_statements(self):
+        with QueryRecorder() as recorder:
+            for pk in range(4):
+                User.objects.filter(pk=pk).exists()
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual([times for sql, times in recorder.duplicates()], [4])
+
+    @override_settings(QUERY_INSTRUMENTATION=True)
+    def test_instrumentation_headers(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('cliente', 'cliente@example.com', 'clave-segura-1'))
+        response = client.get(reverse('project-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['X-DB-Query-Count']), 0)
+        self.assertIn('X-DB-Time-Ms', response)
+
+
+class IndexAdvisorTests(TestCase):
+    def setUp(self):
+        build_fixture(2)
+
+    def advise(self, *args):
+        output = io.StringIO()
+        call_command('advise_indexes', *args, stdout=output)
+        return output.getvalue()
+
+    def test_reports_every_list_route_and_role(self):
+        output = self.advise()
+        for role in ('staff', 'client', 'creator'):
+            self.assertRegex(output, rf'project-list\s+{role}\s')
+
+    def test_flags_sequential_scans(self):
+        plan = 'Seq Scan on projects_project  (cost=0.00..35.50 rows=2550 width=4)'
+        with mock.patch('django.db.models.query.QuerySet.explain', return_value=plan):
+            self.assertIn('recorrido secuencial: projects_project', self.advise())
+            with self.assertRaises(CommandError):
+                self.advise('--fail-on-seq-scan')
+
+    def test_sqlite_index_search_is_not_a_scan(self):
+        plan = 'SEARCH projects_project USING INDEX project_client_status_idx (client_id=?)\nSCAN projects_convocatoria'
+        scans = {match for pattern in SEQ_SCAN_PATTERNS for match in pattern.findall(plan)}
+        self.assertEqual(scans, {'projects_convocatoria'})
+
+    def test_message_unread_indexes(self):
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(cursor, 'projects_projectmessage')
+        self.assertIn('message_receiver_unread_idx', indexes)
+        # Duplicaba a message_receiver_unread_idx y ningún plan lo usaba
+        self.assertNotIn('message_unread_idx', indexes)
+
+
+class KeysetCursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        paginator = KeysetPagination()
+        cursor = (datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc), 42)
+        self.assertEqual(paginator.decode_cursor(paginator.encode_cursor(cursor)), cursor)
+
+    def test_round_trip_with_other_tiebreaker(self):
+        paginator = ReviewDueKeysetPagination()
+        row = {'due_at': datetime(2024, 1, 2, tzinfo=dt_timezone.utc), 'project_id': 7}
+        cursor = paginator.cursor_for(row)
+        self.assertEqual(paginator.decode_cursor(paginator.encode_cursor(cursor)), cursor)
+
+    def test_missing_cursor(self):
+        self.assertIsNone(KeysetPagination().decode_cursor(None))
+        self.assertIsNone(KeysetPagination().decode_cursor(''))
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPagination()
+        for encoded in ['no-es-base64!', 'c2luLXNlcGFyYWRvcg==', 'bm8tZmVjaGF8MQ==', 'MjAyNC0wMS0wMXx4']:
+            with self.subTest(encoded=encoded), self.assertRaises(NotFound):
+                paginator.decode_cursor(encoded)
+
+
+class ReplicaPinningTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('lector', 'lector@example.com', 'clave-segura-1')
+
+    @override_settings(READ_YOUR_WRITES_SECONDS=30)
+    def test_pin_after_write(self):
+        self.assertFalse(is_pinned(self.user))
+        pin_to_primary(self.user)
+        self.assertTrue(is_pinned(self.user))
+
+    def test_reads_go_to_primary_without_replica_or_in_transaction(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(User), DEFAULT_DB_ALIAS)
+        token = _read_alias.set('replica_0')
+        try:
+            # TestCase envuelve cada test en una transacción del primario
+            self.assertEqual(router.db_for_read(User), DEFAULT_DB_ALIAS)
+        finally:
+            _read_alias.reset(token)
+        self.assertEqual(router.db_for_write(User), DEFAULT_DB_ALIAS)
+
+    def test_replicas_need_a_shared_cache(self):
+        def load_settings(cache_url):
+            environ = {key: value for key, value in os.environ.items() if key != 'CACHE_URL'}
+            environ.update(DATABASE_REPLICA_URLS='sqlite:///replica.sqlite3', DJANGO_SETTINGS_MODULE='core.settings')
+            if cache_url:
+                environ['CACHE_URL'] = cache_url
+            return subprocess.run([sys.executable, '-c', 'import django; django.setup()'],
+                                  cwd=settings.BASE_DIR, env=environ, capture_output=True, text=True)
+
+        self.assertIn('CACHE_URL compartido', load_settings(None).stderr)
+        self.assertIn('CACHE_URL compartido', load_settings('locmemcache://').stderr)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.assertEqual(load_settings(f'filecache://{cache_dir}').returncode, 0)
+
+
+class ReplicaIntegrationTests(TransactionTestCase):
+    """Primario y réplica en dos archivos SQLite; la réplica no recibe lo que se escribe en el primario"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # El alias se agrega después de preparar la clase: el runner solo crea bases
+        # de test para los alias de los settings y esta réplica es un archivo aparte
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        replica = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(cls.replica_dir.name, 'replica.sqlite3')}
+        connections.settings['replica_0'] = connections.configure_settings(
+            {DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS], 'replica_0': replica}
+        )['replica_0']
+        call_command('migrate', database='replica_0', verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica_0'].close()
+        del connections['replica_0']
+        del connections.settings['replica_0']
+        cls.replica_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        # Sin marcas de read-your-writes de otros tests
+        cache.clear()
+        self.client_user = User.objects.create_user('cliente', 'cliente@example.com', 'clave-segura-1')
+        self.other = User.objects.create_user('otro', 'otro@example.com', 'clave-segura-1')
+        # La réplica tiene a los usuarios pero está atrasada con los proyectos
+        User.objects.using('replica_0').bulk_create([self.client_user, self.other])
+        Project.objects.create(title='Solo en el primario', description='-', client=self.client_user)
+        Project.objects.create(title='Solo en el primario', description='-', client=self.other)
+        Project.objects.using('replica_0').bulk_create([
+            Project(title='Solo en la réplica', description='-', client=self.client_user),
+            Project(title='Solo en la réplica', description='-', client=self.other),
+        ])
+        _lag_cache.clear()
+        patcher = mock.patch('core.db_router.replica_aliases', return_value=['replica_0'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def titles(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(reverse('project-list'))
+        self.assertEqual(response.status_code, 200)
+        return {project['title'] for project in response.data['results']}
+
+    @override_settings(RESPONSE_CACHE=False, READ_YOUR_WRITES_SECONDS=30)
+    def test_reads_from_replica_until_the_user_writes(self):
+        self.assertEqual(self.titles(self.client_user), {'Solo en la réplica'})
+
+        client = APIClient()
+        client.force_authenticate(self.client_user)
+        response = client.post(reverse('project-list'), {'title': 'Nuevo', 'description': '-'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        # Quien escribió lee del primario y ve su proyecto; el resto sigue en la réplica
+        self.assertEqual(self.titles(self.client_user), {'Solo en el primario', 'Nuevo'})
+        self.assertEqual(self.titles(self.other), {'Solo en la réplica'})
+
+
+@override_settings(RESPONSE_CACHE=False)
+class RowSerializationTests(TestCase):
+    ROUTES = ('project-list', 'creator-list', 'projectmessage-list', 'convocatoriaapplication-list')
+
+    def setUp(self):
+        self.users = build_fixture(3)
+
+    def get(self, user, url, fast):
+        client = APIClient()
+        client.force_authenticate(user)
+        with override_settings(FAST_LIST_SERIALIZATION=fast):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_serializers_compile(self):
+        for serializer_class in (ProjectSerializer, CreatorUserSerializer, ProjectMessageSerializer,
+                                 ConvocatoriaApplicationSerializer):
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertIsNotNone(compile_serializer(serializer_class))
+
+    def test_same_bytes_as_drf(self):
+        for route in self.ROUTES:
+            for role, user in self.users.items():
+                urls = [reverse(route), reverse(route) + '?fields=id,created_at']
+                while urls:
+                    url = urls.pop()
+                    with self.subTest(url=url, role=role):
+                        fast = self.get(user, url, True)
+                        self.assertEqual(fast, self.get(user, url, False))
+                    # También la página siguiente (número o cursor)
+                    next_url = json.loads(fast).get('next')
+                    if next_url and 'page' not in url and 'cursor' not in url:
+                        urls.append(next_url)
+
+
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('cliente', 'cliente@example.com', 'clave-segura-1')
+        self.project = Project.objects.create(title='Video', description='-', client=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @staticmethod
+    def phases(response):
+        durations = {}
+        for part in response['Server-Timing'].split(', '):
+            name, duration = part.split(';')[:2]
+            durations[name] = float(duration.removeprefix('dur='))
+        return durations
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_server_timing_header_and_log(self):
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            response = self.client.get(reverse('project-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(self.phases(response)), {*PHASES, 'total'})
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ consultas"')
+        [record] = logs.records
+        self.assertEqual(record.route, 'project-list')
+        self.assertEqual(set(record.phases), set(PHASES))
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_serializer_data_counts_as_serialize(self):
+        to_representation = ProjectSerializer.to_representation
+
+        def slow(serializer, instance):
+            time.sleep(0.05)
+            return to_representation(serializer, instance)
+
+        with mock.patch.object(ProjectSerializer, 'to_representation', slow):
+            response = self.client.get(reverse('project-detail', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 200)
+        phases = self.phases(response)
+        self.assertGreaterEqual(phases['serialize'], 50)
+        self.assertLess(phases['app'], 50)
+
+    def test_disabled_by_default_in_tests(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('project-list')))
+
+
+class ServerWorkersTests(SimpleTestCase):
+    def workers(self, argv, **environ):
+        with mock.patch.dict('os.environ', environ, clear=True), mock.patch('sys.argv', ['gunicorn', *argv]):
+            return server_workers()
+
+    def test_sources(self):
+        self.assertEqual(self.workers([]), 1)
+        self.assertEqual(self.workers([], WEB_CONCURRENCY='3'), 3)
+        self.assertEqual(self.workers([], GUNICORN_CMD_ARGS='--workers 2'), 2)
+        self.assertEqual(self.workers(['-w', '4']), 4)
+        self.assertEqual(self.workers(['-w5']), 5)
+        self.assertEqual(self.workers(['--workers=6'], WEB_CONCURRENCY='2'), 6)
+
+    @override_settings(REALTIME_PUBSUB_BACKEND='core.pubsub.InProcessPubSub')
+    def test_in_process_pubsub_needs_one_worker(self):
+        with mock.patch('core.pubsub.server_workers', return_value=1):
+            check_workers()
+        with mock.patch('core.pubsub.server_workers', return_value=2), self.assertRaises(ImproperlyConfigured):
+            check_workers()
@@ -0,0 +1,278 @@
+"""
+Tiempos por fase de cada request.
+
+Con ``REQUEST_TIMING`` activo, ``RequestTimingMiddleware`` separa el tiempo de la
+request en fases exclusivas (el tiempo de una fase anidada no se cuenta en la
+que la contiene):
+
+- ``auth``: autenticación JWT.
+- ``perm``: permisos (``IsAuthenticated``, ``IsOwnerOrReadOnly``, ...).
+- ``query``: armado del queryset y construcción de modelos en ``get_object`` y
+  ``paginate_queryset``.
+- ``db``: SQL, esté donde esté (incluidos los prefetch del serializer).
+- ``serialize``: ``serializer.data`` de list y retrieve sin el SQL que dispare.
+- ``render``: codificación JSON.
+- ``app``: el resto (middlewares, lógica de la vista, etc.).
+
+Los tiempos salen en el header ``Server-Timing`` (visible en las devtools del
+navegador) y en una línea de log de ``core.timing``. Las fases de la vista
+requieren ``PhaseTimingMixin`` en el viewset (último, justo antes de la clase
+de DRF) y ``TimedJSONRenderer`` en ``DEFAULT_RENDERER_CLASSES``.
+
+Con ``REQUEST_PROFILING`` además se muestrea la pila del hilo de cada request y
+se guardan, por endpoint, las ``REQUEST_PROFILING_KEEP`` requests más lentas en
+formato "folded" (una pila por línea con su cantidad de muestras), que se
+convierte en flamegraph con ``flamegraph.pl`` o se abre en speedscope.
+"""
+
+import heapq
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .middleware import route_name
+
+logger = logging.getLogger('core.timing')
+
+PHASES = ('auth', 'perm', 'query', 'db', 'serialize', 'render', 'app')
+
+_current = ContextVar('request_timer', default=None)
+
+
+class RequestTimer:
+    """Acumula tiempo exclusivo por fase; las fases pueden anidarse"""
+
+    def __init__(self):
+        self.durations = Counter()
+        self.query_count = 0
+        self._stack = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        # Tiempo de las fases hijas, que se descuenta de esta
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            self.durations[name] += elapsed - children
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def __call__(self, execute, sql, params, many, context):
+        self.query_count += 1
+        with self.phase('db'):
+            return execute(sql, params, many, context)
+
+    def server_timing(self, total):
+        parts = []
+        for name in PHASES:
+            duration = self.durations.get(name, 0.0) if name != 'app' else self.app_time(total)
+            part = f'{name};dur={duration * 1000:.2f}'
+            if name == 'db':
+                part += f';desc="{self.query_count} consultas"'
+            parts.append(part)
+        parts.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(parts)
+
+    def app_time(self, total):
+        return max(total - sum(self.durations.values()), 0.0)
+
+
+def phase(name):
+    """Mide una fase de la request actual; no hace nada si no se está midiendo"""
+    timer = _current.get()
+    return timer.phase(name) if timer is not None else nullcontext()
+
+
+class RequestTimingMiddleware:
+    """
+    Mide las fases de cada request y agrega el header ``Server-Timing``. Se
+    activa con ``REQUEST_TIMING``; con ``REQUEST_PROFILING`` también muestrea pilas.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_TIMING', False)
+        self.profiler = SamplingProfiler.from_settings() if getattr(settings, 'REQUEST_PROFILING', False) else None
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        timer = RequestTimer()
+        token = _current.set(timer)
+        start = time.perf_counter()
+        stacks = None
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timer))
+                if self.profiler is not None:
+                    stacks = stack.enter_context(self.profiler.sample(threading.get_ident()))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        route = route_name(request)
+        response['Server-Timing'] = timer.server_timing(total)
+        phases = {name: round(timer.durations.get(name, 0.0) * 1000, 2) for name in PHASES if name != 'app'}
+        phases['app'] = round(timer.app_time(total) * 1000, 2)
+        logger.info(
+            "%s %s total_ms=%.2f %s",
+            request.method, route, total * 1000,
+            ' '.join(f'{name}_ms={value}' for name, value in phases.items()),
+            extra={'route': route, 'total_ms': round(total * 1000, 2), 'phases': phases,
+                   'query_count': timer.query_count},
+        )
+        if stacks:
+            self.profiler.keep_if_slow(stacks, route, total)
+        return response
+
+
+class PhaseTimingMixin:
+    """
+    Para viewsets: marca las fases auth, perm, query y serialize. Va último,
+    justo antes de la clase de DRF: list y retrieve son los de
+    ListModelMixin/RetrieveModelMixin midiendo ``serializer.data``, y así el
+    caché de respuestas y el GET condicional no cuentan como serialize.
+    """
+
+    def perform_authentication(self, request):
+        with phase('auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with phase('perm'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with phase('perm'):
+            super().check_object_permissions(request, obj)
+
+    def get_object(self):
+        with phase('query'):
+            return super().get_object()
+
+    def paginate_queryset(self, queryset):
+        with phase('query'):
+            return super().paginate_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page if page is not None else queryset, many=True)
+        with phase('serialize'):
+            data = serializer.data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        with phase('serialize'):
+            data = serializer.data
+        return Response(data)
+
+
+class TimedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with phase('render'):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class SamplingProfiler:
+    """
+    Muestrea cada ``interval`` segundos la pila de los hilos con requests en curso
+    y guarda las ``keep`` requests más lentas de cada endpoint en ``directory``.
+    """
+
+    def __init__(self, directory, interval, keep):
+        self.directory = directory
+        self.interval = interval
+        self.keep = keep
+        self._lock = threading.Lock()
+        # hilo -> pilas muestreadas de la request en curso
+        self._active = {}
+        # endpoint -> heap de (duración, ruta del archivo) con las más lentas
+        self._slowest = {}
+        self._thread = None
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            settings.REQUEST_PROFILING_DIR,
+            settings.REQUEST_PROFILING_INTERVAL_MS / 1000,
+            settings.REQUEST_PROFILING_KEEP,
+        )
+
+    @contextmanager
+    def sample(self, thread_id):
+        """Muestrea el hilo mientras dure el bloque; devuelve un Counter de pilas"""
+        stacks = Counter()
+        with self._lock:
+            self._active[thread_id] = stacks
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+        try:
+            yield stacks
+        finally:
+            with self._lock:
+                self._active.pop(thread_id, None)
+
+    def keep_if_slow(self, stacks, route, duration):
+        """Guarda las pilas si la request está entre las más lentas del endpoint"""
+        with self._lock:
+            slowest = self._slowest.setdefault(route, [])
+            if len(slowest) >= self.keep and duration <= slowest[0][0]:
+                return
+            path = os.path.join(
+                self.directory, route.strip('/').replace('/', '_') or 'root',
+                f'{duration * 1000:09.1f}ms-{time.strftime("%Y%m%dT%H%M%S")}-{os.getpid()}-{threading.get_ident()}.folded',
+            )
+            heapq.heappush(slowest, (duration, path))
+            evicted = heapq.heappop(slowest)[1] if len(slowest) > self.keep else None
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as folded:
+            for stack, count in stacks.most_common():
+                folded.write(f'{stack} {count}\n')
+        if evicted is not None:
+            try:
+                os.remove(evicted)
+            except OSError:
+                pass
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[fold(frame)] += 1
+
+
+def fold(frame):
+    """Pila de ``frame`` en formato folded: de la raíz a la hoja, separada por ';'"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
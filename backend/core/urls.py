@@ -7,6 +7,8 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from projects.dashboard import dashboard_summary
+from .views import cache_metrics, db_metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,6 +16,9 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/accounts/', include('accounts.urls')),
     path('api/projects/', include('projects.urls')),
+    path('api/dashboard/summary/', dashboard_summary, name='dashboard-summary'),
+    path('api/metrics/db/', db_metrics, name='db-metrics'),
+    path('api/metrics/cache/', cache_metrics, name='cache-metrics'),
 ]
 
 # Servir archivos de medios durante desarrollo
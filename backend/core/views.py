@@ -0,0 +1,25 @@
+import os
+
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from . import dbmetrics, response_cache
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def db_metrics(request):
+    """
+    Métricas de conexiones del proceso que atiende la request (ver core/dbmetrics.py)
+    """
+    return Response(dbmetrics.snapshot())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def cache_metrics(request):
+    """
+    Aciertos, fallos y desalojos del caché de respuestas de este proceso (ver core/response_cache.py)
+    """
+    return Response(dict(response_cache.snapshot(), pid=os.getpid()))
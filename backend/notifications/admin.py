@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import OutboxEmail
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'recipients')
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
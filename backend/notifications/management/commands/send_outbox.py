@@ -0,0 +1,46 @@
+import logging
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import send_batch
+
+logger = logging.getLogger('notifications.outbox')
+
+
+class Command(BaseCommand):
+    help = "Worker que envía los emails del outbox en lotes, con reintentos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help="Segundos de espera cuando el outbox está vacío")
+        parser.add_argument('--once', action='store_true',
+                            help="Vacía lo pendiente y termina")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while not self.stopping:
+            try:
+                sent, failed = send_batch(batch_size=options['batch_size'])
+            except Exception:
+                # Sin conexión SMTP: send_batch ya programó el reintento del lote con backoff
+                logger.exception("No se pudo enviar el lote del outbox")
+                sent = failed = 0
+                if options['once']:
+                    raise
+
+            if sent or failed:
+                logger.info("Outbox: %d enviados, %d fallidos", sent, failed)
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+    def stop(self, signum, frame):
+        # Termina el lote en curso antes de salir
+        self.stopping = True
@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+class OutboxEmail(models.Model):
+    """
+    Email pendiente de envío. Se escribe en la misma transacción que el cambio que
+    lo origina y lo envía el comando ``send_outbox``.
+    """
+
+    STATUS_CHOICES = (
+        ('pending', 'Pendiente'),
+        ('sent', 'Enviado'),
+        ('failed', 'Fallido'),
+    )
+
+    subject = models.CharField(_('asunto'), max_length=255)
+    body = models.TextField(_('cuerpo'))
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now,
+                                        help_text=_('No se intenta enviar antes de esta fecha'))
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = _('email pendiente')
+        verbose_name_plural = _('emails pendientes')
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_status_available_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
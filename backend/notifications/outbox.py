@@ -0,0 +1,106 @@
+"""
+Outbox de emails: las vistas encolan con ``queue_mail`` dentro de su transacción
+y el worker ``send_outbox`` los envía en lotes reutilizando la conexión SMTP.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def queue_mail(subject, message, recipient_list, from_email=None):
+    """
+    Mismos argumentos que ``django.core.mail.send_mail``, pero solo escribe el email
+    en el outbox. Si la transacción que lo rodea se revierte, el email tampoco sale.
+    """
+    recipients = [address for address in recipient_list if address]
+    if not recipients:
+        return None
+    return OutboxEmail.objects.create(
+        subject=subject[:255],
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=recipients,
+    )
+
+
+def claim_batch(batch_size, lease):
+    """
+    Reserva hasta ``batch_size`` emails pendientes moviendo su ``available_at``
+    al final del lease. Si el worker muere a mitad de lote, los emails vuelven a
+    estar disponibles cuando vence el lease y otro worker los reintenta.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', available_at__lte=now)
+            .order_by('available_at', 'id')[:batch_size]
+        )
+        if batch:
+            OutboxEmail.objects.filter(id__in=[email.id for email in batch]).update(
+                available_at=now + lease
+            )
+    return batch
+
+
+def send_batch(batch_size=None, max_attempts=None, lease=None, backoff=None):
+    """
+    Envía un lote del outbox con una sola conexión SMTP. Devuelve (enviados, fallidos).
+    Si no se puede abrir la conexión, registra el intento en todo el lote y relanza
+    la excepción.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+    lease = lease or timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    backoff = backoff or settings.OUTBOX_RETRY_BACKOFF_SECONDS
+
+    batch = claim_batch(batch_size, lease)
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # Servidor caído: el intento cuenta y el lote se libera con backoff en vez
+        # de esperar a que venza el lease
+        for email in batch:
+            mark_failed(email, exc, max_attempts, backoff)
+        raise
+    try:
+        for email in batch:
+            try:
+                EmailMessage(
+                    email.subject, email.body, email.from_email, email.recipients,
+                    connection=connection,
+                ).send()
+            except Exception as exc:
+                failed += 1
+                mark_failed(email, exc, max_attempts, backoff)
+            else:
+                sent += 1
+                OutboxEmail.objects.filter(id=email.id).update(
+                    status='sent', sent_at=timezone.now(), attempts=email.attempts + 1, last_error=''
+                )
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def mark_failed(email, exc, max_attempts, backoff):
+    """Programa un reintento con backoff exponencial o marca el email como fallido"""
+    attempts = email.attempts + 1
+    OutboxEmail.objects.filter(id=email.id).update(
+        attempts=attempts,
+        last_error=f"{type(exc).__name__}: {exc}",
+        status='failed' if attempts >= max_attempts else 'pending',
+        available_at=timezone.now() + timedelta(seconds=backoff * 2 ** (attempts - 1)),
+    )
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import OutboxEmail
+from .outbox import claim_batch, queue_mail, send_batch
+
+
+class OutboxTests(TestCase):
+    def queue(self, count=1):
+        return [queue_mail(f'Asunto {i}', 'Cuerpo', [f'destino{i}@example.com']) for i in range(count)]
+
+    def test_queue_skips_empty_recipients(self):
+        self.assertIsNone(queue_mail('Asunto', 'Cuerpo', ['', None]))
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_claim_leases_batch(self):
+        self.queue(3)
+        lease = timedelta(minutes=5)
+        batch = claim_batch(2, lease)
+        self.assertEqual(len(batch), 2)
+        # Mientras dura el lease nadie más los toma
+        self.assertEqual([email.id for email in claim_batch(10, lease)], [OutboxEmail.objects.last().id])
+        self.assertEqual(claim_batch(10, lease), [])
+        for email in OutboxEmail.objects.all():
+            self.assertGreater(email.available_at, timezone.now())
+
+    def test_expired_lease_is_claimed_again(self):
+        self.queue()
+        claim_batch(10, timedelta(minutes=5))
+        OutboxEmail.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(claim_batch(10, timedelta(minutes=5))), 1)
+
+    def test_send(self):
+        self.queue(2)
+        self.assertEqual(send_batch(batch_size=10), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(OutboxEmail.objects.filter(status='sent', attempts=1).count(), 2)
+
+    def test_failure_backs_off_then_fails(self):
+        [email] = self.queue()
+        with mock.patch('notifications.outbox.EmailMessage.send', side_effect=OSError('sin conexión')):
+            for attempt in (1, 2):
+                before = timezone.now()
+                self.assertEqual(send_batch(batch_size=10, max_attempts=2, backoff=30), (0, 1))
+                email.refresh_from_db()
+                self.assertEqual(email.attempts, attempt)
+                if attempt == 1:
+                    self.assertEqual(email.status, 'pending')
+                    self.assertGreaterEqual(email.available_at, before + timedelta(seconds=30))
+                    OutboxEmail.objects.update(available_at=timezone.now())
+        self.assertEqual(email.status, 'failed')
+        self.assertIn('sin conexión', email.last_error)
+        self.assertEqual(send_batch(batch_size=10), (0, 0))
+
+    def test_connection_failure_releases_lease(self):
+        emails = self.queue(2)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=OSError('SMTP caído')):
+            with self.assertRaises(OSError):
+                send_batch(batch_size=10, lease=timedelta(minutes=5), backoff=30)
+        for email in emails:
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertIn('SMTP caído', email.last_error)
+            # Disponible tras el backoff, no al vencer el lease de 5 minutos
+            self.assertLess(email.available_at, timezone.now() + timedelta(seconds=31))
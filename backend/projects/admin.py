@@ -2,7 +2,7 @@
 from django.contrib import admin
 from .models import (
     Project, ProjectProposal, ProjectInvitation, ProjectMessage,
-    Convocatoria, ConvocatoriaApplication
+    Convocatoria, ConvocatoriaApplication, Conversation
 )
 
 class ProjectAdmin(admin.ModelAdmin):
@@ -35,9 +35,14 @@ class ConvocatoriaApplicationAdmin(admin.ModelAdmin):
     list_filter = ('status',)
     search_fields = ('convocatoria__title', 'creator__username')
 
+class ConversationAdmin(admin.ModelAdmin):
+    list_display = ('project', 'user_a', 'user_b', 'last_message_at', 'unread_a', 'unread_b')
+    search_fields = ('project__title', 'user_a__username', 'user_b__username')
+
 admin.site.register(Project, ProjectAdmin)
 admin.site.register(ProjectProposal, ProjectProposalAdmin)
 admin.site.register(ProjectInvitation, ProjectInvitationAdmin)
 admin.site.register(ProjectMessage, ProjectMessageAdmin)
 admin.site.register(Convocatoria, ConvocatoriaAdmin)
 admin.site.register(ConvocatoriaApplication, ConvocatoriaApplicationAdmin)
+admin.site.register(Conversation, ConversationAdmin)
@@ -0,0 +1,83 @@
+"""
+Resumen del dashboard: los contadores que muestran ``UserDashboard``,
+``CreadorDashboard`` y ``PendientesSection`` en una sola request.
+
+Todos los contadores salen de una consulta sobre la fila del usuario con una
+subconsulta agrupada por contador (cada una usa el índice de su tabla); a los
+clientes se les suma una segunda consulta con las propuestas pendientes por
+proyecto. El resultado se cachea ``DASHBOARD_SUMMARY_CACHE_SECONDS`` por usuario.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .models import ConvocatoriaApplication, Project, ProjectInvitation, ProjectMessage, ProjectProposal, ReviewDue
+
+User = get_user_model()
+
+
+def count_for_user(queryset, user_field):
+    """Subconsulta con la cantidad de filas de ``queryset`` del usuario de la consulta externa"""
+    rows = queryset.filter(**{user_field: OuterRef('pk')}).order_by().values(user_field)
+    return Coalesce(Subquery(rows.annotate(n=Count('pk')).values('n')), 0)
+
+
+def summary_counters(user):
+    """Contador -> (queryset, campo que lo relaciona con el usuario) según el rol"""
+    counters = {
+        'unread_messages': (ProjectMessage.objects.filter(read=False), 'receiver'),
+    }
+    if user.is_creator:
+        counters.update({
+            'pending_proposals': (ProjectProposal.objects.filter(status='pending'), 'creator'),
+            'open_invitations': (ProjectInvitation.objects.filter(status='pending'), 'creator'),
+            'shortlisted_applications': (ConvocatoriaApplication.objects.filter(status='shortlisted'), 'creator'),
+        })
+    else:
+        counters.update({
+            'pending_proposals': (ProjectProposal.objects.filter(status='pending'), 'project__client'),
+            'open_invitations': (ProjectInvitation.objects.filter(status='pending'), 'project__client'),
+            'shortlisted_applications': (
+                ConvocatoriaApplication.objects.filter(status='shortlisted'), 'convocatoria__client'
+            ),
+            'pending_reviews': (ReviewDue.objects.all(), 'client'),
+        })
+    return counters
+
+
+def dashboard_summary_for(user):
+    counters = summary_counters(user)
+    summary = User.objects.filter(pk=user.pk).values(**{
+        name: count_for_user(queryset, user_field) for name, (queryset, user_field) in counters.items()
+    }).get()
+    if not user.is_creator:
+        # Propuestas pendientes por proyecto, para marcar cada tarjeta
+        summary['pending_proposals_by_project'] = dict(
+            Project.objects.filter(client=user)
+            .annotate(pending=Count('proposals', filter=Q(proposals__status='pending')))
+            .filter(pending__gt=0)
+            .order_by()
+            .values_list('pk', 'pending')
+        )
+    return summary
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def dashboard_summary(request):
+    """
+    Contadores del dashboard del usuario: mensajes sin leer, propuestas,
+    invitaciones y aplicaciones preseleccionadas pendientes y reseñas por hacer
+    """
+    key = f'dashboard-summary:{request.user.pk}'
+    summary = cache.get(key)
+    if summary is None:
+        summary = dashboard_summary_for(request.user)
+        cache.set(key, summary, getattr(settings, 'DASHBOARD_SUMMARY_CACHE_SECONDS', 15))
+    return Response(summary)
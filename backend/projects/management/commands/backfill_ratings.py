@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from accounts.models import CreatorProfile
+from projects.models import ProjectReview
+
+
+def review_aggregates():
+    """Subconsultas con la cantidad y la suma de calificaciones de cada creador"""
+    reviews = ProjectReview.objects.filter(creator_id=OuterRef('user_id')).order_by().values('creator_id')
+    count = Coalesce(Subquery(reviews.annotate(n=Count('id')).values('n')), 0)
+    total = Coalesce(Subquery(reviews.annotate(t=Sum('rating')).values('t')), 0)
+    return count, total
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula average_rating, review_count y rating_total de los perfiles de "
+        "creador a partir de las reseñas, por lotes de ids"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Perfiles por lote (cada lote es una transacción)")
+        parser.add_argument('--verify', action='store_true',
+                            help="Solo compara y termina con error si hay diferencias")
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            return self.verify()
+
+        batch_size = options['batch_size']
+        last_id = CreatorProfile.objects.aggregate(last=Max('id'))['last'] or 0
+        updated = 0
+        for start in range(0, last_id + 1, batch_size):
+            updated += self.recompute(start, start + batch_size)
+        self.stdout.write(self.style.SUCCESS(f"{updated} perfiles recalculados"))
+
+    @transaction.atomic
+    def recompute(self, start, end):
+        count, total = review_aggregates()
+        profiles = CreatorProfile.objects.filter(id__gte=start, id__lt=end)
+        updated = profiles.update(review_count=count, rating_total=total)
+        # El promedio se calcula sobre los valores recién escritos
+        profiles.update(average_rating=CreatorProfile.average_of(F('rating_total'), F('review_count')))
+        return updated
+
+    def verify(self):
+        count, total = review_aggregates()
+        mismatches = CreatorProfile.objects.annotate(
+            expected_count=count, expected_total=total
+        ).exclude(
+            review_count=F('expected_count'), rating_total=F('expected_total')
+        ).values_list('user_id', 'review_count', 'expected_count', 'rating_total', 'expected_total')
+
+        found = 0
+        for row in mismatches.iterator():
+            found += 1
+            if found <= 20:
+                self.stdout.write(
+                    "creador {}: review_count {} (esperado {}), rating_total {} (esperado {})".format(*row)
+                )
+        if found:
+            raise CommandError(f"{found} perfiles con agregados desactualizados")
+        self.stdout.write(self.style.SUCCESS("Agregados de calificación consistentes"))
@@ -0,0 +1,122 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from accounts.models import CreatorPortfolioItem, CreatorProfile, SocialNetworkLink
+from accounts.serializers import CreatorUserSerializer
+from accounts.views import CreatorViewSet
+from core.benchmarks import make_view, measure
+from projects.models import (
+    Convocatoria, ConvocatoriaApplication, Project, ProjectInvitation,
+    ProjectMessage, ProjectProposal
+)
+from projects.serializers import (
+    ConvocatoriaApplicationSerializer, ConvocatoriaSerializer, ProjectInvitationSerializer,
+    ProjectMessageSerializer, ProjectProposalSerializer, ProjectSerializer
+)
+from projects.views import (
+    ConvocatoriaApplicationViewSet, ConvocatoriaViewSet, ProjectInvitationViewSet,
+    ProjectMessageViewSet, ProjectProposalViewSet, ProjectViewSet
+)
+
+User = get_user_model()
+
+# (nombre, viewset, serializer, queryset sin optimizar)
+ENDPOINTS = [
+    ('projects', ProjectViewSet, ProjectSerializer, lambda: Project.objects.all()),
+    ('proposals', ProjectProposalViewSet, ProjectProposalSerializer, lambda: ProjectProposal.objects.all()),
+    ('invitations', ProjectInvitationViewSet, ProjectInvitationSerializer, lambda: ProjectInvitation.objects.all()),
+    ('messages', ProjectMessageViewSet, ProjectMessageSerializer, lambda: ProjectMessage.objects.all()),
+    ('convocatorias', ConvocatoriaViewSet, ConvocatoriaSerializer, lambda: Convocatoria.objects.all()),
+    ('applications', ConvocatoriaApplicationViewSet, ConvocatoriaApplicationSerializer,
+     lambda: ConvocatoriaApplication.objects.all()),
+    ('creators', CreatorViewSet, CreatorUserSerializer, lambda: User.objects.filter(is_creator=True).order_by('id')),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara latencia y consultas de una página de cada listado con el queryset "
+        "sin optimizar (antes) y el get_queryset del viewset (después)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000],
+                            help="Filas por página a medir")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = options['sizes']
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            staff = seed_rows(max(sizes))
+            self.stdout.write(
+                f"{'endpoint':<14}{'filas':>7}{'antes ms':>11}{'consultas':>11}{'después ms':>12}{'consultas':>11}"
+            )
+            for name, view_class, serializer_class, naive in ENDPOINTS:
+                optimized = make_view(view_class, staff).get_queryset()
+                for size in sizes:
+                    before = measure(lambda: serializer_class(naive()[:size], many=True).data, options['repeat'])
+                    after = measure(lambda: serializer_class(optimized.all()[:size], many=True).data, options['repeat'])
+                    self.stdout.write(
+                        f"{name:<14}{size:>7}{before[0]:>11.1f}{before[1]:>11}{after[0]:>12.1f}{after[1]:>11}"
+                    )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+
+def seed_rows(rows):
+    """Crea ``rows`` filas de cada listado con bulk_create y devuelve un usuario staff"""
+    staff = User.objects.create_user('bench-staff', 'staff@example.com', 'x', is_staff=True)
+    clients = User.objects.bulk_create([
+        User(username=f'bench-client-{i}', email=f'client{i}@example.com', password='!')
+        for i in range(max(rows // 50, 1))
+    ])
+    creators = User.objects.bulk_create([
+        User(username=f'bench-creator-{i}', email=f'creator{i}@example.com', password='!', is_creator=True)
+        for i in range(rows)
+    ])
+    profiles = CreatorProfile.objects.bulk_create([CreatorProfile(user=creator) for creator in creators])
+    CreatorPortfolioItem.objects.bulk_create([
+        CreatorPortfolioItem(creator_profile=profile, type='image', url='https://example.com/a.jpg', title='Trabajo')
+        for profile in profiles
+    ])
+    SocialNetworkLink.objects.bulk_create([
+        SocialNetworkLink(user=user, network=network, url=f'https://{network}.com/{user.username}')
+        for user in clients + creators
+        for network in ('instagram', 'tiktok')
+    ])
+
+    deadline = date.today() + timedelta(days=30)
+    projects = Project.objects.bulk_create([
+        Project(title=f'Proyecto {i}', description='Descripción', client=clients[i % len(clients)],
+                status='open', is_public=True, budget=1000)
+        for i in range(rows)
+    ])
+    convocatorias = Convocatoria.objects.bulk_create([
+        Convocatoria(title=f'Convocatoria {i}', description='Descripción', client=clients[i % len(clients)],
+                     deadline=deadline, status='open')
+        for i in range(rows)
+    ])
+    ProjectProposal.objects.bulk_create([
+        ProjectProposal(project=project, creator=creator, message='Hola', price=500, estimated_days=10)
+        for project, creator in zip(projects, creators)
+    ])
+    ProjectInvitation.objects.bulk_create([
+        ProjectInvitation(project=project, creator=creator, message='Te invito')
+        for project, creator in zip(projects, creators)
+    ])
+    ProjectMessage.objects.bulk_create([
+        ProjectMessage(project=project, sender=project.client, receiver=creator, content='Hola')
+        for project, creator in zip(projects, creators)
+    ])
+    ConvocatoriaApplication.objects.bulk_create([
+        ConvocatoriaApplication(convocatoria=convocatoria, creator=creator, cover_letter='Carta',
+                                price=700, estimated_days=12)
+        for convocatoria, creator in zip(convocatorias, creators)
+    ])
+    return staff
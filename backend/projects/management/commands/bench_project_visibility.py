@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from core.benchmarks import make_view, measure
+from projects.models import Project, ProjectInvitation
+from projects.views import ProjectViewSet
+
+User = get_user_model()
+
+BATCH_SIZE = 10000
+PAGE_SIZE = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara la visibilidad de proyectos para creadores: OR + JOIN + DISTINCT "
+        "(antes) contra EXISTS (después), en conteo, primera página, página profunda "
+        "y búsqueda por id"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10 ** 4, 10 ** 5, 10 ** 6],
+                            help="Cantidad de proyectos a medir")
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.run(sorted(options['sizes']), options['repeat'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, sizes, repeat):
+        client = User.objects.create_user('bench-client', 'client@example.com', 'x')
+        creator = User.objects.create_user('bench-creator', 'creator@example.com', 'x', is_creator=True)
+        others = User.objects.bulk_create([
+            User(username=f'bench-other-{i}', password='!', is_creator=True) for i in range(20)
+        ])
+
+        self.stdout.write(
+            f"{'proyectos':>10} {'operación':<14}{'antes ms':>10}{'después ms':>12}"
+        )
+        for size in sizes:
+            self.seed(size, client, creator, others)
+            before_qs = Project.objects.filter(
+                Q(is_public=True) | Q(invitations__creator=creator)
+            ).distinct().order_by('-created_at', '-id')
+            # Sin select_related/prefetch para comparar solo el filtro de visibilidad
+            after_qs = make_view(ProjectViewSet, creator).get_queryset().select_related(None) \
+                .prefetch_related(None).order_by('-created_at', '-id')
+
+            if before_qs.count() != after_qs.count() or \
+                    list(before_qs.values_list('id', flat=True)[:50]) != list(after_qs.values_list('id', flat=True)[:50]):
+                raise CommandError(f"Los resultados difieren con {size} proyectos")
+
+            invited_private = ProjectInvitation.objects.filter(
+                creator=creator, project__is_public=False
+            ).values_list('project_id', flat=True).last()
+            deep = slice(1000, 1000 + PAGE_SIZE)
+            operations = [
+                ('count', lambda qs: qs.count()),
+                ('primera página', lambda qs: list(qs[:PAGE_SIZE])),
+                ('página 100', lambda qs: list(qs[deep])),
+                ('get_object', lambda qs: qs.filter(pk=invited_private).get()),
+            ]
+            for name, operation in operations:
+                before, _ = measure(lambda: operation(before_qs), repeat)
+                after, _ = measure(lambda: operation(after_qs), repeat)
+                self.stdout.write(f"{size:>10} {name:<14}{before:>10.1f}{after:>12.1f}")
+
+    def seed(self, size, client, creator, others):
+        """Completa hasta ``size`` proyectos: 30% públicos, el creador invitado a 1 de cada 200"""
+        start = Project.objects.count()
+        for offset in range(start, size, BATCH_SIZE):
+            numbers = range(offset, min(offset + BATCH_SIZE, size))
+            projects = Project.objects.bulk_create([
+                Project(title=f'Proyecto {i}', description='Descripción', client=client,
+                        status='open', is_public=i % 10 < 3)
+                for i in numbers
+            ])
+            invitations = [
+                ProjectInvitation(project=project, creator=creator, message='Te invito')
+                for i, project in zip(numbers, projects) if i % 200 == 5
+            ]
+            invitations += [
+                ProjectInvitation(project=project, creator=others[i % len(others)], message='Te invito')
+                for i, project in zip(numbers, projects) if i % 10 == 0
+            ]
+            ProjectInvitation.objects.bulk_create(invitations)
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from accounts.views import CreatorViewSet
+from core.benchmarks import make_view, measure
+from core.rows import compile_serializer
+from projects.views import ConvocatoriaApplicationViewSet, ProjectMessageViewSet, ProjectViewSet
+from .bench_list_endpoints import seed_rows
+
+# Listados con RowListMixin
+ENDPOINTS = [
+    ('projects', ProjectViewSet),
+    ('creators', CreatorViewSet),
+    ('messages', ProjectMessageViewSet),
+    ('applications', ConvocatoriaApplicationViewSet),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara filas por segundo de los listados con RowListMixin serializando con "
+        "DRF (modelos + ModelSerializer) y desde filas values() (core/rows.py). Mide "
+        "consulta, serialización y JSON, y verifica que el JSON sea idéntico."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000],
+                            help="Filas por página a medir")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        sizes = options['sizes']
+        renderer = JSONRenderer()
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            staff = seed_rows(max(sizes))
+            self.stdout.write(
+                f"{'endpoint':<14}{'filas':>7}{'DRF filas/s':>14}{'values() filas/s':>19}{'mejora':>9}"
+            )
+            for name, view_class in ENDPOINTS:
+                view = make_view(view_class, staff)
+                serializer_class = view.get_serializer_class()
+                plan = compile_serializer(serializer_class)
+                if plan is None:
+                    raise CommandError(f"{serializer_class.__name__} no se puede compilar")
+                queryset = view.get_queryset()
+
+                for size in sizes:
+                    def drf():
+                        return renderer.render(serializer_class(queryset.all()[:size], many=True).data)
+
+                    def rows():
+                        return renderer.render(plan.serialize(list(plan.rows(queryset)[:size])))
+
+                    if drf() != rows():
+                        raise CommandError(f"{name}: el JSON de values() no coincide con el de DRF")
+                    before = measure(drf, options['repeat'])[0]
+                    after = measure(rows, options['repeat'])[0]
+                    self.stdout.write(
+                        f"{name:<14}{size:>7}{size / before * 1000:>14,.0f}"
+                        f"{size / after * 1000:>19,.0f}{before / after:>8.1f}x"
+                    )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,456 @@
+import random
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import CreatorPortfolioItem, CreatorProfile, SocialNetworkLink
+from projects.models import (
+    Convocatoria, ConvocatoriaApplication, Conversation, Project, ProjectInvitation,
+    ProjectMessage, ProjectProposal, ProjectReview, ReviewDue
+)
+
+User = get_user_model()
+
+SPECIALTIES = [
+    'fotografía', 'video', 'edición', 'ilustración', 'diseño gráfico', 'motion graphics',
+    'copywriting', 'community management', 'podcast', 'animación 3D', 'UGC', 'streaming',
+]
+LOCATIONS = ['Buenos Aires', 'Córdoba', 'Rosario', 'Mendoza', 'La Plata', 'Mar del Plata', 'Salta']
+NETWORKS = [network for network, _ in SocialNetworkLink.NETWORK_TYPES]
+WORDS = (
+    'campaña video marca lanzamiento producto redes contenido fotos reel historia '
+    'evento entrevista tutorial reseña colección verano invierno promoción tienda'
+).split()
+
+PROJECT_STATUSES = ['draft', 'open', 'in_progress', 'completed', 'canceled']
+PROJECT_STATUS_WEIGHTS = [10, 40, 20, 25, 5]
+RATINGS = [1, 2, 3, 4, 5]
+RATING_WEIGHTS = [2, 3, 10, 35, 50]
+
+
+def zipf_cum_weights(n, exponent):
+    """Pesos acumulados de una distribución de Zipf: el rango 1 es el más frecuente"""
+    total = 0.0
+    weights = []
+    for rank in range(1, n + 1):
+        total += 1 / rank ** exponent
+        weights.append(total)
+    return weights
+
+
+class Skewed:
+    """Elige elementos con probabilidad de Zipf; el orden de popularidad es aleatorio"""
+
+    def __init__(self, rng, items, exponent):
+        self.rng = rng
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cum_weights = zipf_cum_weights(len(self.items), exponent)
+        self.total = self.cum_weights[-1] if self.items else 0
+
+    def pick(self):
+        index = bisect_left(self.cum_weights, self.rng.random() * self.total)
+        return self.items[min(index, len(self.items) - 1)]
+
+    def sample(self, k):
+        """Hasta ``k`` elementos distintos"""
+        k = min(k, len(self.items))
+        chosen = {}
+        for _ in range(k * 4):
+            item = self.pick()
+            chosen[id(item)] = item
+            if len(chosen) == k:
+                break
+        return list(chosen.values())
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Permite asignar created_at/updated_at a mano: bulk_create respeta auto_now(_add)"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un marketplace sintético con volumen realista: usuarios, perfiles, "
+        "portafolios, proyectos, propuestas, invitaciones, convocatorias, aplicaciones, "
+        "mensajes y reseñas. La actividad se concentra como en el tráfico real (pocos "
+        "clientes con muchos proyectos, pocos hilos con muchos mensajes) y el resultado "
+        "es el mismo para la misma semilla."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--projects', type=int, default=2000)
+        parser.add_argument('--messages', type=int, default=50000)
+        parser.add_argument('--convocatorias', type=int, help="Por defecto, un cuarto de --projects")
+        parser.add_argument('--creator-ratio', type=float, default=0.4,
+                            help="Fracción de usuarios que son creadores")
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help="Exponente de Zipf: más alto, actividad más concentrada")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--password', default='seed-password',
+                            help="Contraseña de todos los usuarios generados")
+        parser.add_argument('--start', default='2024-01-01', help="Fecha del primer registro")
+        parser.add_argument('--days', type=int, default=365, help="Días que abarca la actividad")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.skew = options['skew']
+        self.prefix = f"seed{options['seed']}"
+        self.start = timezone.make_aware(datetime.fromisoformat(options['start']))
+        self.span = timedelta(days=options['days'])
+
+        if User.objects.filter(username__startswith=f'{self.prefix}-').exists():
+            raise CommandError(f"Ya hay usuarios generados con la semilla {options['seed']}")
+        creator_count = max(1, int(options['users'] * options['creator_ratio']))
+        client_count = max(1, options['users'] - creator_count)
+        convocatoria_count = options['convocatorias']
+        if convocatoria_count is None:
+            convocatoria_count = options['projects'] // 4
+
+        timestamped = (User, CreatorPortfolioItem, Project, ProjectProposal, ProjectInvitation,
+                       Convocatoria, ConvocatoriaApplication, ProjectMessage, ProjectReview)
+        with explicit_timestamps(*timestamped):
+            clients, creators = self.stage('usuarios', self.seed_users, client_count, creator_count,
+                                           options['password'])
+            profiles = self.stage('perfiles', self.seed_profiles, creators)
+            self.stage('portafolios', self.seed_portfolio, profiles)
+            self.stage('redes sociales', self.seed_social_networks, clients + creators)
+            projects = self.stage('proyectos', self.seed_projects, clients, options['projects'])
+            threads, hired = self.stage('propuestas e invitaciones', self.seed_proposals, projects, creators)
+            convocatorias = self.stage('convocatorias', self.seed_convocatorias, clients, convocatoria_count)
+            self.stage('aplicaciones', self.seed_applications, convocatorias, creators)
+            self.stage('mensajes', self.seed_messages, threads, options['messages'])
+            reviewed = self.stage('reseñas', self.seed_reviews, hired)
+            self.stage('reseñas pendientes', self.seed_review_due, projects, reviewed)
+
+        # Las reseñas se insertaron sin señales: recalcular los agregados de rating
+        call_command('backfill_ratings', stdout=self.stdout)
+        # Tampoco hubo señales para el índice de recomendaciones
+        call_command('build_creator_index', stdout=self.stdout)
+
+    def stage(self, name, seed, *args):
+        started = time.perf_counter()
+        result = seed(*args)
+        self.stdout.write(f"{name:<28} {time.perf_counter() - started:>8.1f} s")
+        return result
+
+    def insert(self, model, rows):
+        """Inserta ``rows`` (cualquier iterable) en lotes; devuelve la cantidad"""
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch)
+            total += len(batch)
+        return total
+
+    def bulk(self, model, rows):
+        """Como insert, pero devuelve los objetos (con pk) para relacionarlos después"""
+        objects = list(rows)
+        for start in range(0, len(objects), self.batch_size):
+            model.objects.bulk_create(objects[start:start + self.batch_size])
+        return objects
+
+    def moment(self, fraction):
+        """Un instante dentro del período, ``fraction`` entre 0 y 1"""
+        return self.start + self.span * min(max(fraction, 0.0), 1.0)
+
+    def text(self, words):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(words)).capitalize()
+
+    def money(self, low, high):
+        return Decimal(self.rng.randrange(low, high, 50))
+
+    def seed_users(self, client_count, creator_count, password):
+        rng = self.rng
+        hashed = make_password(password, salt=self.prefix)
+        users = self.bulk(User, (
+            User(
+                username=f'{self.prefix}-{role}-{i}',
+                email=f'{self.prefix}-{role}-{i}@example.com',
+                password=hashed,
+                first_name=f'{role.capitalize()} {i}',
+                is_creator=role == 'creator',
+                bio=self.text(rng.randint(0, 20)),
+                date_joined=(joined := self.moment(rng.random() * 0.2)),
+                updated_at=joined,
+            )
+            for role, count in (('client', client_count), ('creator', creator_count))
+            for i in range(count)
+        ))
+        # Un staff para advise_indexes y los benchmarks
+        User.objects.create(
+            username=f'{self.prefix}-staff', email=f'{self.prefix}-staff@example.com',
+            password=hashed, is_staff=True, date_joined=self.start, updated_at=self.start,
+        )
+        return users[:client_count], users[client_count:]
+
+    def seed_profiles(self, creators):
+        rng = self.rng
+        return self.bulk(CreatorProfile, (
+            CreatorProfile(
+                user=creator,
+                specialties=', '.join(rng.sample(SPECIALTIES, rng.randint(1, 4))),
+                experience_years=int(rng.expovariate(1 / 4)),
+                location=rng.choice(LOCATIONS),
+            )
+            for creator in creators
+        ))
+
+    def seed_portfolio(self, profiles):
+        rng = self.rng
+
+        def items():
+            for profile in profiles:
+                # Pocos creadores con portafolios grandes
+                for n in range(min(int(rng.paretovariate(1.5)) - 1, 30)):
+                    yield CreatorPortfolioItem(
+                        creator_profile=profile,
+                        type='video' if rng.random() < 0.3 else 'image',
+                        url=f'https://cdn.example.com/{profile.user.username}/{n}.jpg',
+                        title=self.text(3),
+                        description=self.text(rng.randint(5, 25)),
+                        created_at=self.moment(rng.random()),
+                    )
+
+        return self.insert(CreatorPortfolioItem, items())
+
+    def seed_social_networks(self, users):
+        rng = self.rng
+        return self.insert(SocialNetworkLink, (
+            SocialNetworkLink(
+                user=user, network=network, username=user.username,
+                url=f'https://{network}.example.com/{user.username}',
+            )
+            for user in users
+            for network in rng.sample(NETWORKS, rng.randint(0, 3))
+        ))
+
+    def seed_projects(self, clients, count):
+        rng = self.rng
+        heavy_clients = Skewed(rng, clients, self.skew)
+        projects = []
+        for i in range(count):
+            created_at = self.moment(0.2 + 0.8 * i / max(count, 1)) + timedelta(minutes=rng.randint(0, 59))
+            status = rng.choices(PROJECT_STATUSES, PROJECT_STATUS_WEIGHTS)[0]
+            projects.append(Project(
+                title=self.text(4),
+                description=self.text(rng.randint(10, 60)),
+                client=heavy_clients.pick(),
+                created_at=created_at,
+                updated_at=created_at + timedelta(days=rng.randint(0, 30)),
+                status=status,
+                budget=self.money(100, 20000) if rng.random() < 0.8 else None,
+                is_public=status != 'draft' and rng.random() < 0.6,
+                deadline=(created_at + timedelta(days=rng.randint(7, 90))).date(),
+            ))
+        return self.bulk(Project, projects)
+
+    def seed_proposals(self, projects, creators):
+        """
+        Propuestas e invitaciones. Devuelve los hilos de chat (proyecto, creador)
+        y los creadores contratados en proyectos completados.
+        """
+        rng = self.rng
+        popular = Skewed(rng, creators, self.skew)
+        hot_projects = set(id(project) for project in Skewed(rng, projects, self.skew).sample(len(projects) // 20))
+        proposals, invitations = [], []
+        threads = {}
+        hired = []
+
+        for project in projects:
+            if project.status == 'draft':
+                continue
+            if project.is_public:
+                average = 15 if id(project) in hot_projects else 2
+                proposal_creators = popular.sample(int(rng.expovariate(1 / average)))
+            else:
+                proposal_creators = []
+            invited = popular.sample(rng.randint(1, 3)) if rng.random() < 0.3 or not project.is_public else []
+
+            accepted = None
+            if proposal_creators and project.status in ('in_progress', 'completed'):
+                accepted = rng.choice(proposal_creators)
+            for creator in proposal_creators:
+                created_at = project.created_at + timedelta(hours=rng.randint(1, 240))
+                proposals.append(ProjectProposal(
+                    project=project, creator=creator, message=self.text(rng.randint(10, 40)),
+                    price=self.money(100, 20000), estimated_days=rng.randint(1, 60),
+                    status='accepted' if creator is accepted else rng.choice(['pending', 'pending', 'rejected']),
+                    created_at=created_at, updated_at=created_at,
+                ))
+                threads[(project.pk, creator.pk)] = (project, creator)
+            for creator in invited:
+                invitations.append(ProjectInvitation(
+                    project=project, creator=creator, message=self.text(rng.randint(5, 20)),
+                    status=rng.choice(['pending', 'accepted', 'rejected']),
+                    created_at=project.created_at + timedelta(hours=rng.randint(0, 48)),
+                ))
+                threads[(project.pk, creator.pk)] = (project, creator)
+            if accepted is not None and project.status == 'completed':
+                hired.append((project, accepted))
+
+        self.insert(ProjectProposal, proposals)
+        self.insert(ProjectInvitation, invitations)
+        return list(threads.values()), hired
+
+    def seed_convocatorias(self, clients, count):
+        rng = self.rng
+        heavy_clients = Skewed(rng, clients, self.skew)
+        convocatorias = []
+        for i in range(count):
+            created_at = self.moment(0.2 + 0.7 * i / max(count, 1)) + timedelta(minutes=rng.randint(0, 59))
+            budget_min = self.money(100, 5000)
+            start_date = (created_at + timedelta(days=rng.randint(10, 40))).date()
+            convocatorias.append(Convocatoria(
+                title=self.text(4),
+                description=self.text(rng.randint(10, 60)),
+                client=heavy_clients.pick(),
+                budget_min=budget_min,
+                budget_max=budget_min + self.money(0, 10000),
+                deadline=(created_at + timedelta(days=rng.randint(5, 30))).date(),
+                start_date=start_date,
+                end_date=start_date + timedelta(days=rng.randint(5, 90)),
+                status=rng.choices(['draft', 'open', 'closed'], [10, 50, 40])[0],
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        return self.bulk(Convocatoria, convocatorias)
+
+    def seed_applications(self, convocatorias, creators):
+        rng = self.rng
+        popular = Skewed(rng, creators, self.skew)
+        hot = set(id(c) for c in Skewed(rng, convocatorias, self.skew).sample(len(convocatorias) // 20))
+
+        def applications():
+            for convocatoria in convocatorias:
+                if convocatoria.status == 'draft':
+                    continue
+                average = 40 if id(convocatoria) in hot else 5
+                for creator in popular.sample(int(rng.expovariate(1 / average))):
+                    yield ConvocatoriaApplication(
+                        convocatoria=convocatoria, creator=creator,
+                        cover_letter=self.text(rng.randint(10, 60)),
+                        price=self.money(100, 20000), estimated_days=rng.randint(1, 90),
+                        status=rng.choices(['pending', 'shortlisted', 'accepted', 'rejected'], [60, 15, 5, 20])[0],
+                        created_at=convocatoria.created_at + timedelta(hours=rng.randint(1, 24 * 20)),
+                    )
+
+        return self.insert(ConvocatoriaApplication, applications())
+
+    def seed_messages(self, threads, count):
+        """
+        Reparte ``count`` mensajes entre los hilos con una distribución de Zipf (pocos
+        hilos concentran la mayoría) y arma el resumen de cada conversación.
+        """
+        rng = self.rng
+        if not threads or not count:
+            return 0
+        hot_threads = Skewed(rng, range(len(threads)), self.skew)
+        per_thread = Counter()
+        for start in range(0, count, self.batch_size):
+            per_thread.update(hot_threads.pick() for _ in range(min(self.batch_size, count - start)))
+
+        # Último mensaje y no leídos de cada hilo, para la tabla Conversation
+        summaries = {}
+        end = self.moment(1)
+        # Generar texto por mensaje domina el tiempo con millones de filas
+        contents = [self.text(rng.randint(1, 30)) for _ in range(1000)]
+
+        def messages():
+            for index in sorted(per_thread):
+                project, creator = threads[index]
+                client_id = project.client_id
+                total = per_thread[index]
+                sent_at = project.created_at + timedelta(hours=rng.randint(1, 72))
+                # Unas horas entre mensajes; los hilos largos se comprimen para no
+                # pasarse del final del período
+                mean_gap = max(min((end - sent_at).total_seconds() / total, 4 * 3600), 1)
+                # Lo que queda sin leer son los últimos mensajes de cada hilo
+                unread_from = total - min(total, rng.choice([0, 0, 0, 1, 2, 5]))
+                unread = Counter()
+                for position in range(total):
+                    sender, receiver = (client_id, creator.pk) if rng.random() < 0.5 else (creator.pk, client_id)
+                    sent_at += timedelta(seconds=int(rng.expovariate(1 / mean_gap)) + 1)
+                    read = position < unread_from
+                    if not read:
+                        unread[receiver] += 1
+                    last = ProjectMessage(
+                        project_id=project.pk, sender_id=sender, receiver_id=receiver,
+                        content=rng.choice(contents), read=read, created_at=sent_at,
+                    )
+                    yield last
+                summaries[index] = (last, unread)
+
+        inserted = self.insert(ProjectMessage, messages())
+
+        def conversations():
+            for index, (last, unread) in summaries.items():
+                project, creator = threads[index]
+                user_a, user_b = Conversation.participants(project.client_id, creator.pk)
+                yield Conversation(
+                    project=project, user_a_id=user_a, user_b_id=user_b,
+                    # Sin pk si el motor no devuelve los ids de bulk_create
+                    last_message_id=last.pk,
+                    last_message_snippet=last.content[:140],
+                    last_message_at=last.created_at,
+                    unread_a=unread[user_a],
+                    unread_b=unread[user_b],
+                )
+
+        self.insert(Conversation, conversations())
+        return inserted
+
+    def seed_reviews(self, hired):
+        """Devuelve los ids de los proyectos reseñados"""
+        rng = self.rng
+        reviews = [
+            ProjectReview(
+                project=project, client_id=project.client_id, creator=creator,
+                rating=rng.choices(RATINGS, RATING_WEIGHTS)[0],
+                comment=self.text(rng.randint(5, 30)) if rng.random() < 0.7 else None,
+                recommendation=self.text(rng.randint(3, 10)) if rng.random() < 0.3 else None,
+                created_at=project.updated_at + timedelta(days=rng.randint(0, 10)),
+            )
+            for project, creator in hired
+            if rng.random() < 0.7
+        ]
+        self.insert(ProjectReview, reviews)
+        return {review.project_id for review in reviews}
+
+    def seed_review_due(self, projects, reviewed):
+        """Lo que harían las señales: los completados sin reseña quedan pendientes"""
+        return self.insert(ReviewDue, (
+            ReviewDue(project=project, client_id=project.client_id, due_at=project.updated_at)
+            for project in projects
+            if project.status == 'completed' and project.pk not in reviewed
+        ))
@@ -0,0 +1,152 @@
+# Generated by Django 5.0.5 on 2026-10-18 16:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Convocatoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='título')),
+                ('description', models.TextField(verbose_name='descripción')),
+                ('budget_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='presupuesto mínimo')),
+                ('budget_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='presupuesto máximo')),
+                ('deadline', models.DateField(verbose_name='fecha límite para aplicar')),
+                ('start_date', models.DateField(blank=True, null=True, verbose_name='fecha de inicio')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='fecha de finalización')),
+                ('status', models.CharField(choices=[('draft', 'Borrador'), ('open', 'Abierta'), ('closed', 'Cerrada')], default='draft', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='convocatorias', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'convocatoria',
+                'verbose_name_plural': 'convocatorias',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='título')),
+                ('description', models.TextField(verbose_name='descripción')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('draft', 'Borrador'), ('open', 'Abierto'), ('in_progress', 'En progreso'), ('completed', 'Completado'), ('canceled', 'Cancelado')], default='draft', max_length=20)),
+                ('budget', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='presupuesto')),
+                ('is_public', models.BooleanField(default=False, help_text='Si está marcado, será visible en la sección Generales', verbose_name='es público')),
+                ('deadline', models.DateField(blank=True, null=True, verbose_name='fecha límite')),
+                ('reviews_left', models.PositiveSmallIntegerField(default=3, verbose_name='revisiones restantes')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='client_projects', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'proyecto',
+                'verbose_name_plural': 'proyectos',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.TextField(verbose_name='contenido')),
+                ('read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='projects.project')),
+                ('receiver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='received_messages', to=settings.AUTH_USER_MODEL)),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sent_messages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'mensaje',
+                'verbose_name_plural': 'mensajes',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ConvocatoriaApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cover_letter', models.TextField(verbose_name='carta de presentación')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='precio propuesto')),
+                ('estimated_days', models.PositiveIntegerField(verbose_name='días estimados')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('shortlisted', 'Preseleccionado'), ('accepted', 'Aceptado'), ('rejected', 'Rechazado')], default='pending', max_length=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('convocatoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='projects.convocatoria')),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'aplicación',
+                'verbose_name_plural': 'aplicaciones',
+                'ordering': ['-created_at'],
+                'unique_together': {('convocatoria', 'creator')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectInvitation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField(verbose_name='mensaje')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('accepted', 'Aceptada'), ('rejected', 'Rechazada')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invitations', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invitations', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'invitación',
+                'verbose_name_plural': 'invitaciones',
+                'ordering': ['-created_at'],
+                'unique_together': {('project', 'creator')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectProposal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField(verbose_name='mensaje')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='precio propuesto')),
+                ('estimated_days', models.PositiveIntegerField(verbose_name='días estimados')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('accepted', 'Aceptada'), ('rejected', 'Rechazada')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='creator_proposals', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proposals', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'propuesta',
+                'verbose_name_plural': 'propuestas',
+                'ordering': ['-created_at'],
+                'unique_together': {('project', 'creator')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectReview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.PositiveSmallIntegerField(choices=[(1, 1), (2, 2), (3, 3), (4, 4), (5, 5)], verbose_name='calificación')),
+                ('comment', models.TextField(blank=True, null=True, verbose_name='comentario')),
+                ('recommendation', models.TextField(blank=True, null=True, verbose_name='recomendación')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='client_reviews', to=settings.AUTH_USER_MODEL)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='creator_reviews', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='projects.project')),
+            ],
+            options={
+                'verbose_name': 'reseña',
+                'verbose_name_plural': 'reseñas',
+                'ordering': ['-created_at'],
+                'unique_together': {('project', 'client', 'creator')},
+            },
+        ),
+    ]
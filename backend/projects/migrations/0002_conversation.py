@@ -0,0 +1,60 @@
+# Generated by Django 5.0.5 on 2026-10-18 16:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_conversations(apps, schema_editor):
+    """Construye los resúmenes a partir de los mensajes existentes"""
+    ProjectMessage = apps.get_model('projects', 'ProjectMessage')
+    Conversation = apps.get_model('projects', 'Conversation')
+
+    summaries = {}
+    messages = ProjectMessage.objects.order_by('created_at', 'id').values_list(
+        'id', 'project_id', 'sender_id', 'receiver_id', 'content', 'read', 'created_at'
+    )
+    for pk, project_id, sender_id, receiver_id, content, read, created_at in messages.iterator(chunk_size=5000):
+        user_a, user_b = sorted((sender_id, receiver_id))
+        summary = summaries.setdefault((project_id, user_a, user_b), {'unread_a': 0, 'unread_b': 0})
+        summary.update(last_message_id=pk, last_message_snippet=content[:140], last_message_at=created_at)
+        if not read:
+            summary['unread_a' if receiver_id == user_a else 'unread_b'] += 1
+
+    Conversation.objects.bulk_create([
+        Conversation(project_id=project_id, user_a_id=user_a, user_b_id=user_b, **summary)
+        for (project_id, user_a, user_b), summary in summaries.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message_snippet', models.CharField(blank=True, max_length=140)),
+                ('last_message_at', models.DateTimeField()),
+                ('unread_a', models.PositiveIntegerField(default=0, help_text='Mensajes sin leer de user_a')),
+                ('unread_b', models.PositiveIntegerField(default=0, help_text='Mensajes sin leer de user_b')),
+                ('last_message', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='projects.projectmessage')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to='projects.project')),
+                ('user_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'conversación',
+                'verbose_name_plural': 'conversaciones',
+                'ordering': ['-last_message_at'],
+                'indexes': [models.Index(fields=['user_a', '-last_message_at'], name='conversation_user_a_idx'), models.Index(fields=['user_b', '-last_message_at'], name='conversation_user_b_idx')],
+                'unique_together': {('project', 'user_a', 'user_b')},
+            },
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.5 on 2026-10-18 16:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+from core.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('projects', '0002_conversation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='projectmessage',
+            index=models.Index(fields=['receiver', 'project', 'read'], name='message_receiver_unread_idx'),
+        ),
+    ]
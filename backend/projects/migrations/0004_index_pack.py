@@ -0,0 +1,43 @@
+# Generated by Django 5.0.5 on 2026-10-18 16:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+from core.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('projects', '0003_message_receiver_unread_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='convocatoria',
+            index=models.Index(fields=['status', '-created_at'], name='convocatoria_status_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='project',
+            index=models.Index(fields=['client', 'status'], name='project_client_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['-created_at'], name='project_public_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='projectmessage',
+            index=models.Index(condition=models.Q(('read', False)), fields=['receiver'], name='message_unread_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='projectmessage',
+            index=models.Index(fields=['project', 'created_at', 'id'], name='message_project_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='projectreview',
+            index=models.Index(fields=['client', 'project'], name='review_client_project_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.5 on 2026-10-18 17:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill_review_due(apps, schema_editor):
+    """Una fila por proyecto completado sin reseña de su cliente"""
+    Project = apps.get_model('projects', 'Project')
+    ProjectReview = apps.get_model('projects', 'ProjectReview')
+    ReviewDue = apps.get_model('projects', 'ReviewDue')
+
+    reviewed = ProjectReview.objects.filter(project=OuterRef('pk'), client=OuterRef('client'))
+    pending = Project.objects.filter(status='completed').filter(~Exists(reviewed)).values_list(
+        'id', 'client_id', 'updated_at'
+    )
+    ReviewDue.objects.bulk_create((
+        ReviewDue(project_id=pk, client_id=client_id, due_at=updated_at)
+        for pk, client_id, updated_at in pending.iterator(chunk_size=5000)
+    ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_project_recent_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewDue',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='review_due', serialize=False, to='projects.project')),
+                ('due_at', models.DateTimeField(verbose_name='pendiente desde')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'reseña pendiente',
+                'verbose_name_plural': 'reseñas pendientes',
+                'ordering': ['-due_at'],
+                'indexes': [models.Index(fields=['client', '-due_at', '-project'], name='review_due_client_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_review_due, migrations.RunPython.noop),
+    ]
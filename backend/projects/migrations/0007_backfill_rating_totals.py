@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, Round
+from django.db.models.lookups import GreaterThan
+
+
+def backfill_rating_totals(apps, schema_editor):
+    """
+    ``rating_total`` se agregó en 0 (accounts 0002): recalcula los tres agregados
+    desde las reseñas, como ``backfill_ratings``
+    """
+    CreatorProfile = apps.get_model('accounts', 'CreatorProfile')
+    ProjectReview = apps.get_model('projects', 'ProjectReview')
+
+    reviews = ProjectReview.objects.filter(creator_id=OuterRef('user_id')).order_by().values('creator_id')
+    CreatorProfile.objects.update(
+        review_count=Coalesce(Subquery(reviews.annotate(n=Count('id')).values('n')), 0),
+        rating_total=Coalesce(Subquery(reviews.annotate(t=Sum('rating')).values('t')), 0),
+    )
+    CreatorProfile.objects.update(average_rating=models.Case(
+        models.When(
+            GreaterThan(F('review_count'), 0),
+            then=Round(Cast(F('rating_total'), models.FloatField()) / F('review_count'), 2),
+        ),
+        default=models.Value(Decimal('0')),
+        output_field=models.DecimalField(max_digits=3, decimal_places=2),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_creatorprofile_rating_total'),
+        ('projects', '0006_review_due'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+    ]
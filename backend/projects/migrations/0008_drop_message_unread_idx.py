@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from core.operations import RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # DROP INDEX CONCURRENTLY no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('projects', '0007_backfill_rating_totals'),
+    ]
+
+    operations = [
+        # El conteo de no leídos por receptor usa message_receiver_unread_idx
+        # (receiver, project, read) como índice de cobertura; el parcial no se elegía
+        RemoveIndexConcurrently(
+            model_name='projectmessage',
+            name='message_unread_idx',
+        ),
+    ]
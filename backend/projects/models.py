@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 
@@ -30,6 +30,12 @@ class Project(models.Model):
         ordering = ['-created_at']
         verbose_name = _('proyecto')
         verbose_name_plural = _('proyectos')
+        indexes = [
+            models.Index(fields=['client', 'status'], name='project_client_status_idx'),
+            models.Index(fields=['-created_at'], name='project_recent_idx'),
+            models.Index(fields=['-created_at'], condition=models.Q(is_public=True),
+                         name='project_public_recent_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -103,6 +109,10 @@ class ProjectMessage(models.Model):
         ordering = ['created_at']
         verbose_name = _('mensaje')
         verbose_name_plural = _('mensajes')
+        indexes = [
+            models.Index(fields=['receiver', 'project', 'read'], name='message_receiver_unread_idx'),
+            models.Index(fields=['project', 'created_at', 'id'], name='message_project_created_idx'),
+        ]
     
     def __str__(self):
         return f"Mensaje de {self.sender.username} a {self.receiver.username}"
@@ -133,6 +143,9 @@ class Convocatoria(models.Model):
         ordering = ['-created_at']
         verbose_name = _('convocatoria')
         verbose_name_plural = _('convocatorias')
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='convocatoria_status_recent_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -183,6 +196,178 @@ class ProjectReview(models.Model):
         verbose_name = _('reseña')
         verbose_name_plural = _('reseñas')
         unique_together = [['project', 'client', 'creator']]
+        indexes = [
+            models.Index(fields=['client', 'project'], name='review_client_project_idx'),
+        ]
     
     def __str__(self):
         return f"Reseña de {self.client.username} para {self.creator.username} en {self.project.title}"
+    
+    def save(self, *args, **kwargs):
+        # pre_save bloquea la fila para leer la calificación anterior (ver
+        # projects/signals.py): el bloqueo dura hasta que se aplica la diferencia
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+class ReviewDue(models.Model):
+    """
+    Proyectos completados que el cliente todavía no reseñó. Se mantiene con
+    señales (ver projects/signals.py): la fila se crea cuando el proyecto pasa a
+    ``completed`` y se borra cuando el cliente deja una reseña, así que las
+    reseñas pendientes se listan y cuentan por el índice del cliente sin
+    recorrer sus proyectos ni sus reseñas.
+    """
+
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='review_due')
+    client = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                              related_name='+')
+    due_at = models.DateTimeField(_('pendiente desde'))
+
+    class Meta:
+        ordering = ['-due_at']
+        verbose_name = _('reseña pendiente')
+        verbose_name_plural = _('reseñas pendientes')
+        indexes = [
+            models.Index(fields=['client', '-due_at', '-project'], name='review_due_client_idx'),
+        ]
+
+    def __str__(self):
+        return f"Reseña pendiente de {self.client_id} en {self.project_id}"
+
+    @classmethod
+    def sync(cls, project):
+        """Crea o borra la fila de ``project`` según su estado y las reseñas de su cliente"""
+        reviewed = ProjectReview.objects.filter(project=project, client_id=project.client_id).exists()
+        if project.status == 'completed' and not reviewed:
+            cls.objects.update_or_create(
+                project=project,
+                defaults={'client_id': project.client_id},
+                create_defaults={'client_id': project.client_id, 'due_at': project.updated_at},
+            )
+        else:
+            cls.objects.filter(project=project).delete()
+
+class Conversation(models.Model):
+    """
+    Resumen de la conversación entre dos participantes de un proyecto: último
+    mensaje y mensajes sin leer de cada lado. Se mantiene al crear, editar, borrar
+    y marcar como leídos los mensajes, para listar la bandeja sin recorrer
+    ProjectMessage.
+    ``user_a`` es siempre el participante con id menor.
+    """
+    
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='conversations')
+    user_a = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, 
+                              related_name='+')
+    user_b = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, 
+                              related_name='+')
+    last_message = models.ForeignKey(ProjectMessage, on_delete=models.SET_NULL, null=True, 
+                                    related_name='+')
+    last_message_snippet = models.CharField(max_length=140, blank=True)
+    last_message_at = models.DateTimeField()
+    unread_a = models.PositiveIntegerField(default=0, help_text=_('Mensajes sin leer de user_a'))
+    unread_b = models.PositiveIntegerField(default=0, help_text=_('Mensajes sin leer de user_b'))
+    
+    class Meta:
+        ordering = ['-last_message_at']
+        verbose_name = _('conversación')
+        verbose_name_plural = _('conversaciones')
+        unique_together = [['project', 'user_a', 'user_b']]
+        indexes = [
+            models.Index(fields=['user_a', '-last_message_at'], name='conversation_user_a_idx'),
+            models.Index(fields=['user_b', '-last_message_at'], name='conversation_user_b_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Conversación {self.user_a_id}-{self.user_b_id} en {self.project_id}"
+    
+    @staticmethod
+    def participants(user_id, other_id):
+        return (user_id, other_id) if user_id <= other_id else (other_id, user_id)
+    
+    @classmethod
+    def unread_field(cls, user_id, other_id):
+        """Contador de no leídos que corresponde a ``user_id`` en su conversación con ``other_id``"""
+        return 'unread_a' if cls.participants(user_id, other_id)[0] == user_id else 'unread_b'
+    
+    @classmethod
+    def record_message(cls, message):
+        """Actualiza el resumen con un mensaje nuevo. Debe llamarse en la transacción que lo crea."""
+        user_a, user_b = cls.participants(message.sender_id, message.receiver_id)
+        conversation, created = cls.objects.get_or_create(
+            project_id=message.project_id, user_a_id=user_a, user_b_id=user_b,
+            defaults={'last_message_at': message.created_at},
+        )
+        
+        unread = cls.unread_field(message.receiver_id, message.sender_id)
+        cls.objects.filter(pk=conversation.pk).update(**{unread: models.F(unread) + 1})
+        # Con mensajes concurrentes no se pisa un último mensaje más reciente
+        cls.objects.filter(pk=conversation.pk, last_message_at__lte=message.created_at).update(
+            last_message=message,
+            last_message_snippet=message.content[:140],
+            last_message_at=message.created_at,
+        )
+    
+    @classmethod
+    def refresh(cls, project_id, user_id, other_id):
+        """
+        Recalcula desde ProjectMessage el último mensaje y los no leídos de la
+        conversación, tras editar o borrar mensajes. Sin mensajes, la borra.
+        """
+        user_a, user_b = cls.participants(user_id, other_id)
+        messages = ProjectMessage.objects.filter(
+            models.Q(sender_id=user_a, receiver_id=user_b) | models.Q(sender_id=user_b, receiver_id=user_a),
+            project_id=project_id,
+        )
+        last = messages.order_by('-created_at', '-id').first()
+        if last is None:
+            cls.objects.filter(project_id=project_id, user_a_id=user_a, user_b_id=user_b).delete()
+            return
+        unread = dict(messages.filter(read=False).values_list('receiver_id').annotate(unread=models.Count('id')))
+        cls.objects.update_or_create(
+            project_id=project_id, user_a_id=user_a, user_b_id=user_b,
+            defaults={
+                'last_message': last,
+                'last_message_snippet': last.content[:140],
+                'last_message_at': last.created_at,
+                'unread_a': unread.get(user_a, 0),
+                'unread_b': unread.get(user_b, 0),
+            },
+        )
+    
+    @classmethod
+    def sync_unread(cls, project_id, reader_id):
+        """
+        Recalcula los no leídos del lector en sus conversaciones del proyecto con un
+        único conteo agrupado. Devuelve el total de mensajes sin leer en el proyecto.
+        """
+        counts = dict(
+            ProjectMessage.objects
+            .filter(project_id=project_id, receiver_id=reader_id, read=False)
+            .values_list('sender_id')
+            .annotate(unread=models.Count('id'))
+        )
+        conversations = cls.objects.filter(
+            models.Q(user_a_id=reader_id) | models.Q(user_b_id=reader_id), project_id=project_id
+        )
+        for conversation in conversations:
+            other_id = conversation.user_b_id if conversation.user_a_id == reader_id else conversation.user_a_id
+            unread = cls.unread_field(reader_id, other_id)
+            if getattr(conversation, unread) != counts.get(other_id, 0):
+                cls.objects.filter(pk=conversation.pk).update(**{unread: counts.get(other_id, 0)})
+        return sum(counts.values())
+    
+    @classmethod
+    def record_read(cls, project_id, reader_id, sender_id, count):
+        """Descuenta ``count`` mensajes leídos del contador del lector"""
+        if not count:
+            return
+        user_a, user_b = cls.participants(reader_id, sender_id)
+        unread = cls.unread_field(reader_id, sender_id)
+        cls.objects.filter(project_id=project_id, user_a_id=user_a, user_b_id=user_b).update(**{
+            unread: models.Case(
+                models.When(**{f'{unread}__gte': count}, then=models.F(unread) - count),
+                default=0,
+            )
+        })
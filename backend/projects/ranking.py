@@ -0,0 +1,261 @@
+"""
+Ranking de las aplicaciones de una convocatoria.
+
+Cada aplicación recibe un puntaje entre 0 y 1, suma ponderada (``WEIGHTS``) de:
+
+- ``price``: ajuste del precio a ``budget_min``/``budget_max``. 1 dentro del
+  rango; fuera baja en proporción a la distancia relativa al límite.
+- ``timing``: si ``estimated_days`` entra entre ``start_date`` y ``end_date``.
+  1 si entra; si no, la fracción del trabajo que cabe.
+- ``rating``: promedio bayesiano de ``average_rating`` con ``review_count``
+  reseñas (``RATING_PRIOR`` con peso ``RATING_PRIOR_WEIGHT``), sobre 5. Un
+  creador con una sola reseña de 5 no supera a uno con cuarenta de 4,8.
+- ``specialties``: fracción de las especialidades del creador que aparecen en
+  el título o la descripción de la convocatoria.
+
+Las columnas (id, precio, días, rating, reseñas y especialidades) se leen con
+una sola consulta ``values_list`` y se puntúan todas juntas, con NumPy si está
+instalado y con listas por comprensión si no; los dos caminos hacen las mismas
+operaciones y dan los mismos puntajes. El top-k usa ``partition`` (o
+``heapq.nlargest``): solo se ordenan las filas hasta la página pedida.
+
+Leer las columnas es lo caro (decenas de miles de filas con el JOIN al perfil);
+con el caché de respuestas activo (``RESPONSE_CACHE``) quedan en memoria de
+cada proceso y se validan con las versiones de los tags
+``applications:<convocatoria>`` y ``creators`` (ver core/response_cache.py), así
+que las páginas siguientes y los otros pedidos solo puntúan.
+"""
+
+import heapq
+import math
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import FloatField, Value
+from django.db.models.functions import Cast, Coalesce
+
+from core.response_cache import LocalLRU, enabled, get_response_cache
+from .models import ConvocatoriaApplication
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+WEIGHTS = {'price': 0.3, 'timing': 0.2, 'rating': 0.3, 'specialties': 0.2}
+RATING_PRIOR = 3.0
+RATING_PRIOR_WEIGHT = 5
+
+# ``specialties`` guarda el índice de cada fila en ``specialty_sets``, que tiene
+# cada combinación de especialidades una sola vez. ``rankings`` guarda el último
+# ranking calculado sobre estas columnas (ver rank_applications)
+Columns = namedtuple('Columns', 'ids price days rating reviews specialties specialty_sets rankings')
+CachedColumns = namedtuple('CachedColumns', 'columns versions')
+
+_columns_cache = LocalLRU(getattr(settings, 'APPLICATION_RANKING_CACHE_SIZE', 32), lambda count: None)
+
+
+@lru_cache(maxsize=1024)
+def normalize(text):
+    """Minúsculas y sin tildes, para comparar especialidades con el texto"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def specialty_set(value):
+    """``'Video, fotografía'`` -> ``('fotografia', 'video')``"""
+    return tuple(sorted({normalize(name.strip()) for name in value.split(',') if name.strip()}))
+
+
+def load_columns(convocatoria_id):
+    profile = 'creator__creator_profile__'
+    rows = ConvocatoriaApplication.objects.filter(convocatoria_id=convocatoria_id).order_by().values_list(
+        'id',
+        # En float desde la base: sin Decimal por fila
+        Cast('price', FloatField()),
+        'estimated_days',
+        Coalesce(Cast(f'{profile}average_rating', FloatField()), Value(0.0)),
+        Coalesce(f'{profile}review_count', Value(0)),
+        Coalesce(f'{profile}specialties', Value('')),
+    )
+    ids, price, days, rating, reviews, specialties = zip(*rows) if rows else ((),) * 6
+    # Mismas especialidades en otro orden o con otras mayúsculas -> mismo código
+    sets = {}
+    codes = {value: sets.setdefault(specialty_set(value), len(sets)) for value in set(specialties)}
+    specialties = [codes[value] for value in specialties]
+    if np is not None:
+        return Columns(
+            np.array(ids, dtype=np.int64), np.array(price, dtype=np.float64),
+            np.array(days, dtype=np.float64), np.array(rating, dtype=np.float64),
+            np.array(reviews, dtype=np.float64), np.array(specialties, dtype=np.intp), list(sets), {},
+        )
+    return Columns(list(ids), list(price), list(days), list(rating), list(reviews), specialties, list(sets), {})
+
+
+def application_columns(convocatoria_id):
+    """Columnas de las aplicaciones, del caché del proceso si siguen vigentes"""
+    if not enabled():
+        return load_columns(convocatoria_id)
+    cache = get_response_cache()
+    entry = _columns_cache.get(convocatoria_id)
+    if entry is not None and cache.current_versions(entry.versions) == entry.versions:
+        return entry.columns
+    # Las versiones se leen antes que las filas, como en el caché de respuestas
+    versions = cache.versions([f'applications:{convocatoria_id}', 'creators'])
+    columns = load_columns(convocatoria_id)
+    _columns_cache.set(convocatoria_id, CachedColumns(columns, versions), cache.timeout)
+    return columns
+
+
+def rank_applications(convocatoria):
+    """
+    ``RankedApplications`` de la convocatoria. Con las columnas cacheadas se
+    reutiliza mientras no cambien los datos de la convocatoria que puntúan.
+    """
+    columns = application_columns(convocatoria.pk)
+    key = (
+        convocatoria.budget_min, convocatoria.budget_max, convocatoria.start_date,
+        convocatoria.end_date, convocatoria.title, convocatoria.description,
+    )
+    ranking = columns.rankings.get(key)
+    if ranking is None:
+        ranking = RankedApplications(convocatoria, columns)
+        # Una sola entrada: la convocatoria cambia poco
+        columns.rankings.clear()
+        columns.rankings[key] = ranking
+    return ranking
+
+
+def specialty_overlap(specialty_sets, convocatoria):
+    """Para cada combinación de especialidades, la fracción que menciona la convocatoria"""
+    text = normalize(f'{convocatoria.title} {convocatoria.description}')
+    mentioned = {}
+    for names in specialty_sets:
+        for name in names:
+            if name not in mentioned:
+                mentioned[name] = name in text
+    return [sum(mentioned[name] for name in names) / len(names) if names else 0.0 for names in specialty_sets]
+
+
+def window_days(convocatoria):
+    if convocatoria.start_date and convocatoria.end_date:
+        return max((convocatoria.end_date - convocatoria.start_date).days, 1)
+    return None
+
+
+class RankedApplications:
+    """
+    Aplicaciones de ``convocatoria`` ordenadas por puntaje (y por id a igual
+    puntaje). Se indexa con slices, como un queryset: ``ranking[20:30]``
+    devuelve ``(id, puntaje, componentes)`` de esas posiciones.
+    """
+
+    def __init__(self, convocatoria, columns):
+        self.columns = columns
+        self.components = (score_numpy if np is not None else score_python)(columns, convocatoria)
+        self.scores = self.components.pop('score')
+        # Las mejores posiciones calculadas hasta ahora, en orden
+        self._top = []
+
+    def __len__(self):
+        return len(self.columns.ids)
+
+    def __getitem__(self, window):
+        if not isinstance(window, slice) or window.step not in (None, 1):
+            raise TypeError("RankedApplications solo admite slices")
+        start, stop, _ = window.indices(len(self))
+        if start >= stop:
+            return []
+        positions = self.top(stop)[start:]
+        return [
+            (
+                int(self.columns.ids[position]), round(float(self.scores[position]), 4),
+                {name: round(float(values[position]), 4) for name, values in self.components.items()},
+            )
+            for position in positions
+        ]
+
+    def top(self, k):
+        """Posiciones de las ``k`` aplicaciones con mejor puntaje, en orden"""
+        if len(self._top) < k:
+            self._top = self.select(k)
+        return self._top[:k]
+
+    def select(self, k):
+        scores, ids = self.scores, self.columns.ids
+        if np is None:
+            return heapq.nlargest(k, range(len(ids)), key=lambda position: (scores[position], -ids[position]))
+        if k < len(ids):
+            # Todas las que empatan con la k-ésima: argpartition elegiría entre
+            # ellas al azar y el desempate es por id
+            kth = np.partition(scores, len(ids) - k)[len(ids) - k]
+            candidates = np.flatnonzero(scores >= kth)
+        else:
+            candidates = np.arange(len(ids))
+        # lexsort ordena por la última clave: puntaje descendente y después id
+        return candidates[np.lexsort((ids[candidates], -scores[candidates]))]
+
+
+def score_numpy(columns, convocatoria):
+    budget_min = float(convocatoria.budget_min or 0)
+    budget_max = float(convocatoria.budget_max) if convocatoria.budget_max else math.inf
+    price = columns.price
+    over = np.maximum(price - budget_max, 0) / budget_max if budget_max < math.inf else 0.0
+    under = np.maximum(budget_min - price, 0) / budget_min if budget_min > 0 else 0.0
+    price_fit = np.clip(1 - over - under, 0, 1) + np.zeros_like(price)
+
+    window = window_days(convocatoria)
+    if window is None:
+        timing = np.ones_like(price)
+    else:
+        timing = np.minimum(window / np.maximum(columns.days, 1), 1)
+
+    rating = (
+        (columns.rating * columns.reviews + RATING_PRIOR * RATING_PRIOR_WEIGHT)
+        / (columns.reviews + RATING_PRIOR_WEIGHT) / 5
+    )
+    specialties = np.array(specialty_overlap(columns.specialty_sets, convocatoria), dtype=np.float64)
+    specialties = specialties[columns.specialties] if len(specialties) else np.zeros_like(price)
+
+    components = {'price': price_fit, 'timing': timing, 'rating': rating, 'specialties': specialties}
+    components['score'] = sum(WEIGHTS[name] * values for name, values in components.items())
+    return components
+
+
+def score_python(columns, convocatoria):
+    budget_min = float(convocatoria.budget_min or 0)
+    budget_max = float(convocatoria.budget_max) if convocatoria.budget_max else math.inf
+    # Las mismas operaciones, en el mismo orden, que score_numpy: los puntajes
+    # coinciden bit a bit, también con budget_min > budget_max (precio por
+    # encima de uno y por debajo del otro a la vez)
+    price_fit = []
+    for price in columns.price:
+        over = (price - budget_max) / budget_max if price > budget_max else 0.0
+        under = (budget_min - price) / budget_min if price < budget_min else 0.0
+        fit = 1 - over - under
+        price_fit.append(0.0 if fit < 0 else 1.0 if fit > 1 else fit)
+
+    window = window_days(convocatoria)
+    if window is None:
+        timing = [1.0] * len(columns.days)
+    else:
+        timing = [1.0 if days <= window else window / days for days in columns.days]
+
+    prior = RATING_PRIOR * RATING_PRIOR_WEIGHT
+    rating = [
+        (average * reviews + prior) / (reviews + RATING_PRIOR_WEIGHT) / 5
+        for average, reviews in zip(columns.rating, columns.reviews)
+    ]
+    overlap = specialty_overlap(columns.specialty_sets, convocatoria)
+    specialties = [overlap[code] for code in columns.specialties]
+
+    w_price, w_timing, w_rating, w_specialties = (
+        WEIGHTS['price'], WEIGHTS['timing'], WEIGHTS['rating'], WEIGHTS['specialties']
+    )
+    score = [
+        w_price * p + w_timing * t + w_rating * r + w_specialties * s
+        for p, t, r, s in zip(price_fit, timing, rating, specialties)
+    ]
+    return {'price': price_fit, 'timing': timing, 'rating': rating, 'specialties': specialties, 'score': score}
@@ -0,0 +1,104 @@
+"""
+Chat de proyectos en tiempo real por Server-Sent Events.
+
+Cada participante se suscribe a ``/api/projects/projects/{id}/stream/`` y recibe
+los mensajes nuevos y las confirmaciones de lectura en cuanto se confirman en la
+base de datos, sin volver a pedir el hilo completo. Para recuperar lo perdido
+tras una reconexión se usa ``?after=<cursor>`` en la acción ``messages``.
+
+Solo funciona servido por ASGI (core/asgi.py); bajo WSGI responde 501.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from accounts.authentication import CachedJWTAuthentication
+from core.pubsub import get_pubsub
+
+
+def chat_channel(project_id, user_id):
+    return f'chat:{project_id}:{user_id}'
+
+
+def publish_message(message):
+    """Envía un mensaje recién creado al remitente y al destinatario"""
+    from .serializers import ProjectMessageSerializer
+
+    data = ProjectMessageSerializer(message).data
+    payload = JSONRenderer().render({'type': 'message', 'message': data}).decode('utf-8')
+    for user_id in {message.sender_id, message.receiver_id}:
+        get_pubsub().publish(chat_channel(message.project_id, user_id), payload)
+
+
+def publish_read(project_id, reader_id, sender_ids, message_ids=(), up_to=None):
+    """
+    Avisa a los remitentes (y al lector, por si tiene otras pestañas) qué mensajes
+    se leyeron: los de ``message_ids`` o, con ``up_to``, todos hasta ese mensaje.
+    """
+    payload = json.dumps({
+        'type': 'read',
+        'project': project_id,
+        'reader': reader_id,
+        'messages': list(message_ids),
+        'up_to': up_to,
+    })
+    for user_id in set(sender_ids) | {reader_id}:
+        get_pubsub().publish(chat_channel(project_id, user_id), payload)
+
+
+def authorize_stream(request, pk):
+    """
+    Autentica con el JWT del header ``Authorization`` o del parámetro ``token``
+    (EventSource no permite headers) y verifica que el usuario vea el proyecto.
+    """
+    from .views import ProjectViewSet
+
+    auth = CachedJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        return None, JsonResponse({'detail': 'Falta el token de acceso'}, status=401)
+    try:
+        user = auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed) as exc:
+        return None, JsonResponse({'detail': str(exc)}, status=401)
+
+    view = ProjectViewSet(request=SimpleNamespace(user=user), action='retrieve', kwargs={}, format_kwarg=None)
+    if not view.get_queryset().filter(pk=pk).exists():
+        return None, JsonResponse({'detail': 'No encontrado.'}, status=404)
+    return user, None
+
+
+async def project_stream(request, pk):
+    if not isinstance(request, ASGIRequest):
+        # Bajo WSGI el stream ocuparía un worker entero hasta que el cliente se vaya
+        return JsonResponse({'detail': 'El stream necesita un servidor ASGI'}, status=501)
+    user, error = await sync_to_async(authorize_stream)(request, pk)
+    if error is not None:
+        return error
+
+    async def events():
+        async with get_pubsub().subscribe(chat_channel(pk, user.id)) as queue:
+            # Comentario inicial para que el cliente reciba los headers enseguida
+            yield ': conectado\n\n'
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=settings.REALTIME_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f'data: {message}\n\n'
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,12 +1,13 @@
 
 from rest_framework import serializers
+from core.sparse import SparseFieldsMixin
 from .models import (
     Project, ProjectProposal, ProjectInvitation, ProjectMessage,
-    Convocatoria, ConvocatoriaApplication
+    Convocatoria, ConvocatoriaApplication, ProjectReview, Conversation
 )
 from accounts.serializers import UserSerializer
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     client = UserSerializer(read_only=True)
     client_id = serializers.IntegerField(write_only=True, required=False)
     
@@ -26,7 +27,7 @@ class ProjectSerializer(serializers.ModelSerializer):
         
         return super().create(validated_data)
 
-class ProjectProposalSerializer(serializers.ModelSerializer):
+class ProjectProposalSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
     
     class Meta:
@@ -39,7 +40,7 @@ class ProjectProposalSerializer(serializers.ModelSerializer):
         validated_data['creator'] = self.context['request'].user
         return super().create(validated_data)
 
-class ProjectInvitationSerializer(serializers.ModelSerializer):
+class ProjectInvitationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     project = ProjectSerializer(read_only=True)
     project_id = serializers.IntegerField(write_only=True)
     creator = UserSerializer(read_only=True)
@@ -59,7 +60,7 @@ class ProjectInvitationSerializer(serializers.ModelSerializer):
         
         return super().create(validated_data)
 
-class ProjectMessageSerializer(serializers.ModelSerializer):
+class ProjectMessageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
     receiver = UserSerializer(read_only=True)
     receiver_id = serializers.IntegerField(write_only=True)
@@ -77,7 +78,11 @@ class ProjectMessageSerializer(serializers.ModelSerializer):
         
         return super().create(validated_data)
 
-class ConvocatoriaSerializer(serializers.ModelSerializer):
+class ReadUpToSerializer(serializers.Serializer):
+    project = serializers.IntegerField()
+    message = serializers.IntegerField()
+
+class ConvocatoriaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     client = UserSerializer(read_only=True)
     
     class Meta:
@@ -91,7 +96,7 @@ class ConvocatoriaSerializer(serializers.ModelSerializer):
         validated_data['client'] = self.context['request'].user
         return super().create(validated_data)
 
-class ConvocatoriaApplicationSerializer(serializers.ModelSerializer):
+class ConvocatoriaApplicationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
     
     class Meta:
@@ -103,3 +108,31 @@ class ConvocatoriaApplicationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data['creator'] = self.context['request'].user
         return super().create(validated_data)
+
+class ProjectReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    client = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = ProjectReview
+        fields = ['id', 'project', 'client', 'creator', 'rating',
+                  'comment', 'recommendation', 'created_at']
+        read_only_fields = ['id', 'client', 'created_at']
+
+class ConversationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Conversación vista desde el usuario de la request"""
+    other_user = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Conversation
+        fields = ['id', 'project', 'other_user', 'last_message', 'last_message_snippet',
+                  'last_message_at', 'unread_count']
+    
+    def is_user_a(self, obj):
+        return obj.user_a_id == self.context['request'].user.id
+    
+    def get_other_user(self, obj):
+        return UserSerializer(obj.user_b if self.is_user_a(obj) else obj.user_a).data
+    
+    def get_unread_count(self, obj):
+        return obj.unread_a if self.is_user_a(obj) else obj.unread_b
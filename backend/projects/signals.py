@@ -0,0 +1,153 @@
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save, post_delete
+from django.dispatch import receiver
+from accounts.models import CreatorProfile
+from core.response_cache import invalidate
+from .models import (
+    Convocatoria, ConvocatoriaApplication, Conversation, Project, ProjectInvitation, ProjectMessage,
+    ProjectReview, ReviewDue
+)
+
+@receiver(pre_save, sender=ProjectMessage)
+def remember_previous_conversation(sender, instance, **kwargs):
+    """Guardar proyecto y participantes anteriores por si la edición mueve el mensaje"""
+    instance._previous_conversation = None
+    if instance.pk:
+        instance._previous_conversation = ProjectMessage.objects.filter(pk=instance.pk).values_list(
+            'project_id', 'sender_id', 'receiver_id'
+        ).first()
+
+@receiver(post_save, sender=ProjectMessage)
+def update_conversation(sender, instance, created, **kwargs):
+    """
+    Mantener el resumen de la conversación en la misma transacción que crea o edita
+    el mensaje
+    """
+    with transaction.atomic():
+        if created:
+            Conversation.record_message(instance)
+            return
+        current = (instance.project_id, instance.sender_id, instance.receiver_id)
+        previous = getattr(instance, '_previous_conversation', None)
+        if previous is not None and previous != current:
+            Conversation.refresh(*previous)
+        Conversation.refresh(*current)
+
+@receiver(post_delete, sender=ProjectMessage)
+def update_conversation_on_delete(sender, instance, origin=None, **kwargs):
+    """
+    Recalcular último mensaje y no leídos sin el mensaje borrado. No aplica cuando
+    se borra en cascada con el proyecto o el usuario, que se llevan la conversación.
+    """
+    if getattr(origin, 'model', type(origin)) is ProjectMessage:
+        Conversation.refresh(instance.project_id, instance.sender_id, instance.receiver_id)
+
+@receiver(pre_save, sender=ProjectReview)
+def remember_previous_rating(sender, instance, **kwargs):
+    """
+    Guardar creador, calificación, proyecto y cliente anteriores para poder
+    corregir los agregados y las reseñas pendientes al editar. La fila queda
+    bloqueada (``ProjectReview.save`` es atómico): dos ediciones concurrentes no
+    aplican su diferencia contra la misma calificación vieja.
+    """
+    instance._previous_review = None
+    if instance.pk:
+        instance._previous_review = ProjectReview.objects.select_for_update().filter(pk=instance.pk).values(
+            'creator_id', 'rating', 'project_id', 'client_id'
+        ).first()
+
+@receiver(post_save, sender=ProjectReview)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """
+    Mantener average_rating y review_count del creador al crear o editar una reseña
+    """
+    previous = getattr(instance, '_previous_review', None)
+    if created or previous is None:
+        CreatorProfile.apply_review(instance.creator_id, instance.rating, 1)
+    elif previous['creator_id'] != instance.creator_id:
+        CreatorProfile.apply_review(previous['creator_id'], -previous['rating'], -1)
+        CreatorProfile.apply_review(instance.creator_id, instance.rating, 1)
+        invalidate(f"user:{previous['creator_id']}")
+    elif previous['rating'] != instance.rating:
+        CreatorProfile.apply_review(instance.creator_id, instance.rating - previous['rating'], 0)
+    else:
+        return
+    invalidate(f'user:{instance.creator_id}', 'creators')
+
+@receiver(post_save, sender=ProjectReview)
+def clear_review_due(sender, instance, created, **kwargs):
+    """
+    La reseña saca al proyecto de las reseñas pendientes del cliente. Si al editarla
+    se movió a otro proyecto o cliente, el anterior puede volver a quedar pendiente.
+    """
+    previous = getattr(instance, '_previous_review', None)
+    moved = previous is not None and (previous['project_id'], previous['client_id']) != (
+        instance.project_id, instance.client_id
+    )
+    if created or previous is None or moved:
+        ReviewDue.objects.filter(project_id=instance.project_id, client_id=instance.client_id).delete()
+    if moved:
+        project = Project.objects.filter(pk=previous['project_id']).first()
+        if project is not None:
+            ReviewDue.sync(project)
+
+@receiver(post_delete, sender=ProjectReview)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """
+    Descontar la reseña eliminada de los agregados del creador
+    """
+    CreatorProfile.apply_review(instance.creator_id, -instance.rating, -1)
+    invalidate(f'user:{instance.creator_id}', 'creators')
+
+@receiver(post_delete, sender=ProjectReview)
+def restore_review_due(sender, instance, origin=None, **kwargs):
+    """
+    Sin la reseña el proyecto completado vuelve a quedar pendiente. No aplica cuando
+    la reseña se borra en cascada con el proyecto o el usuario.
+    """
+    if getattr(origin, 'model', type(origin)) is ProjectReview:
+        project = Project.objects.filter(pk=instance.project_id).first()
+        if project is not None:
+            ReviewDue.sync(project)
+
+@receiver(pre_save, sender=Project)
+def remember_previous_status(sender, instance, **kwargs):
+    """Guardar estado y cliente anteriores para mantener las reseñas pendientes"""
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = Project.objects.filter(pk=instance.pk).values('status', 'client_id').first()
+
+@receiver(post_save, sender=Project)
+def update_review_due(sender, instance, created, **kwargs):
+    """
+    Al pasar a ``completed`` el proyecto queda pendiente de reseña; si sale de
+    ``completed`` o cambia de cliente se corrige la fila
+    """
+    previous = getattr(instance, '_previous_state', None)
+    if previous is None:
+        changed = instance.status == 'completed'
+    else:
+        changed = (previous['status'], previous['client_id']) != (instance.status, instance.client_id) and (
+            'completed' in (previous['status'], instance.status)
+        )
+    if changed:
+        ReviewDue.sync(instance)
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Convocatoria)
+def invalidate_listings(sender, instance, **kwargs):
+    """
+    Feed de proyectos y convocatorias abiertas cacheados (ver core/response_cache.py).
+    Cualquier cambio puede sumar o sacar filas, así que se invalida el listado entero.
+    """
+    invalidate('projects' if sender is Project else 'convocatorias')
+
+@receiver([post_save, post_delete], sender=ProjectInvitation)
+def invalidate_invited_feed(sender, instance, **kwargs):
+    """El creador invitado ve el proyecto en su feed aunque no sea público"""
+    invalidate(f'invitations:{instance.creator_id}')
+
+@receiver([post_save, post_delete], sender=ConvocatoriaApplication)
+def invalidate_ranking(sender, instance, **kwargs):
+    """Columnas del ranking de aplicaciones de la convocatoria (ver projects/ranking.py)"""
+    invalidate(f'applications:{instance.convocatoria_id}')
@@ -0,0 +1,742 @@
+import itertools
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import CreatorProfile, SocialNetworkLink, User
+from core.response_cache import get_response_cache
+from . import ranking
+from .models import (
+    Convocatoria, ConvocatoriaApplication, Conversation, Project, ProjectInvitation, ProjectMessage,
+    ProjectProposal, ProjectReview, ReviewDue
+)
+
+
+class ProjectTestCase(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user('cliente', 'cliente@example.com', 'clave-segura-1')
+        self.creator = User.objects.create_user('creador', 'creador@example.com', 'clave-segura-1',
+                                                is_creator=True)
+        self.project = Project.objects.create(title='Video', description='Video institucional',
+                                              client=self.client_user)
+
+    def api(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def message(self, sender, receiver, content='hola', project=None):
+        return ProjectMessage.objects.create(project=project or self.project, sender=sender,
+                                             receiver=receiver, content=content)
+
+
+class MessageCursorTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ids = [self.message(self.client_user, self.creator, f'mensaje {i}').pk for i in range(25)]
+        self.url = reverse('projectmessage-list')
+
+    def test_older_links_walk_every_message_once(self):
+        api = self.api(self.creator)
+        response = api.get(self.url)
+        pages = [response.data['results']]
+        while response.data['older']:
+            response = api.get(response.data['older'])
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data['results'])
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        # Cada página en orden cronológico, las páginas de la más nueva a la más vieja
+        seen = [row['id'] for page in reversed(pages) for row in page]
+        self.assertEqual(seen, self.ids)
+
+    def test_newer_link_returns_new_messages(self):
+        api = self.api(self.creator)
+        newer = api.get(self.url).data['newer']
+        self.assertEqual(api.get(newer).data['results'], [])
+
+        new = self.message(self.client_user, self.creator, 'nuevo')
+        response = api.get(newer)
+        self.assertEqual([row['id'] for row in response.data['results']], [new.pk])
+
+    def test_invalid_cursor_is_not_found(self):
+        for param in ('before', 'after'):
+            with self.subTest(param=param):
+                response = self.api(self.creator).get(self.url, {param: 'no-es-un-cursor'})
+                self.assertEqual(response.status_code, 404)
+
+
+class CreatorVisibilityTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        other_creator = User.objects.create_user('creador2', 'creador2@example.com', 'clave-segura-1',
+                                                 is_creator=True)
+        for i in range(12):
+            project = Project.objects.create(title=f'Proyecto {i}', description='-', client=self.client_user,
+                                             is_public=i % 3 == 0)
+            # Públicos con invitación, privados con una o dos invitaciones y privados sin ninguna
+            if i % 2 == 0:
+                ProjectInvitation.objects.create(project=project, creator=self.creator, message='-')
+            if i % 4 == 0:
+                ProjectInvitation.objects.create(project=project, creator=other_creator, message='-')
+
+    def test_matches_or_join_distinct_query(self):
+        before = Project.objects.filter(
+            Q(is_public=True) | Q(invitations__creator=self.creator)
+        ).distinct().order_by('-created_at', '-id')
+        response = self.api(self.creator).get(reverse('project-list'))
+        self.assertEqual(response.data['count'], before.count())
+        self.assertEqual([row['id'] for row in response.data['results']],
+                         list(before.values_list('id', flat=True)[:10]))
+
+        for project in Project.objects.all():
+            visible = before.filter(pk=project.pk).exists()
+            status = self.api(self.creator).get(reverse('project-detail', args=[project.pk])).status_code
+            self.assertEqual(status, 200 if visible else 404, project.title)
+
+
+class ReadReceiptTests(ProjectTestCase):
+    def test_mark_as_read_publishes_once(self):
+        message = self.message(self.client_user, self.creator)
+        url = reverse('projectmessage-mark-as-read', args=[message.pk])
+        with mock.patch('projects.views.publish_read') as publish:
+            self.assertEqual(self.api(self.creator).post(url).status_code, 200)
+            self.assertEqual(self.api(self.creator).post(url).status_code, 200)
+        publish.assert_called_once_with(self.project.pk, self.creator.pk, [self.client_user.pk], [message.pk])
+
+
+class ReadUpToTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        self.received = [self.message(self.client_user, self.creator, f'mensaje {i}') for i in range(5)]
+        self.sent = self.message(self.creator, self.client_user, 'respuesta')
+        other_project = Project.objects.create(title='Fotos', description='Sesión', client=self.client_user)
+        self.elsewhere = self.message(self.client_user, self.creator, 'otro proyecto', project=other_project)
+        self.url = reverse('projectmessage-read-up-to')
+
+    def test_marks_received_messages_up_to_watermark(self):
+        watermark = self.received[2]
+        with mock.patch('projects.views.publish_read') as publish:
+            response = self.api(self.creator).post(
+                self.url, {'project': self.project.pk, 'message': watermark.pk}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'marked': 3, 'unread_count': 2})
+
+        read = set(ProjectMessage.objects.filter(read=True).values_list('pk', flat=True))
+        self.assertEqual(read, {message.pk for message in self.received[:3]})
+        conversation = Conversation.objects.get(project=self.project)
+        self.assertEqual(getattr(conversation, Conversation.unread_field(self.creator.pk, self.client_user.pk)), 2)
+        publish.assert_called_once_with(self.project.pk, self.creator.pk, {self.client_user.pk}, up_to=watermark.pk)
+
+        # Repetirlo no marca nada ni avisa
+        with mock.patch('projects.views.publish_read') as publish:
+            response = self.api(self.creator).post(
+                self.url, {'project': self.project.pk, 'message': watermark.pk}, format='json'
+            )
+        self.assertEqual(response.data, {'marked': 0, 'unread_count': 2})
+        publish.assert_not_called()
+
+    def test_watermark_from_other_project_is_not_found(self):
+        response = self.api(self.creator).post(
+            self.url, {'project': self.project.pk, 'message': self.elsewhere.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(ProjectMessage.objects.filter(read=True).exists())
+
+    def test_messages_of_others_are_not_found(self):
+        outsider = User.objects.create_user('otro', 'otro@example.com', 'clave-segura-1')
+        response = self.api(outsider).post(
+            self.url, {'project': self.project.pk, 'message': self.received[-1].pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class SparseFieldsTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        ProjectInvitation.objects.create(project=self.project, creator=self.creator, message='-')
+
+    def invitations(self, query=''):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api(self.creator).get(reverse('projectinvitation-list') + query)
+        self.assertEqual(response.status_code, 200)
+        [invitation] = response.json()['results']
+        # La consulta de la página: la única que lee projects_projectinvitation con LIMIT
+        [page_sql] = [query['sql'] for query in queries.captured_queries
+                      if 'FROM "projects_projectinvitation"' in query['sql'] and 'LIMIT' in query['sql']]
+        tables = {query['sql'].split(' FROM ')[1].split()[0] for query in queries.captured_queries}
+        return invitation, page_sql, tables
+
+    def test_full_invitation_joins_project_client_and_networks(self):
+        invitation, page_sql, tables = self.invitations()
+        self.assertEqual(invitation['project']['client']['username'], 'cliente')
+        self.assertIn('JOIN "projects_project"', page_sql)
+        self.assertIn('JOIN "accounts_user"', page_sql)
+        self.assertIn('"accounts_socialnetworklink"', tables)
+
+    def test_fields_prune_output_and_joins(self):
+        invitation, page_sql, tables = self.invitations('?fields=id,status,project.id,project.title')
+        self.assertEqual(invitation, {'id': invitation['id'], 'status': 'pending',
+                                      'project': {'id': self.project.pk, 'title': 'Video'}})
+        self.assertIn('JOIN "projects_project"', page_sql)
+        self.assertNotIn('"accounts_user"', page_sql)
+        self.assertNotIn('"accounts_socialnetworklink"', tables)
+
+    def test_empty_expand_leaves_ids(self):
+        invitation, page_sql, tables = self.invitations('?expand=')
+        self.assertEqual((invitation['project'], invitation['creator']), (self.project.pk, self.creator.pk))
+        self.assertNotIn('JOIN', page_sql)
+        self.assertNotIn('"accounts_socialnetworklink"', tables)
+
+
+class ConditionalGetTests(ProjectTestCase):
+    def test_matching_etag_is_not_modified(self):
+        api = self.api(self.client_user)
+        url = reverse('project-list')
+        response = api.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_list_etag_needs_no_aggregate(self):
+        api = self.api(self.client_user)
+        url = reverse('project-list')
+        with CaptureQueriesContext(connection) as plain:
+            etag = api.get(url)['ETag']
+        with CaptureQueriesContext(connection) as revalidated:
+            self.assertEqual(api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Las mismas consultas que la página, sin agregación sobre todo el conjunto
+        self.assertEqual(len(revalidated), len(plain))
+        self.assertFalse(any('MAX(' in query['sql'] or 'SUM(' in query['sql'] for query in plain.captured_queries))
+
+    def test_list_etag_follows_visible_rows(self):
+        api = self.api(self.client_user)
+        url = reverse('project-list')
+        etag = api.get(url)['ETag']
+        Project.objects.create(title='Fotos', description='Sesión', client=self.client_user)
+        response = api.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        Project.objects.get(title='Fotos').delete()
+        self.assertEqual(api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_change_invalidates_etag(self):
+        api = self.api(self.client_user)
+        url = reverse('project-detail', args=[self.project.pk])
+        etag = api.get(url)['ETag']
+
+        self.project.title = 'Video editado'
+        self.project.save()
+        self.assertEqual(api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(RESPONSE_CACHE=True)
+class ResponseCacheTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # El LRU local vive en el objeto de get_response_cache
+        get_response_cache.cache_clear()
+        self.addCleanup(get_response_cache.cache_clear)
+        Project.objects.filter(pk=self.project.pk).update(is_public=True)
+        Convocatoria.objects.create(title='Casting', description='-', client=self.client_user,
+                                    deadline=date.today() + timedelta(days=30), status='open')
+        self.other_client = User.objects.create_user('otro', 'otro@example.com', 'clave-segura-1')
+
+    def feed(self, route):
+        """Respuesta del listado y cantidad de consultas: 0 si salió del caché"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api(self.creator).get(reverse(route))
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def write(self, change):
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+
+    def test_repeated_feed_is_a_hit(self):
+        for route in ('project-list', 'convocatoria-list'):
+            with self.subTest(route=route):
+                first, queries = self.feed(route)
+                self.assertGreater(queries, 0)
+                self.assertEqual(self.feed(route), (first, 0))
+
+    def test_new_project_invalidates_feed(self):
+        self.feed('project-list')
+        self.write(lambda: Project.objects.create(title='Fotos', description='-', client=self.other_client,
+                                                  is_public=True))
+        data, queries = self.feed('project-list')
+        self.assertGreater(queries, 0)
+        self.assertEqual(data['count'], 2)
+
+    def test_embedded_client_change_invalidates_feeds(self):
+        for route in ('project-list', 'convocatoria-list'):
+            self.feed(route)
+
+        def rename():
+            self.client_user.first_name = 'Ana'
+            self.client_user.save()
+
+        self.write(rename)
+        for route in ('project-list', 'convocatoria-list'):
+            with self.subTest(route=route):
+                data, queries = self.feed(route)
+                self.assertGreater(queries, 0)
+                self.assertEqual(data['results'][0]['client']['first_name'], 'Ana')
+
+    def test_social_network_of_client_invalidates_feed(self):
+        self.feed('project-list')
+        self.write(lambda: SocialNetworkLink.objects.create(user=self.client_user, network='instagram',
+                                                            url='https://instagram.com/cliente'))
+        data, queries = self.feed('project-list')
+        self.assertGreater(queries, 0)
+        self.assertEqual(len(data['results'][0]['client']['social_networks']), 1)
+
+    def test_users_outside_the_page_keep_feeds(self):
+        for route in ('project-list', 'convocatoria-list'):
+            self.feed(route)
+
+        def unrelated():
+            self.other_client.first_name = 'Otro'
+            self.other_client.save()
+            SocialNetworkLink.objects.create(user=self.other_client, network='tiktok',
+                                             url='https://tiktok.com/otro')
+
+        self.write(unrelated)
+        for route in ('project-list', 'convocatoria-list'):
+            with self.subTest(route=route):
+                self.assertEqual(self.feed(route)[1], 0)
+
+
+class ConversationCounterTests(ProjectTestCase):
+    def conversation(self):
+        return Conversation.objects.get(project=self.project)
+
+    def unread(self, user):
+        conversation = self.conversation()
+        other = self.creator if user == self.client_user else self.client_user
+        return getattr(conversation, Conversation.unread_field(user.pk, other.pk))
+
+    def test_create(self):
+        self.message(self.client_user, self.creator, 'uno')
+        last = self.message(self.client_user, self.creator, 'dos')
+        self.message(self.creator, self.client_user, 'tres')
+
+        conversation = self.conversation()
+        self.assertEqual(self.unread(self.creator), 2)
+        self.assertEqual(self.unread(self.client_user), 1)
+        self.assertEqual(conversation.last_message_snippet, 'tres')
+
+        # Leer por la API descuenta del lector
+        self.api(self.creator).post(reverse('projectmessage-mark-as-read', args=[last.pk]))
+        self.assertEqual(self.unread(self.creator), 1)
+
+    def test_update(self):
+        message = self.message(self.client_user, self.creator, 'uno')
+        message.content = 'uno editado'
+        message.read = True
+        message.save()
+
+        conversation = self.conversation()
+        self.assertEqual(conversation.last_message_snippet, 'uno editado')
+        self.assertEqual(self.unread(self.creator), 0)
+
+    def test_update_moving_message_refreshes_both_conversations(self):
+        other_project = Project.objects.create(title='Fotos', description='Sesión', client=self.client_user)
+        self.message(self.client_user, self.creator, 'se queda')
+        moved = self.message(self.client_user, self.creator, 'se mueve')
+
+        moved.project = other_project
+        moved.save()
+        self.assertEqual(self.conversation().last_message_snippet, 'se queda')
+        self.assertEqual(self.unread(self.creator), 1)
+        moved_conversation = Conversation.objects.get(project=other_project)
+        self.assertEqual(moved_conversation.last_message_id, moved.pk)
+
+    def test_delete(self):
+        first = self.message(self.client_user, self.creator, 'uno')
+        last = self.message(self.creator, self.client_user, 'dos')
+
+        response = self.api(self.creator).delete(reverse('projectmessage-detail', args=[last.pk]))
+        self.assertEqual(response.status_code, 204)
+        conversation = self.conversation()
+        self.assertEqual(conversation.last_message_id, first.pk)
+        self.assertEqual(conversation.last_message_snippet, 'uno')
+        self.assertEqual(self.unread(self.client_user), 0)
+        self.assertEqual(self.unread(self.creator), 1)
+
+        first.delete()
+        self.assertFalse(Conversation.objects.filter(project=self.project).exists())
+
+    def test_cascade_delete(self):
+        self.message(self.client_user, self.creator)
+        self.project.delete()
+        self.assertFalse(Conversation.objects.exists())
+
+
+class ReviewDueTests(ProjectTestCase):
+    def complete(self, project=None):
+        project = project or self.project
+        project.status = 'completed'
+        project.save()
+
+    def review(self, project=None, rating=5):
+        return ProjectReview.objects.create(project=project or self.project, client=self.client_user,
+                                            creator=self.creator, rating=rating)
+
+    def test_completed_project_is_due(self):
+        self.assertFalse(ReviewDue.objects.exists())
+        self.complete()
+        due = ReviewDue.objects.get()
+        self.assertEqual((due.project_id, due.client_id), (self.project.pk, self.client_user.pk))
+
+    def test_leaving_completed_clears_due(self):
+        self.complete()
+        self.project.status = 'in_progress'
+        self.project.save()
+        self.assertFalse(ReviewDue.objects.exists())
+
+    def test_review_create_update_delete(self):
+        other_project = Project.objects.create(title='Fotos', description='Sesión', client=self.client_user)
+        self.complete()
+        self.complete(other_project)
+        self.assertEqual(ReviewDue.objects.count(), 2)
+
+        review = self.review()
+        self.assertEqual(list(ReviewDue.objects.values_list('project_id', flat=True)), [other_project.pk])
+
+        # Mover la reseña al otro proyecto deja pendiente el primero
+        review.project = other_project
+        review.save()
+        self.assertEqual(list(ReviewDue.objects.values_list('project_id', flat=True)), [self.project.pk])
+
+        review.delete()
+        self.assertEqual(ReviewDue.objects.count(), 2)
+
+    def test_pending_reviews_endpoint_and_dashboard(self):
+        self.complete()
+        api = self.api(self.client_user)
+        response = api.get(reverse('projectreview-my-pending-reviews'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(api.get(reverse('dashboard-summary')).data['pending_reviews'], 1)
+
+        self.review()
+        self.assertEqual(api.get(reverse('projectreview-my-pending-reviews')).data['count'], 0)
+
+
+class DashboardSummaryTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.creator2 = User.objects.create_user('creadora', 'creadora@example.com', 'clave-segura-1',
+                                                 is_creator=True)
+        self.other_client = User.objects.create_user('cliente2', 'cliente2@example.com', 'clave-segura-1')
+        self.project2 = Project.objects.create(title='Fotos', description='-', client=self.client_user)
+        other_project = Project.objects.create(title='Podcast', description='-', client=self.other_client)
+
+        for project, creator, status in [
+            (self.project, self.creator, 'pending'),
+            (self.project2, self.creator, 'accepted'),
+            (self.project2, self.creator2, 'pending'),
+            (other_project, self.creator2, 'pending'),
+        ]:
+            ProjectProposal.objects.create(project=project, creator=creator, message='-', price=100,
+                                           estimated_days=5, status=status)
+        for project, creator, status in [
+            (self.project, self.creator, 'pending'),
+            (self.project2, self.creator, 'rejected'),
+            (other_project, self.creator2, 'pending'),
+        ]:
+            ProjectInvitation.objects.create(project=project, creator=creator, message='-', status=status)
+
+        deadline = date.today() + timedelta(days=30)
+        convocatoria = Convocatoria.objects.create(title='Casting', description='-', client=self.client_user,
+                                                   deadline=deadline, status='open')
+        other_convocatoria = Convocatoria.objects.create(title='Reel', description='-', client=self.other_client,
+                                                         deadline=deadline, status='open')
+        for convocatoria, creator, status in [
+            (convocatoria, self.creator, 'shortlisted'),
+            (convocatoria, self.creator2, 'pending'),
+            (other_convocatoria, self.creator2, 'shortlisted'),
+        ]:
+            ConvocatoriaApplication.objects.create(convocatoria=convocatoria, creator=creator, cover_letter='-',
+                                                   price=100, estimated_days=5, status=status)
+
+        self.message(self.client_user, self.creator)
+        self.message(self.client_user, self.creator)
+        ProjectMessage.objects.filter(pk=self.message(self.client_user, self.creator).pk).update(read=True)
+        self.message(self.creator, self.client_user)
+
+    def summary(self, user):
+        response = self.api(user).get(reverse('dashboard-summary'))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_client_counters(self):
+        self.assertEqual(self.summary(self.client_user), {
+            'unread_messages': 1,
+            'pending_proposals': 2,
+            'open_invitations': 1,
+            'shortlisted_applications': 1,
+            'pending_reviews': 0,
+            'pending_proposals_by_project': {self.project.pk: 1, self.project2.pk: 1},
+        })
+
+    def test_creator_counters(self):
+        self.assertEqual(self.summary(self.creator), {
+            'unread_messages': 2,
+            'pending_proposals': 1,
+            'open_invitations': 1,
+            'shortlisted_applications': 1,
+        })
+        self.assertEqual(self.summary(self.creator2), {
+            'unread_messages': 0,
+            'pending_proposals': 2,
+            'open_invitations': 1,
+            'shortlisted_applications': 1,
+        })
+
+    def test_single_query_and_cache(self):
+        with self.assertNumQueries(1):
+            self.summary(self.creator)
+        with self.assertNumQueries(0):
+            self.summary(self.creator)
+        with self.assertNumQueries(2):
+            # Clientes: también las propuestas pendientes por proyecto
+            self.summary(self.client_user)
+
+
+class RankingTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        self.convocatoria = Convocatoria.objects.create(
+            title='Video de producto', description='Buscamos fotografía y edición', client=self.client_user,
+            deadline=date.today() + timedelta(days=30), status='open', budget_min=100, budget_max=200,
+            start_date=date.today(), end_date=date.today() + timedelta(days=10),
+        )
+
+    def apply(self, price, days, rating=0, reviews=0, specialties=''):
+        creator = User.objects.create_user(f'creador{ConvocatoriaApplication.objects.count()}', '', 'x',
+                                           is_creator=True)
+        CreatorProfile.objects.filter(user=creator).update(average_rating=rating, review_count=reviews,
+                                                           specialties=specialties)
+        return ConvocatoriaApplication.objects.create(convocatoria=self.convocatoria, creator=creator,
+                                                      cover_letter='-', price=price, estimated_days=days)
+
+    def ranked(self, query=''):
+        url = reverse('convocatoria-ranked', args=[self.convocatoria.pk]) + query
+        response = self.api(self.client_user).get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_order_and_components(self):
+        best = self.apply(150, 5)
+        expensive = self.apply(300, 5)
+        slow = self.apply(150, 20)
+        tied = self.apply(120, 8)
+        data = self.ranked()
+        self.assertEqual(data['count'], 4)
+        # A igual puntaje, primero el id más bajo
+        self.assertEqual([row['id'] for row in data['results']], [best.pk, tied.pk, slow.pk, expensive.pk])
+        self.assertEqual(data['results'][3]['score_components']['price'], 0.5)
+        self.assertEqual(data['results'][2]['score_components']['timing'], 0.5)
+        scores = [row['score'] for row in data['results']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_rating_and_specialties(self):
+        plain = self.apply(150, 5)
+        rated = self.apply(150, 5, rating=4.8, reviews=40)
+        one_review = self.apply(150, 5, rating=5, reviews=1)
+        specialist = self.apply(150, 5, specialties='Fotografía, Edición')
+        order = [row['id'] for row in self.ranked()['results']]
+        self.assertEqual(order, [specialist.pk, rated.pk, one_review.pk, plain.pk])
+
+    def test_pagination_matches_full_ranking(self):
+        for i in range(12):
+            self.apply(90 + i * 15, 3 + i)
+        everything = [row['id'] for row in self.ranked('?limit=100')['results']]
+        pages = [row['id'] for offset in (0, 5, 10)
+                 for row in self.ranked(f'?limit=5&offset={offset}')['results']]
+        self.assertEqual(pages, everything)
+
+    def test_only_the_client_sees_the_ranking(self):
+        url = reverse('convocatoria-ranked', args=[self.convocatoria.pk])
+        self.assertEqual(self.api(self.creator).get(url).status_code, 403)
+
+    @skipUnless(ranking.np is not None, "NumPy no está instalado")
+    def test_numpy_and_python_scores_match(self):
+        for i in range(30):
+            self.apply(40 + i * 13, 1 + i % 17, rating=(i % 6) * 0.9, reviews=i % 7,
+                       specialties=['', 'Video', 'fotografía, edición', 'Podcast, Video'][i % 4])
+        budgets = [(100, 200), (300, 150), (None, 200), (100, None), (None, None), (0, 0)]
+        windows = [(date.today(), date.today() + timedelta(days=7)), (None, None)]
+        for (budget_min, budget_max), (start, end) in itertools.product(budgets, windows):
+            self.convocatoria.budget_min, self.convocatoria.budget_max = budget_min, budget_max
+            self.convocatoria.start_date, self.convocatoria.end_date = start, end
+            with self.subTest(budget=(budget_min, budget_max), window=(start, end)):
+                numpy_ranking = ranking.RankedApplications(
+                    self.convocatoria, ranking.load_columns(self.convocatoria.pk)
+                )
+                with mock.patch.object(ranking, 'np', None):
+                    python_ranking = ranking.RankedApplications(
+                        self.convocatoria, ranking.load_columns(self.convocatoria.pk)
+                    )
+                    python_page = python_ranking[0:30]
+                self.assertEqual([float(score) for score in numpy_ranking.scores], python_ranking.scores)
+                for name, values in numpy_ranking.components.items():
+                    self.assertEqual([float(value) for value in values], python_ranking.components[name])
+                    self.assertTrue(all(0 <= value <= 1 for value in python_ranking.components[name]))
+                self.assertEqual(numpy_ranking[0:30], python_page)
+
+
+@override_settings(CREATOR_INDEX_CHECK_SECONDS=0)
+class RecommendedCreatorsTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        self.enterContext(override_settings(CREATOR_INDEX_PATH=os.path.join(index_dir.name, 'creator_index.bin')))
+        CreatorProfile.objects.filter(user=self.creator).update(specialties='video')
+        self.editor = User.objects.create_user('editor', 'editor@example.com', 'clave-segura-1',
+                                               is_creator=True, bio='Edición de video institucional')
+        self.url = reverse('project-recommended-creators', args=[self.project.pk])
+
+    def test_missing_index_is_unavailable(self):
+        response = self.api(self.client_user).get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(os.path.exists(settings.CREATOR_INDEX_PATH))
+
+    def test_ranked_without_invited_creators(self):
+        call_command('build_creator_index', stdout=StringIO())
+        response = self.api(self.client_user).get(self.url)
+        # La especialidad pesa más que la bio
+        self.assertEqual([row['id'] for row in response.data['results']], [self.creator.pk, self.editor.pk])
+        self.assertGreater(response.data['results'][0]['score'], response.data['results'][1]['score'])
+
+        ProjectInvitation.objects.create(project=self.project, creator=self.creator, message='-')
+        response = self.api(self.client_user).get(self.url)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.editor.pk])
+        self.assertEqual(self.api(self.creator).get(self.url).status_code, 403)
+
+
+class RatingAggregateTests(ProjectTestCase):
+    def setUp(self):
+        super().setUp()
+        CreatorProfile.objects.get_or_create(user=self.creator)
+        self.other_client = User.objects.create_user('cliente2', 'cliente2@example.com', 'clave-segura-1')
+
+    def review(self, client, rating):
+        return ProjectReview.objects.create(project=self.project, client=client, creator=self.creator, rating=rating)
+
+    def aggregates(self):
+        return CreatorProfile.objects.filter(user=self.creator).values_list(
+            'review_count', 'rating_total', 'average_rating'
+        ).get()
+
+    def test_create_update_delete(self):
+        first = self.review(self.client_user, 5)
+        self.review(self.other_client, 4)
+        self.assertEqual(self.aggregates(), (2, 9, Decimal('4.50')))
+
+        first.rating = 2
+        first.save()
+        self.assertEqual(self.aggregates(), (2, 6, Decimal('3.00')))
+
+        first.delete()
+        self.assertEqual(self.aggregates(), (1, 4, Decimal('4.00')))
+
+    def test_moving_review_to_other_creator(self):
+        other = User.objects.create_user('creador2', 'creador2@example.com', 'clave-segura-1', is_creator=True)
+        CreatorProfile.objects.get_or_create(user=other)
+        review = self.review(self.client_user, 3)
+        review.creator = other
+        review.save()
+        self.assertEqual(self.aggregates(), (0, 0, Decimal('0.00')))
+        self.assertEqual(CreatorProfile.objects.get(user=other).rating_total, 3)
+
+    def stale(self):
+        self.review(self.client_user, 5)
+        self.review(self.other_client, 2)
+        CreatorProfile.objects.update(review_count=0, rating_total=0, average_rating=0)
+
+    def test_backfill_ratings(self):
+        self.stale()
+        with self.assertRaises(CommandError):
+            call_command('backfill_ratings', '--verify', stdout=StringIO())
+        call_command('backfill_ratings', '--batch-size', '1', stdout=StringIO())
+        self.assertEqual(self.aggregates(), (2, 7, Decimal('3.50')))
+        call_command('backfill_ratings', '--verify', stdout=StringIO())
+
+    def test_migration_backfills_totals(self):
+        self.stale()
+        migration = import_module('projects.migrations.0007_backfill_rating_totals')
+        migration.backfill_rating_totals(apps, None)
+        self.assertEqual(self.aggregates(), (2, 7, Decimal('3.50')))
+
+
+class SeedMarketplaceTests(TestCase):
+    SEEDED = (User, CreatorProfile, Project, ProjectInvitation, ProjectMessage, ProjectReview, ReviewDue)
+    NATURAL_KEYS = {User: 'username', Project: 'title', CreatorProfile: 'user__username'}
+
+    def seed(self, seed):
+        """Genera un marketplace chico y devuelve su contenido; la base queda como estaba"""
+        with tempfile.TemporaryDirectory() as index_dir, override_settings(
+            CREATOR_INDEX_PATH=os.path.join(index_dir, 'creator_index.bin')
+        ), transaction.atomic():
+            call_command('seed_marketplace', users=30, projects=40, messages=200, seed=seed, stdout=StringIO())
+            # Sin los ids: dependen de lo que haya insertado antes la base
+            snapshot = {
+                model.__name__: sorted(
+                    tuple(str(value) for value in row)
+                    for row in model.objects.values_list(*self.natural_fields(model))
+                )
+                for model in self.SEEDED
+            }
+            transaction.set_rollback(True)
+        return snapshot
+
+    @staticmethod
+    def natural_fields(model):
+        """Campos del modelo con las claves foráneas reemplazadas por el username o el título"""
+        names = []
+        for field in model._meta.concrete_fields:
+            if field.primary_key and not field.is_relation:
+                continue
+            if field.is_relation:
+                names.append(f'{field.name}__{SeedMarketplaceTests.NATURAL_KEYS[field.related_model]}')
+            else:
+                names.append(field.name)
+        return names
+
+    def test_same_seed_same_marketplace(self):
+        first = self.seed(7)
+        self.assertGreater(len(first['ProjectMessage']), 0)
+        self.assertEqual(first, self.seed(7))
+
+    def test_existing_seed_is_rejected(self):
+        with tempfile.TemporaryDirectory() as index_dir, override_settings(
+            CREATOR_INDEX_PATH=os.path.join(index_dir, 'creator_index.bin')
+        ):
+            call_command('seed_marketplace', users=10, projects=5, messages=10, seed=3, stdout=StringIO())
+            with self.assertRaises(CommandError):
+                call_command('seed_marketplace', users=10, projects=5, messages=10, seed=3, stdout=StringIO())
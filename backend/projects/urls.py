@@ -3,8 +3,10 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     ProjectViewSet, ProjectProposalViewSet, ProjectInvitationViewSet, 
-    ProjectMessageViewSet, ConvocatoriaViewSet, ConvocatoriaApplicationViewSet
+    ProjectMessageViewSet, ConvocatoriaViewSet, ConvocatoriaApplicationViewSet,
+    ProjectReviewViewSet, ConversationViewSet
 )
+from .realtime import project_stream
 
 router = DefaultRouter()
 router.register(r'projects', ProjectViewSet)
@@ -13,7 +15,10 @@ router.register(r'invitations', ProjectInvitationViewSet)
 router.register(r'messages', ProjectMessageViewSet)
 router.register(r'convocatorias', ConvocatoriaViewSet)
 router.register(r'applications', ConvocatoriaApplicationViewSet)
+router.register(r'reviews', ProjectReviewViewSet)
+router.register(r'conversations', ConversationViewSet)
 
 urlpatterns = [
+    path('projects/<int:pk>/stream/', project_stream, name='project-stream'),
     path('', include(router.urls)),
 ]
@@ -1,27 +1,86 @@
+import logging
+
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
-from django.core.mail import send_mail
-from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q, Exists, OuterRef
 from .models import (
     Project, ProjectProposal, ProjectInvitation, ProjectMessage,
-    Convocatoria, ConvocatoriaApplication, ProjectReview
+    Convocatoria, ConvocatoriaApplication, ProjectReview, Conversation, ReviewDue
 )
 from .serializers import (
     ProjectSerializer, ProjectProposalSerializer, ProjectInvitationSerializer,
     ProjectMessageSerializer, ConvocatoriaSerializer, ConvocatoriaApplicationSerializer,
-    ProjectReviewSerializer
+    ProjectReviewSerializer, ConversationSerializer, ReadUpToSerializer
 )
+from accounts.creator_index import IndexNotBuilt, get_creator_index
 from accounts.permissions import IsOwnerOrReadOnly
+from accounts.serializers import CreatorUserSerializer, prefetch_users
+from core.conditional import ConditionalGetMixin
+from core.db_router import ReplicaReadMixin
+from core.response_cache import ResponseCacheMixin
+from core.rows import RowListMixin
+from core.sparse import SparseFieldsViewMixin
+from core.timing import PhaseTimingMixin
+from core.pagination import (
+    KeysetPagination, ChatKeysetPagination, InboxKeysetPagination, RankingPagination, ReviewDueKeysetPagination
+)
+from notifications.outbox import queue_mail
+from .ranking import rank_applications
+from .realtime import publish_message, publish_read
+
+User = get_user_model()
+logger = logging.getLogger('accounts.creator_index')
+
+
+def client_tags(view):
+    """
+    ``user:<id>`` de los clientes de la página del listado, que van embebidos con
+    sus redes sociales (ver core/response_cache.py)
+    """
+    rows = view.filter_queryset(view.get_queryset()).select_related(None).prefetch_related(None)
+    page = view.paginate_queryset(rows.values_list('client_id', flat=True))
+    return {f'user:{client_id}' for client_id in page or ()}
+
+
+def recommended_creators_response(request, text, exclude):
+    """
+    Creadores recomendados para ``text`` (ver accounts/creator_index.py), sin los
+    de ``exclude``, con su puntaje y paginados con ``?limit=``/``?offset=``. Sin
+    índice construido responde 503: el request nunca lo construye.
+    """
+    try:
+        recommendations = get_creator_index().search(text, exclude)
+    except IndexNotBuilt as exc:
+        logger.error("Falta el índice de creadores %s: correr build_creator_index", exc)
+        return Response(
+            {"error": "Las recomendaciones no están disponibles todavía"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    paginator = RankingPagination()
+    page = paginator.paginate_queryset(recommendations, request)
+    creators = User.objects.filter(is_creator=True, is_active=True).select_related(
+        'creator_profile'
+    ).prefetch_related('social_networks', 'creator_profile__portfolio_items').in_bulk(
+        [creator_id for creator_id, _ in page]
+    )
+    # Un creador dado de baja puede seguir en el índice hasta que se lea el delta
+    page = [(creators[creator_id], score) for creator_id, score in page if creator_id in creators]
+    data = CreatorUserSerializer([creator for creator, _ in page], many=True, context={'request': request}).data
+    for row, (_, score) in zip(data, page):
+        row['score'] = score
+    return paginator.get_paginated_response(data)
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ReplicaReadMixin, SparseFieldsViewMixin, ResponseCacheMixin, ConditionalGetMixin, RowListMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para proyectos
     """
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    conditional_timestamps = ('updated_at', 'client__updated_at')
     
     def get_queryset(self):
         """
@@ -31,18 +90,29 @@ class ProjectViewSet(viewsets.ModelViewSet):
         - Creadores ven proyectos públicos y aquellos donde han sido invitados
         """
         user = self.request.user
+        queryset = prefetch_users(Project.objects.all(), 'client')
         if user.is_staff:
-            return Project.objects.all()
+            return queryset
         
         if user.is_creator:
-            # Proyectos públicos + proyectos donde el creador está invitado
-            return Project.objects.filter(
-                Q(is_public=True) | 
-                Q(invitations__creator=user)
-            ).distinct()
+            # Proyectos públicos + proyectos donde el creador está invitado. Con EXISTS
+            # no hace falta el JOIN con invitaciones ni el DISTINCT, y el orden por
+            # -created_at puede recorrer el índice y cortar en la primera página.
+            invited = ProjectInvitation.objects.filter(project=OuterRef('pk'), creator=user)
+            return queryset.filter(Q(is_public=True) | Exists(invited))
         
         # Cliente ve sus propios proyectos
-        return Project.objects.filter(client=user)
+        return queryset.filter(client=user)
+    
+    def response_cache_tags(self):
+        # Se cachea el feed de los creadores (públicos + invitaciones)
+        user = self.request.user
+        if self.action == 'list' and user.is_creator and not user.is_staff:
+            return ['projects', f'invitations:{user.pk}']
+        return None
+    
+    def response_cache_page_tags(self):
+        return client_tags(self)
     
     def perform_create(self, serializer):
         serializer.save(client=self.request.user)
@@ -50,40 +120,65 @@ class ProjectViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['get'])
     def proposals(self, request, pk=None):
         project = self.get_object()
-        proposals = ProjectProposal.objects.filter(project=project)
-        serializer = ProjectProposalSerializer(proposals, many=True)
-        return Response(serializer.data)
+        proposals = prefetch_users(ProjectProposal.objects.filter(project=project), 'creator')
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(proposals, request, view=self)
+        serializer = ProjectProposalSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=True, methods=['get'])
     def messages(self, request, pk=None):
         project = self.get_object()
         user = request.user
-        messages = ProjectMessage.objects.filter(
-            project=project,
-            Q(sender=user) | Q(receiver=user)
+        messages = prefetch_users(ProjectMessage.objects.filter(
+            Q(sender=user) | Q(receiver=user),
+            project=project
+        ), 'sender', 'receiver')
+        paginator = ChatKeysetPagination()
+        page = paginator.paginate_queryset(messages, request, view=self)
+        serializer = ProjectMessageSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def recommended_creators(self, request, pk=None):
+        """
+        Creadores cuyo perfil se parece al proyecto, sin los ya invitados ni los
+        que ya enviaron propuesta
+        """
+        project = self.get_object()
+        
+        if request.user != project.client and not request.user.is_staff:
+            return Response(
+                {"error": "Solo el cliente puede ver creadores recomendados"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        exclude = project.invitations.order_by().values_list('creator_id', flat=True).union(
+            project.proposals.order_by().values_list('creator_id', flat=True)
         )
-        serializer = ProjectMessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        return recommended_creators_response(request, f'{project.title} {project.description}', set(exclude))
 
-class ProjectProposalViewSet(viewsets.ModelViewSet):
+class ProjectProposalViewSet(ReplicaReadMixin, SparseFieldsViewMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para propuestas de proyectos
     """
     queryset = ProjectProposal.objects.all()
     serializer_class = ProjectProposalSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         user = self.request.user
+        queryset = prefetch_users(ProjectProposal.objects.all(), 'creator')
         if user.is_staff:
-            return ProjectProposal.objects.all()
+            return queryset
         
         if user.is_creator:
             # Creadores ven sus propias propuestas
-            return ProjectProposal.objects.filter(creator=user)
+            return queryset.filter(creator=user)
         
         # Clientes ven propuestas para sus proyectos
-        return ProjectProposal.objects.filter(project__client=user)
+        return queryset.filter(project__client=user)
     
     def perform_create(self, serializer):
         """
@@ -101,20 +196,15 @@ class ProjectProposalViewSet(viewsets.ModelViewSet):
         project = Project.objects.get(id=project_id)
         
         if project.is_public or ProjectInvitation.objects.filter(project=project, creator=user).exists():
-            proposal = serializer.save(creator=user)
-            
-            # Enviar notificación por email al cliente
-            try:
-                client = project.client
-                send_mail(
+            with transaction.atomic():
+                proposal = serializer.save(creator=user)
+                
+                # Encolar notificación por email al cliente
+                queue_mail(
                     f'Nueva propuesta para tu proyecto: {project.title}',
                     f'{user.get_full_name()} ha enviado una propuesta para tu proyecto.\n\nPrecio: {proposal.price}\nTiempo estimado: {proposal.estimated_days} días\n\n{proposal.message}',
-                    settings.DEFAULT_FROM_EMAIL,
-                    [client.email],
-                    fail_silently=True,
+                    [project.client.email],
                 )
-            except Exception as e:
-                print(f"Error al enviar email: {e}")
         else:
             return Response(
                 {"error": "No puedes proponer a este proyecto"},
@@ -133,25 +223,20 @@ class ProjectProposalViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        proposal.status = 'accepted'
-        proposal.save()
-        
-        # Cambiar el estado del proyecto
-        project.status = 'in_progress'
-        project.save()
-        
-        # Enviar notificación por email al creador
-        try:
-            creator = proposal.creator
-            send_mail(
+        with transaction.atomic():
+            proposal.status = 'accepted'
+            proposal.save()
+            
+            # Cambiar el estado del proyecto
+            project.status = 'in_progress'
+            project.save()
+            
+            # Encolar notificación por email al creador
+            queue_mail(
                 f'Tu propuesta ha sido aceptada: {project.title}',
                 f'{request.user.get_full_name()} ha aceptado tu propuesta para el proyecto "{project.title}".\n\nPuedes comenzar a trabajar en él y mantener contacto a través del chat del proyecto.',
-                settings.DEFAULT_FROM_EMAIL,
-                [creator.email],
-                fail_silently=True,
+                [proposal.creator.email],
             )
-        except Exception as e:
-            print(f"Error al enviar email: {e}")
         
         serializer = self.get_serializer(proposal)
         return Response(serializer.data)
@@ -174,7 +259,7 @@ class ProjectProposalViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(proposal)
         return Response(serializer.data)
 
-class ProjectInvitationViewSet(viewsets.ModelViewSet):
+class ProjectInvitationViewSet(ReplicaReadMixin, SparseFieldsViewMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para invitaciones a proyectos
     """
@@ -184,15 +269,16 @@ class ProjectInvitationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        queryset = prefetch_users(ProjectInvitation.objects.all(), 'project__client', 'creator')
         if user.is_staff:
-            return ProjectInvitation.objects.all()
+            return queryset
         
         if user.is_creator:
             # Creadores ven invitaciones que les han hecho
-            return ProjectInvitation.objects.filter(creator=user)
+            return queryset.filter(creator=user)
         
         # Clientes ven invitaciones que han enviado
-        return ProjectInvitation.objects.filter(project__client=user)
+        return queryset.filter(project__client=user)
     
     def perform_create(self, serializer):
         """
@@ -257,40 +343,37 @@ class ProjectInvitationViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(invitation)
         return Response(serializer.data)
 
-class ProjectMessageViewSet(viewsets.ModelViewSet):
+class ProjectMessageViewSet(ReplicaReadMixin, SparseFieldsViewMixin, RowListMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para mensajes de proyectos
     """
     queryset = ProjectMessage.objects.all()
     serializer_class = ProjectMessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ChatKeysetPagination
     
     def get_queryset(self):
         user = self.request.user
+        queryset = prefetch_users(ProjectMessage.objects.all(), 'sender', 'receiver')
         if user.is_staff:
-            return ProjectMessage.objects.all()
+            return queryset
         
         # Usuario ve mensajes donde es remitente o destinatario
-        return ProjectMessage.objects.filter(
+        return queryset.filter(
             Q(sender=user) | Q(receiver=user)
         )
     
+    @transaction.atomic
     def perform_create(self, serializer):
         message = serializer.save(sender=self.request.user)
         
-        # Enviar notificación por email al destinatario
-        try:
-            receiver = message.receiver
-            project = message.project
-            send_mail(
-                f'Nuevo mensaje en proyecto: {project.title}',
-                f'{message.sender.get_full_name()} te ha enviado un mensaje:\n\n{message.content[:100]}{"..." if len(message.content) > 100 else ""}',
-                settings.DEFAULT_FROM_EMAIL,
-                [receiver.email],
-                fail_silently=True,
-            )
-        except Exception as e:
-            print(f"Error al enviar email: {e}")
+        # Encolar notificación por email al destinatario
+        queue_mail(
+            f'Nuevo mensaje en proyecto: {message.project.title}',
+            f'{message.sender.get_full_name()} te ha enviado un mensaje:\n\n{message.content[:100]}{"..." if len(message.content) > 100 else ""}',
+            [message.receiver.email],
+        )
+        transaction.on_commit(lambda: publish_message(message))
     
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
@@ -303,13 +386,75 @@ class ProjectMessageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
+        with transaction.atomic():
+            marked = ProjectMessage.objects.filter(pk=message.pk, read=False).update(read=True)
+            Conversation.record_read(message.project_id, request.user.id, message.sender_id, marked)
         message.read = True
-        message.save()
+        if marked:
+            # Ya estaba leído: el otro lado ya recibió el aviso
+            publish_read(message.project_id, request.user.id, [message.sender_id], [message.id])
         
         serializer = self.get_serializer(message)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['post'], serializer_class=ReadUpToSerializer)
+    def read_up_to(self, request):
+        """
+        Marca como leídos, con un único UPDATE, todos los mensajes recibidos en el
+        proyecto hasta el mensaje indicado (inclusive). Devuelve los no leídos que quedan.
+        """
+        serializer = ReadUpToSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        project_id = serializer.validated_data['project']
+        user = request.user
+        
+        watermark = ProjectMessage.objects.filter(
+            Q(sender=user) | Q(receiver=user),
+            pk=serializer.validated_data['message'],
+            project_id=project_id
+        ).first()
+        if watermark is None:
+            return Response(
+                {"error": "El mensaje no existe en este proyecto"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        with transaction.atomic():
+            marked = ProjectMessage.objects.filter(
+                Q(created_at__lt=watermark.created_at) |
+                Q(created_at=watermark.created_at, id__lte=watermark.id),
+                receiver=user,
+                project_id=project_id,
+                read=False
+            ).update(read=True)
+            unread_count = Conversation.sync_unread(project_id, user.id)
+        
+        if marked:
+            senders = Conversation.objects.filter(project_id=project_id).filter(
+                Q(user_a=user) | Q(user_b=user)
+            ).values_list('user_a_id', 'user_b_id')
+            publish_read(project_id, user.id, {uid for pair in senders for uid in pair} - {user.id},
+                         up_to=watermark.id)
+        
+        return Response({'marked': marked, 'unread_count': unread_count})
+
+class ConversationViewSet(ReplicaReadMixin, SparseFieldsViewMixin, PhaseTimingMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint para la bandeja de conversaciones del usuario
+    """
+    queryset = Conversation.objects.all()
+    serializer_class = ConversationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = InboxKeysetPagination
+    
+    def get_queryset(self):
+        # La bandeja es personal, también para staff
+        user = self.request.user
+        return prefetch_users(Conversation.objects.filter(
+            Q(user_a=user) | Q(user_b=user)
+        ), 'user_a', 'user_b')
 
-class ProjectReviewViewSet(viewsets.ModelViewSet):
+class ProjectReviewViewSet(ReplicaReadMixin, SparseFieldsViewMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para reseñas de proyectos
     """
@@ -319,37 +464,42 @@ class ProjectReviewViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        queryset = prefetch_users(ProjectReview.objects.all(), 'client')
         if user.is_staff:
-            return ProjectReview.objects.all()
+            return queryset
         
         if user.is_creator:
             # Creadores ven reseñas sobre ellos
-            return ProjectReview.objects.filter(creator=user)
+            return queryset.filter(creator=user)
         
         # Clientes ven reseñas que han hecho
-        return ProjectReview.objects.filter(client=user)
+        return queryset.filter(client=user)
     
+    @transaction.atomic
     def perform_create(self, serializer):
         review = serializer.save(client=self.request.user)
         
-        # Enviar notificación por email al creador
-        try:
-            creator = review.creator
-            project = review.project
-            send_mail(
-                f'Nueva reseña en proyecto: {project.title}',
-                f'{review.client.get_full_name()} ha dejado una reseña de {review.rating} estrellas.\n\n{review.comment if review.comment else ""}',
-                settings.DEFAULT_FROM_EMAIL,
-                [creator.email],
-                fail_silently=True,
-            )
-        except Exception as e:
-            print(f"Error al enviar email: {e}")
+        # Encolar notificación por email al creador
+        queue_mail(
+            f'Nueva reseña en proyecto: {review.project.title}',
+            f'{review.client.get_full_name()} ha dejado una reseña de {review.rating} estrellas.\n\n{review.comment if review.comment else ""}',
+            [review.creator.email],
+        )
+    
+    # Los agregados de calificación del creador se actualizan en la misma transacción
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+    
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
             
     @action(detail=False, methods=['get'])
     def my_pending_reviews(self, request):
         """
-        Devuelve proyectos completados que aún no han sido revisados por el cliente
+        Proyectos completados que el cliente aún no reseñó, paginados por cursor
+        (ver ReviewDue). ``count`` es el total pendiente.
         """
         user = request.user
         
@@ -359,41 +509,54 @@ class ProjectReviewViewSet(viewsets.ModelViewSet):
                 {"error": "Solo los clientes pueden ver reseñas pendientes"},
                 status=status.HTTP_403_FORBIDDEN
             )
-            
-        # Encontrar proyectos completados sin revisión
-        completed_projects = Project.objects.filter(
-            client=user,
-            status='completed'
-        )
-        
-        reviewed_project_ids = ProjectReview.objects.filter(
-            client=user
-        ).values_list('project_id', flat=True)
-        
-        pending_projects = completed_projects.exclude(id__in=reviewed_project_ids)
         
-        serializer = ProjectSerializer(pending_projects, many=True)
-        return Response(serializer.data)
+        # Se recorre el índice de ReviewDue; cada fila trae su proyecto
+        pending = prefetch_users(ReviewDue.objects.filter(client=user), 'project__client')
+        paginator = ReviewDueKeysetPagination()
+        page = paginator.paginate_queryset(pending, request, view=self)
+        serializer = ProjectSerializer([due.project for due in page], many=True)
+        response = paginator.get_paginated_response(serializer.data)
+        response.data['count'] = ReviewDue.objects.filter(client=user).count()
+        return response
 
-class ConvocatoriaViewSet(viewsets.ModelViewSet):
+class ConvocatoriaViewSet(ReplicaReadMixin, SparseFieldsViewMixin, ResponseCacheMixin, ConditionalGetMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para convocatorias
     """
     queryset = Convocatoria.objects.all()
     serializer_class = ConvocatoriaSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    conditional_timestamps = ('updated_at', 'client__updated_at')
+    
+    def visibility_scope(self):
+        # Todos los creadores ven las mismas convocatorias (las abiertas)
+        user = self.request.user
+        if user.is_creator and not user.is_staff:
+            return 'creators'
+        return super().visibility_scope()
     
     def get_queryset(self):
         user = self.request.user
+        queryset = prefetch_users(Convocatoria.objects.all(), 'client')
         if user.is_staff:
-            return Convocatoria.objects.all()
+            return queryset
         
         if user.is_creator:
             # Creadores ven convocatorias abiertas
-            return Convocatoria.objects.filter(status='open')
+            return queryset.filter(status='open')
         
         # Clientes ven sus propias convocatorias
-        return Convocatoria.objects.filter(client=user)
+        return queryset.filter(client=user)
+    
+    def response_cache_tags(self):
+        # Las convocatorias abiertas que ven los creadores
+        user = self.request.user
+        if self.action == 'list' and user.is_creator and not user.is_staff:
+            return ['convocatorias']
+        return None
+    
+    def response_cache_page_tags(self):
+        return client_tags(self)
     
     def perform_create(self, serializer):
         serializer.save(client=self.request.user)
@@ -409,29 +572,80 @@ class ConvocatoriaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        applications = ConvocatoriaApplication.objects.filter(convocatoria=convocatoria)
-        serializer = ConvocatoriaApplicationSerializer(applications, many=True)
-        return Response(serializer.data)
+        applications = prefetch_users(
+            ConvocatoriaApplication.objects.filter(convocatoria=convocatoria), 'creator'
+        )
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(applications, request, view=self)
+        serializer = ConvocatoriaApplicationSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def ranked(self, request, pk=None):
+        """
+        Aplicaciones ordenadas por puntaje (ver projects/ranking.py), con el
+        puntaje y sus componentes
+        """
+        convocatoria = self.get_object()
+        
+        if request.user != convocatoria.client and not request.user.is_staff:
+            return Response(
+                {"error": "Solo el cliente puede ver todas las aplicaciones"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        paginator = RankingPagination()
+        page = paginator.paginate_queryset(rank_applications(convocatoria), request, view=self)
+        applications = prefetch_users(ConvocatoriaApplication.objects.all(), 'creator').in_bulk(
+            [application_id for application_id, _, _ in page]
+        )
+        # Con columnas cacheadas, una aplicación recién borrada puede seguir en el ranking
+        page = [(applications[application_id], score, components)
+                for application_id, score, components in page if application_id in applications]
+        serializer = ConvocatoriaApplicationSerializer([application for application, _, _ in page], many=True)
+        data = serializer.data
+        for row, (_, score, components) in zip(data, page):
+            row['score'] = score
+            row['score_components'] = components
+        return paginator.get_paginated_response(data)
+    
+    @action(detail=True, methods=['get'])
+    def recommended_creators(self, request, pk=None):
+        """Creadores cuyo perfil se parece a la convocatoria, sin los que ya aplicaron"""
+        convocatoria = self.get_object()
+        
+        if request.user != convocatoria.client and not request.user.is_staff:
+            return Response(
+                {"error": "Solo el cliente puede ver creadores recomendados"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        exclude = set(convocatoria.applications.values_list('creator_id', flat=True))
+        return recommended_creators_response(
+            request, f'{convocatoria.title} {convocatoria.description}', exclude
+        )
 
-class ConvocatoriaApplicationViewSet(viewsets.ModelViewSet):
+class ConvocatoriaApplicationViewSet(ReplicaReadMixin, SparseFieldsViewMixin, RowListMixin, PhaseTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint para aplicaciones a convocatorias
     """
     queryset = ConvocatoriaApplication.objects.all()
     serializer_class = ConvocatoriaApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         user = self.request.user
+        queryset = prefetch_users(ConvocatoriaApplication.objects.all(), 'creator')
         if user.is_staff:
-            return ConvocatoriaApplication.objects.all()
+            return queryset
         
         if user.is_creator:
             # Creadores ven sus propias aplicaciones
-            return ConvocatoriaApplication.objects.filter(creator=user)
+            return queryset.filter(creator=user)
         
         # Clientes ven aplicaciones a sus convocatorias
-        return ConvocatoriaApplication.objects.filter(convocatoria__client=user)
+        return queryset.filter(convocatoria__client=user)
     
     def perform_create(self, serializer):
         """